@@ -1,43 +1,105 @@
 """GAM device API endpoints"""
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
+from typing import List, Literal, Optional
 from uuid import UUID
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator, model_validator
+import json
 import logging
 
 from ...database import get_db
 from ...services.gam_manager import GAMManager
+from ...services.gam_driver import driver_for_device
 from ...models.gam import DeviceStatus
 from ...utils.snmp_client import SNMPClient
+from ...utils.snmp_usm import AUTH_PROTOCOLS, PRIV_PROTOCOLS
+from ...services.mac_index import mac_index, normalize_mac, normalize_oui
+from ...services.cli_fanout import cli_fanout, QUERIES, SHOW_COMMAND
+from ...utils.ssh_shell import CONTROL_CHARACTERS
+from ...services.config_cache import config_cache
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
+SnmpVersion = Literal['v2c', 'v3']
+ManagementApi = Literal['cli', 'json_rpc']
+
+SNMP_V3_FIELDS = (
+    'snmp_v3_username', 'snmp_v3_auth_protocol', 'snmp_v3_auth_password',
+    'snmp_v3_priv_protocol', 'snmp_v3_priv_password'
+)
+
+
 # Pydantic schemas
-class GAMDeviceCreate(BaseModel):
+class SnmpV3Credentials(BaseModel):
+    """
+    Checks the SNMPv3 fields of a request, so bad credentials are rejected
+    here rather than failing every poll of the device later.
+    """
+
+    @model_validator(mode='after')
+    def validate_snmp_v3(self):
+        if getattr(self, 'snmp_version', None) == 'v3':
+            missing = [name for name in SNMP_V3_FIELDS if not getattr(self, name, None)]
+            if missing:
+                raise ValueError(f"SNMPv3 requires {', '.join(missing)}")
+
+        auth_protocol = getattr(self, 'snmp_v3_auth_protocol', None)
+        if auth_protocol and auth_protocol.lower() not in AUTH_PROTOCOLS:
+            raise ValueError(f"snmp_v3_auth_protocol must be one of: {', '.join(AUTH_PROTOCOLS)}")
+        priv_protocol = getattr(self, 'snmp_v3_priv_protocol', None)
+        if priv_protocol and priv_protocol.lower() not in PRIV_PROTOCOLS:
+            raise ValueError(f"snmp_v3_priv_protocol must be one of: {', '.join(PRIV_PROTOCOLS)}")
+        username = getattr(self, 'snmp_v3_username', None)
+        if username and len(username) > 32:
+            raise ValueError("snmp_v3_username must be at most 32 characters")
+        for name in ('snmp_v3_auth_password', 'snmp_v3_priv_password'):
+            password = getattr(self, name, None)
+            if password and len(password) < 8:
+                raise ValueError(f"{name} must be at least 8 characters")
+        return self
+
+
+class GAMDeviceCreate(SnmpV3Credentials):
     name: str
     ip_address: str
     model: str
     snmp_community: Optional[str] = None
+    snmp_version: Optional[SnmpVersion] = None
+    snmp_v3_username: Optional[str] = None
+    snmp_v3_auth_protocol: Optional[str] = None
+    snmp_v3_auth_password: Optional[str] = None
+    snmp_v3_priv_protocol: Optional[str] = None
+    snmp_v3_priv_password: Optional[str] = None
     ssh_credentials: Optional[dict] = None  # Legacy JSONB field
     ssh_username: Optional[str] = None
     ssh_password: Optional[str] = None
     ssh_port: Optional[int] = 22
+    management_api: Optional[ManagementApi] = None
+    api_port: Optional[int] = None
     location: Optional[str] = None
     management_vlan: Optional[int] = None
 
 
-class GAMDeviceUpdate(BaseModel):
+class GAMDeviceUpdate(SnmpV3Credentials):
     name: Optional[str] = None
     location: Optional[str] = None
     status: Optional[DeviceStatus] = None
     snmp_community: Optional[str] = None
+    snmp_version: Optional[SnmpVersion] = None
+    snmp_v3_username: Optional[str] = None
+    snmp_v3_auth_protocol: Optional[str] = None
+    snmp_v3_auth_password: Optional[str] = None
+    snmp_v3_priv_protocol: Optional[str] = None
+    snmp_v3_priv_password: Optional[str] = None
     ssh_credentials: Optional[dict] = None  # Legacy JSONB field
     ssh_username: Optional[str] = None
     ssh_password: Optional[str] = None
     ssh_port: Optional[int] = None
+    management_api: Optional[ManagementApi] = None
+    api_port: Optional[int] = None
 
 
 class GAMDeviceResponse(BaseModel):
@@ -51,8 +113,12 @@ class GAMDeviceResponse(BaseModel):
     uptime: Optional[int]
     cpu_usage: Optional[int]
     memory_usage: Optional[int]
+    snmp_version: str
+    snmp_v3_username: Optional[str]  # SNMPv3 passwords are never returned
     ssh_username: Optional[str]  # Include SSH username in response (not password for security)
     ssh_port: Optional[int]
+    management_api: str
+    api_port: int
 
     class Config:
         from_attributes = True
@@ -65,6 +131,8 @@ class PortResponse(BaseModel):
     status: str
     enabled: bool
     name: Optional[str]
+    subscriber_count: int
+    is_available: bool
 
     class Config:
         from_attributes = True
@@ -82,13 +150,54 @@ async def create_device(
         ip_address=device.ip_address,
         model=device.model,
         snmp_community=device.snmp_community,
+        snmp_version=device.snmp_version,
+        snmp_v3_username=device.snmp_v3_username,
+        snmp_v3_auth_protocol=device.snmp_v3_auth_protocol,
+        snmp_v3_auth_password=device.snmp_v3_auth_password,
+        snmp_v3_priv_protocol=device.snmp_v3_priv_protocol,
+        snmp_v3_priv_password=device.snmp_v3_priv_password,
         ssh_credentials=device.ssh_credentials,
+        management_api=device.management_api,
+        api_port=device.api_port,
         location=device.location,
         management_vlan=device.management_vlan
     )
     return new_device
 
 
+class GAMDeviceImport(BaseModel):
+    devices: List[GAMDeviceCreate]
+
+
+class GAMDeviceImportSkipped(BaseModel):
+    name: str
+    ip_address: str
+    reason: str
+
+
+class GAMDeviceImportResponse(BaseModel):
+    created: List[GAMDeviceResponse]
+    skipped: List[GAMDeviceImportSkipped]
+
+
+@router.post("/devices/import", response_model=GAMDeviceImportResponse, status_code=status.HTTP_201_CREATED)
+async def import_devices(
+    request: GAMDeviceImport,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Create many GAM devices (e.g. a new region) with their ports in one transaction.
+
+    Devices are not contacted; they start offline until the fleet poller reaches
+    them. Entries whose name or IP address already exists are skipped.
+    """
+    if not request.devices:
+        raise HTTPException(status_code=400, detail="No devices given")
+
+    manager = GAMManager(db)
+    return await manager.import_devices([device.model_dump() for device in request.devices])
+
+
 @router.get("/devices", response_model=List[GAMDeviceResponse])
 async def list_devices(
     status: Optional[DeviceStatus] = None,
@@ -191,10 +300,10 @@ async def sync_device_ports(
         raise HTTPException(status_code=404, detail="Device not found")
 
     # Create SNMP client
-    snmp_client = SNMPClient(
-        ip_address=device.ip_address,
-        community=device.snmp_community
-    )
+    try:
+        snmp_client = SNMPClient.for_device(device)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     # Get port status from device
     logger.info(f"Syncing port status for device {device.name} ({device.ip_address})")
@@ -217,9 +326,15 @@ async def sync_device_ports(
     }
 
 
-class GAMDiscoverRequest(BaseModel):
+class GAMDiscoverRequest(SnmpV3Credentials):
     ip_address: str
     snmp_community: Optional[str] = "public"
+    snmp_version: Optional[SnmpVersion] = None
+    snmp_v3_username: Optional[str] = None
+    snmp_v3_auth_protocol: Optional[str] = None
+    snmp_v3_auth_password: Optional[str] = None
+    snmp_v3_priv_protocol: Optional[str] = None
+    snmp_v3_priv_password: Optional[str] = None
     name: Optional[str] = None
     ssh_username: Optional[str] = None
     ssh_password: Optional[str] = None
@@ -238,10 +353,10 @@ async def discover_gam_device(
     logger.info(f"Attempting to discover GAM device at {request.ip_address}")
 
     # Create SNMP client
-    snmp_client = SNMPClient(
-        ip_address=request.ip_address,
-        community=request.snmp_community
-    )
+    try:
+        snmp_client = SNMPClient.for_device(request.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     # Discover device information
     device_info = await snmp_client.discover_gam_device()
@@ -273,6 +388,12 @@ async def discover_gam_device(
         ip_address=request.ip_address,
         model=device_info.get('model', 'GAM-Unknown'),
         snmp_community=request.snmp_community,
+        snmp_version=request.snmp_version,
+        snmp_v3_username=request.snmp_v3_username,
+        snmp_v3_auth_protocol=request.snmp_v3_auth_protocol,
+        snmp_v3_auth_password=request.snmp_v3_auth_password,
+        snmp_v3_priv_protocol=request.snmp_v3_priv_protocol,
+        snmp_v3_priv_password=request.snmp_v3_priv_password,
         ssh_username=request.ssh_username,
         ssh_password=request.ssh_password,
         ssh_port=request.ssh_port,
@@ -298,8 +419,8 @@ async def get_discovered_cpe(
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Discover all CPE devices connected to this GAM via SSH CLI.
-    Executes 'show ghn endpoint' and 'show ghn subscriber' commands.
+    Discover all CPE devices connected to this GAM through its management
+    API (SSH CLI or JSON-RPC, see services/gam_driver.py).
     Returns Positron G.hn endpoints found on the device.
     """
     manager = GAMManager(db)
@@ -309,36 +430,30 @@ async def get_discovered_cpe(
     if not device:
         raise HTTPException(status_code=404, detail="Device not found")
 
-    # Check if SSH credentials are configured
-    if not device.ssh_username or not device.ssh_password:
+    driver = driver_for_device(device)
+    if driver is None:
         raise HTTPException(
             status_code=400,
-            detail="SSH credentials not configured for this device. Please update device settings with SSH username and password."
+            detail="Management credentials not configured for this device. Please update device settings with a username and password."
         )
 
-    # Create SSH client
-    from ...utils.ssh_client import SSHClient
-    ssh_client = SSHClient(
-        ip_address=device.ip_address,
-        username=device.ssh_username,
-        password=device.ssh_password,
-        timeout=30
-    )
-
-    logger.info(f"Discovering CPE devices on {device.name} ({device.ip_address}) via SSH CLI")
+    logger.info(f"Discovering CPE devices on {device.name} ({device.ip_address}) via {driver.label}")
 
-    # Get endpoints from device via CLI
-    endpoints = await ssh_client.get_ghn_endpoints()
+    # Get endpoints from the device
+    endpoints = await driver.get_ghn_endpoints()
     if endpoints is None:
         raise HTTPException(
             status_code=400,
-            detail=f"Failed to query G.hn endpoints from device via SSH. Check SSH credentials and connectivity."
+            detail=f"Failed to query G.hn endpoints from device via {driver.label}. Check credentials and connectivity."
         )
 
-    # Get subscribers from device via CLI
-    device_subscribers = await ssh_client.get_ghn_subscribers()
-    if device_subscribers is None:
-        device_subscribers = []
+    # Record where each endpoint MAC was seen
+    mac_index.update_from_endpoints(device.id, device.name, endpoints)
+    await mac_index.flush(db)
+    await db.commit()
+
+    # Get subscribers configured on the device (from the cached running-config for CLI devices)
+    device_subscribers = await driver.get_ghn_subscribers() or []
 
     # Get configured subscribers from database
     from sqlalchemy import select
@@ -394,7 +509,7 @@ async def get_discovered_cpe(
         'success': True,
         'device_id': str(device_id),
         'device_name': device.name,
-        'discovery_method': 'SSH CLI',
+        'discovery_method': driver.label,
         'total_endpoints': len(endpoints),
         'unconfigured_count': len(unconfigured_cpe),
         'configured_count': len(configured_cpe),
@@ -402,3 +517,104 @@ async def get_discovered_cpe(
         'configured_cpe': configured_cpe,
         'device_subscribers': device_subscribers,
     }
+
+
+@router.get("/devices/{device_id}/running-config")
+async def get_device_running_config(
+    device_id: UUID,
+    refresh: bool = False,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get a device's running-config and its parsed endpoints, subscribers,
+    bandwidth profiles and VLANs. Served from cache unless it has been
+    invalidated, has expired or refresh is set.
+    """
+    manager = GAMManager(db)
+    device = await manager.get_device(device_id)
+    if not device:
+        raise HTTPException(status_code=404, detail="Device not found")
+
+    device_config = await config_cache.get(db, device, refresh=refresh)
+    await db.commit()
+    if device_config is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Failed to read running-config from device via SSH. Check SSH credentials and connectivity."
+        )
+    return device_config
+
+
+@router.get("/mac-locations")
+async def find_mac_locations_by_oui(oui: str):
+    """
+    Find every known MAC address with the given OUI prefix across the fleet.
+    The OUI is the first three octets, e.g. 00:0e:d8 for Positron endpoints.
+    """
+    if normalize_oui(oui) is None:
+        raise HTTPException(status_code=400, detail=f"Invalid OUI prefix: {oui}")
+
+    locations = mac_index.lookup_oui(oui)
+    return {
+        'oui': normalize_oui(oui),
+        'total': len(locations),
+        'locations': locations
+    }
+
+
+@router.get("/mac-locations/{mac_address}")
+async def find_mac_location(mac_address: str):
+    """
+    Find the GAM device and port a MAC address was last seen on.
+    Fed by the fleet poller's FDB walks and by CPE discovery.
+    """
+    if normalize_mac(mac_address) is None:
+        raise HTTPException(status_code=400, detail=f"Invalid MAC address: {mac_address}")
+
+    location = mac_index.lookup(mac_address)
+    if location is None:
+        raise HTTPException(status_code=404, detail="MAC address not found")
+    return location
+
+
+class FleetCliRequest(BaseModel):
+    command: Optional[str] = None  # Raw CLI command; only show commands are allowed
+    query: Optional[str] = None  # Parsed query: endpoints, subscribers or ports
+    device_ids: Optional[List[UUID]] = None
+    zone_id: Optional[UUID] = None
+    model: Optional[str] = None
+
+    @field_validator('command')
+    @classmethod
+    def validate_command(cls, command: Optional[str]) -> Optional[str]:
+        if command is None:
+            return command
+        if CONTROL_CHARACTERS.search(command):
+            raise ValueError("Command must be a single line without control characters")
+        if not SHOW_COMMAND.match(command):
+            raise ValueError("Only show commands can be run fleet-wide")
+        return command
+
+
+@router.post("/fleet/cli")
+async def run_fleet_cli(request: FleetCliRequest):
+    """
+    Run a CLI command or parsed query on a selection of devices over SSH.
+
+    Devices are selected by id, zone and/or model (all devices when no filter
+    is given). Results stream back as newline-delimited JSON, one object per
+    device, in the order devices finish.
+    """
+    if (request.command is None) == (request.query is None):
+        raise HTTPException(status_code=400, detail="Give exactly one of command or query")
+    if request.query is not None and request.query not in QUERIES:
+        raise HTTPException(status_code=400, detail=f"Unknown query. Choose from: {', '.join(QUERIES)}")
+
+    devices = await cli_fanout.select_devices(request.device_ids, request.zone_id, request.model)
+    logger.info(f"Running {request.command or request.query!r} on {len(devices)} devices")
+
+    async def _stream():
+        async for result in cli_fanout.run(devices, command=request.command, query=request.query):
+            yield json.dumps(result) + '\n'
+
+    return StreamingResponse(_stream(), media_type="application/x-ndjson")
@@ -4,6 +4,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
 from ...database import get_db
+from ...services.fleet_poller import fleet_poller
+from ...services.trap_receiver import trap_receiver
+from ...services.counter_sampler import counter_sampler
+from ...utils.snmp_client import SNMPClient
 
 router = APIRouter()
 
@@ -17,6 +21,34 @@ async def health_check():
     }
 
 
+@router.get("/fleet/poll")
+async def get_fleet_poll_status():
+    """Get fleet poller configuration and the result of its last cycle"""
+    return {
+        "interval": fleet_poller.interval,
+        "health_check_interval": fleet_poller.health_check_interval,
+        "concurrency": fleet_poller.concurrency,
+        "deadline": fleet_poller.deadline,
+        "last_summary": fleet_poller.last_summary
+    }
+
+
+@router.post("/fleet/poll")
+async def run_fleet_poll():
+    """Poll every GAM device now and return the cycle summary"""
+    return await fleet_poller.poll_once()
+
+
+@router.get("/traps")
+async def get_trap_receiver_status():
+    """Get trap receiver listening address and notification counters"""
+    return {
+        "host": trap_receiver.host,
+        "port": trap_receiver.port,
+        "stats": trap_receiver.stats
+    }
+
+
 @router.get("/devices/{device_id}/metrics")
 async def get_device_metrics(
     device_id: UUID,
@@ -32,3 +64,23 @@ async def get_device_metrics(
             "uptime": 0
         }
     }
+
+
+@router.get("/devices/{device_id}/throughput")
+async def get_device_throughput(device_id: UUID):
+    """
+    Get the latest per-port throughput of a device.
+    Rates are computed from successive fleet poller counter samples.
+    """
+    rates = counter_sampler.get_rates(device_id)
+    return {
+        "device_id": str(device_id),
+        "ports": [
+            {
+                "interface_index": if_index,
+                "port_number": SNMPClient.port_number_for_if_index(if_index),
+                **rate
+            }
+            for if_index, rate in sorted(rates.items())
+        ]
+    }
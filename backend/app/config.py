@@ -18,12 +18,33 @@ class Settings(BaseSettings):
     
     # SNMP Configuration
     default_snmp_community: str = "public"
-    snmp_timeout: int = 10
+    snmp_timeout: int = 10  # Upper bound; the per-device timeout adapts to measured RTT
     snmp_retries: int = 3
+    snmp_min_timeout: float = 0.2  # Lower bound on the adaptive per-device timeout (seconds)
+    snmp_breaker_threshold: int = 3  # Consecutive failed requests before a device is suspended
+    snmp_breaker_backoff: int = 30  # First suspension (seconds), doubled on each failed probe
+    snmp_breaker_max_backoff: int = 1800  # Longest suspension (seconds)
+    snmp_target_cache_size: int = 256  # Max cached per-device transport targets
+    snmp_target_idle_timeout: int = 900  # Evict cached targets idle this long (seconds)
+    snmp_max_varbinds_per_pdu: int = 32  # Starting varbinds per GET; halved on tooBig
+    snmp_bulk_max_repetitions: int = 40  # Varbinds per GETBULK, shared across walked columns
     
     # SSH Configuration
     ssh_timeout: int = 30
     ssh_connection_timeout: int = 10
+    ssh_pool_max_sessions_per_device: int = 1  # Open or in-use SSH sessions per device; 1 serializes CLI access
+    ssh_pool_idle_timeout: int = 300  # Close pooled SSH sessions idle this long (seconds)
+    ssh_keepalive_interval: int = 30  # Keepalive period for pooled SSH sessions (seconds)
+    ssh_worker_threads: int = 16  # Threads running blocking SSH I/O off the event loop
+    cli_fanout_concurrency: int = 16  # Max devices a fleet-wide CLI run works on at once
+    cli_fanout_device_timeout: int = 60  # Per-device limit for a fleet-wide CLI run (seconds)
+    config_cache_max_age: int = 3600  # Re-read a cached running-config after this long (seconds)
+
+    # GAM JSON-RPC API (devices with management_api = json_rpc)
+    gam_jsonrpc_scheme: str = "http"
+    gam_jsonrpc_timeout: int = 10  # Per-call limit (seconds)
+    gam_jsonrpc_max_connections: int = 100  # HTTP connections open at once, across all devices
+    gam_jsonrpc_keepalive_expiry: int = 30  # Close idle keep-alive connections after this long (seconds)
     
     # Sonar Integration
     sonar_api_url: Optional[str] = None
@@ -38,7 +59,18 @@ class Settings(BaseSettings):
     
     # Monitoring
     monitoring_interval: int = 300  # 5 minutes
-    health_check_interval: int = 60  # 1 minute
+    health_check_interval: int = 60  # Status-only fleet poll between full cycles (seconds)
+    fleet_poll_enabled: bool = True
+    fleet_poll_concurrency: int = 50  # Max devices polled at once
+    fleet_poll_jitter: float = 2.0  # Max random delay before each device poll (seconds)
+    fleet_poll_deadline: int = 120  # Cancel device polls still running after this (seconds)
+    fleet_poll_fdb: bool = True  # Walk each device's bridge FDB into the MAC location index
+    fleet_poll_fdb_q_bridge: bool = False  # Use Q-BRIDGE so MAC locations carry the VLAN
+    counter_sampling_enabled: bool = True  # Sample G.hn port octet counters on each poll
+    mac_index_persist_interval: int = 900  # Rewrite an unmoved MAC's last_seen at most this often (seconds)
+    trap_receiver_enabled: bool = False  # Listen for SNMP traps and informs from GAM devices
+    trap_receiver_host: str = "0.0.0.0"
+    trap_receiver_port: int = 10162  # Unprivileged UDP port; map 162 onto it in deployment
     
     # Email Alerts
     alert_email_enabled: bool = False
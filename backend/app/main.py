@@ -6,7 +6,13 @@ import logging
 import time
 
 from .config import settings
-from .database import init_db, close_db
+from .database import init_db, close_db, AsyncSessionLocal
+from .utils.snmp_engine import snmp_registry
+from .utils.ssh_pool import ssh_pool
+from .utils.gam_jsonrpc import jsonrpc_pool
+from .services.fleet_poller import fleet_poller
+from .services.mac_index import mac_index
+from .services.trap_receiver import trap_receiver
 from .api.v1 import auth, gam, subscribers, provisioning, monitoring, integration
 
 # Configure logging
@@ -24,11 +30,22 @@ async def lifespan(app: FastAPI):
     logger.info("Starting Positron GAM Management System...")
     await init_db()
     logger.info("Database initialized")
+    async with AsyncSessionLocal() as session:
+        await mac_index.load(session)
+    if settings.fleet_poll_enabled:
+        fleet_poller.start()
+    if settings.trap_receiver_enabled:
+        await trap_receiver.start()
 
     yield
 
     # Shutdown
     logger.info("Shutting down Positron GAM Management System...")
+    await trap_receiver.stop()
+    await fleet_poller.stop()
+    snmp_registry.clear()
+    await ssh_pool.clear()
+    await jsonrpc_pool.aclose()
     await close_db()
     logger.info("Database connections closed")
 
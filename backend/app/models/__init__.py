@@ -6,6 +6,9 @@ from .bandwidth import BandwidthPlan
 from .integration import ExternalSystem, SyncJob
 from .zone import Zone
 from .odb import ODBSplitter
+from .mac_location import MACLocation
+from .device_config import DeviceConfig
+from .port_index import GAMPortIndex
 
 __all__ = [
     "User",
@@ -16,5 +19,8 @@ __all__ = [
     "ExternalSystem",
     "SyncJob",
     "Zone",
-    "ODBSplitter"
+    "ODBSplitter",
+    "MACLocation",
+    "DeviceConfig",
+    "GAMPortIndex"
 ]
@@ -44,10 +44,8 @@ class BandwidthPlan(Base):
     def __repr__(self):
         return f"<BandwidthPlan(name='{self.name}', down={self.downstream_mbps}, up={self.upstream_mbps})>"
 
-    @property
-    def subscriber_count(self):
-        """Get count of subscribers using this plan"""
-        return len([s for s in self.subscribers if s.status == "active"])
+    # subscriber_count: count of active subscribers on this plan, a
+    # column_property loaded with the plan (defined in subscriber.py)
 
     @property
     def speed_description(self):
@@ -0,0 +1,27 @@
+"""
+Cached GAM running-config model
+"""
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+
+from ..database import Base
+
+
+class DeviceConfig(Base):
+    """Last fetched running-config of a GAM device and its parsed form"""
+
+    __tablename__ = "device_configs"
+
+    gam_device_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("gam_devices.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    config_hash = Column(String(64), nullable=False)  # SHA-256 of running_config
+    running_config = Column(Text, nullable=False)
+    parsed = Column(JSONB, nullable=False)  # endpoints, subscribers, bw_profiles, vlans
+    fetched_at = Column(DateTime(timezone=True), nullable=False)  # Last time the device was read
+    changed_at = Column(DateTime(timezone=True), nullable=False)  # Last time config_hash changed
+
+    def __repr__(self):
+        return f"<DeviceConfig(device={self.gam_device_id}, hash={self.config_hash[:12]})>"
@@ -48,10 +48,18 @@ class GAMDevice(Base):
     
     # Connection settings
     snmp_community = Column(String(100), nullable=False, default="public")
+    snmp_version = Column(String(3), nullable=False, default="v2c")  # v2c or v3
+    snmp_v3_username = Column(String(32), nullable=True)
+    snmp_v3_auth_protocol = Column(String(10), nullable=True)  # md5, sha, sha224, sha256, sha384, sha512
+    snmp_v3_auth_password = Column(String(255), nullable=True)  # (should be encrypted in production)
+    snmp_v3_priv_protocol = Column(String(10), nullable=True)  # des, aes
+    snmp_v3_priv_password = Column(String(255), nullable=True)  # (should be encrypted in production)
     ssh_credentials = Column(JSONB, nullable=True)  # Store encrypted credentials (legacy)
     ssh_username = Column(String(100), nullable=True)  # SSH username for CLI access
     ssh_password = Column(String(255), nullable=True)  # SSH password (should be encrypted in production)
     ssh_port = Column(Integer, nullable=False, default=22)  # SSH port
+    management_api = Column(String(10), nullable=False, default="cli")  # cli or json_rpc
+    api_port = Column(Integer, nullable=False, default=80)  # JSON-RPC (web) port
     management_vlan = Column(Integer, nullable=False, default=4093)
     
     # Device info
@@ -90,10 +98,8 @@ class GAMDevice(Base):
             return 4
         return 0
 
-    @property
-    def active_subscribers(self):
-        """Get count of active subscribers"""
-        return len([s for s in self.subscribers if s.status == "active"])
+    # active_subscribers: count of active subscribers, a column_property
+    # loaded with the device (defined in subscriber.py)
 
     @property
     def is_coax_model(self):
@@ -141,6 +147,9 @@ class GAMPort(Base):
     def __repr__(self):
         return f"<GAMPort(device='{self.device.name}', port={self.port_number}, status='{self.status}')>"
 
+    # subscriber_count: count of active subscribers on this port, a
+    # column_property loaded with the port (defined in subscriber.py)
+
     @property
     def is_available(self):
         """Check if port is available for new subscriber"""
@@ -149,13 +158,7 @@ class GAMPort(Base):
         
         # For coax ports, can have multiple subscribers (up to 16)
         if self.port_type == PortType.COAX:
-            active_subscribers = len([s for s in self.subscribers if s.status == "active"])
-            return active_subscribers < 16
+            return self.subscriber_count < 16
         
         # For copper ports (MIMO/SISO), only one subscriber per port
-        return len([s for s in self.subscribers if s.status == "active"]) == 0
-
-    @property
-    def subscriber_count(self):
-        """Get count of active subscribers on this port"""
-        return len([s for s in self.subscribers if s.status == "active"])
+        return self.subscriber_count == 0
@@ -0,0 +1,30 @@
+"""
+MAC address location index model
+"""
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+
+from ..database import Base
+
+
+class MACLocation(Base):
+    """Last known attachment point of a MAC address in the GAM fleet"""
+
+    __tablename__ = "mac_locations"
+
+    mac_address = Column(String(17), primary_key=True)  # Lowercase, colon separated
+    gam_device_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("gam_devices.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+    bridge_port = Column(Integer, nullable=True)  # dot1dBasePort the MAC was learned on
+    interface_index = Column(Integer, nullable=True)  # ifIndex behind the bridge port
+    port_number = Column(Integer, nullable=True)  # G.hn port reported by endpoint discovery
+    vlan_id = Column(Integer, nullable=True)  # Only known from Q-BRIDGE walks
+    source = Column(String(20), nullable=False)  # fdb, ghn_discover
+    last_seen = Column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self):
+        return f"<MACLocation(mac={self.mac_address}, device={self.gam_device_id}, ifIndex={self.interface_index})>"
@@ -43,8 +43,10 @@ class ODBSplitter(Base):
     def __repr__(self):
         return f"<ODBSplitter(name='{self.name}', type='{self.splitter_type}')>"
 
+    # active_subscribers: count of active subscribers on this splitter, a
+    # column_property loaded with the splitter (defined in subscriber.py)
+
     @property
     def available_ports(self):
         """Get count of available ports"""
-        active_subscribers = len([s for s in self.subscribers if s.status == "active"])
-        return self.port_count - active_subscribers
+        return self.port_count - self.active_subscribers
@@ -0,0 +1,35 @@
+"""
+GAM port SNMP index mapping model
+"""
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+
+from ..database import Base
+
+
+class GAMPortIndex(Base):
+    """
+    Which port a row of the GAM's Positron port table describes.
+
+    Learned the first time a device's ports are synced and kept, so every
+    later sync maps the same SNMP index to the same port.
+    """
+
+    __tablename__ = "gam_port_indexes"
+    __table_args__ = (
+        # A port is described by one row only
+        UniqueConstraint("gam_device_id", "port_number", name="uq_gam_port_indexes_device_port"),
+    )
+
+    gam_device_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("gam_devices.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    snmp_index = Column(Integer, primary_key=True)  # Port table row index (an ifIndex)
+    port_number = Column(Integer, nullable=False)
+    learned_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<GAMPortIndex(device={self.gam_device_id}, index={self.snmp_index}, port={self.port_number})>"
@@ -1,8 +1,11 @@
-from sqlalchemy import Column, String, Integer, DateTime, Boolean, ForeignKey, Enum, Float
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, Boolean, ForeignKey, Enum, Float, Index, select
 from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, column_property
 from sqlalchemy.sql import func
 from ..database import Base
+from .gam import GAMDevice, GAMPort
+from .bandwidth import BandwidthPlan
+from .odb import ODBSplitter
 import uuid
 import enum
 
@@ -17,6 +20,13 @@ class SubscriberStatus(str, enum.Enum):
 
 class Subscriber(Base):
     __tablename__ = "subscribers"
+    __table_args__ = (
+        # Back the active-subscriber counts below
+        Index("ix_subscribers_gam_device_id_status", "gam_device_id", "status"),
+        Index("ix_subscribers_gam_port_id_status", "gam_port_id", "status"),
+        Index("ix_subscribers_odb_splitter_id_status", "odb_splitter_id", "status"),
+        Index("ix_subscribers_bandwidth_plan_id_status", "bandwidth_plan_id", "status"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String(255), nullable=False)
@@ -57,8 +67,8 @@ class Subscriber(Base):
     external_system = Column(String(50), nullable=True)  # "sonar" or "splynx"
     
     # Service Statistics
-    bytes_downloaded = Column(Integer, default=0, nullable=False)
-    bytes_uploaded = Column(Integer, default=0, nullable=False)
+    bytes_downloaded = Column(BigInteger, default=0, nullable=False)
+    bytes_uploaded = Column(BigInteger, default=0, nullable=False)
     last_activity = Column(DateTime(timezone=True), nullable=True)
     connection_uptime = Column(Integer, default=0, nullable=False)  # Seconds
     
@@ -145,3 +155,21 @@ class Subscriber(Base):
             config["remapped_vlan"] = self.remapped_vid
             
         return config
+
+
+def _active_subscriber_count(foreign_key, parent_id):
+    """Correlated count of the active subscribers whose foreign_key is parent_id"""
+    return column_property(
+        select(func.count(Subscriber.id))
+        .where(foreign_key == parent_id, Subscriber.status == SubscriberStatus.ACTIVE)
+        .correlate_except(Subscriber)
+        .scalar_subquery()
+    )
+
+
+# Loaded in the same query as the rows they describe, so listing ports or
+# checking availability needs no per-row relationship loads
+GAMDevice.active_subscribers = _active_subscriber_count(Subscriber.gam_device_id, GAMDevice.id)
+GAMPort.subscriber_count = _active_subscriber_count(Subscriber.gam_port_id, GAMPort.id)
+ODBSplitter.active_subscribers = _active_subscriber_count(Subscriber.odb_splitter_id, ODBSplitter.id)
+BandwidthPlan.subscriber_count = _active_subscriber_count(Subscriber.bandwidth_plan_id, BandwidthPlan.id)
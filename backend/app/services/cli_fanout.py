@@ -0,0 +1,162 @@
+"""Fleet-wide CLI fan-out over SSH"""
+from sqlalchemy import select
+from typing import List, Optional, Dict, Any, AsyncIterator
+from uuid import UUID
+import asyncio
+import logging
+import re
+import time
+
+from ..database import AsyncSessionLocal
+from ..models.gam import GAMDevice
+from ..utils.ssh_client import SSHClient
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Parsed queries: name -> (CLI command, SSHClient parser method)
+QUERIES = {
+    'endpoints': ('show ghn discover all', '_parse_ghn_discover_output'),
+    'subscribers': ('show running-config', '_parse_ghn_subscriber_from_config'),
+    'ports': ('show ghn port', '_parse_ghn_port_output'),
+}
+
+# Raw commands are limited to show commands; nothing fleet-wide may change config
+SHOW_COMMAND = re.compile(r'^\s*show\s', re.IGNORECASE)
+
+
+class CliFanout:
+    """
+    Runs a CLI command or parsed query against many GAM devices at once.
+
+    At most `concurrency` devices are worked on at a time and each device
+    gets `timeout` seconds, including waiting for its SSH session. Results
+    are yielded as each device finishes, so a slow or dead device never
+    holds back the others; it just reports its own failure.
+    """
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        concurrency: Optional[int] = None,
+        timeout: Optional[float] = None
+    ):
+        self.session_factory = session_factory
+        self.concurrency = concurrency or settings.cli_fanout_concurrency
+        self.timeout = timeout or settings.cli_fanout_device_timeout
+
+    async def select_devices(
+        self,
+        device_ids: Optional[List[UUID]] = None,
+        zone_id: Optional[UUID] = None,
+        model: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Snapshot the connection fields of the selected devices (all when no filter is given)"""
+        query = select(
+            GAMDevice.id,
+            GAMDevice.name,
+            GAMDevice.ip_address,
+            GAMDevice.ssh_username,
+            GAMDevice.ssh_password,
+            GAMDevice.ssh_port,
+            GAMDevice.ssh_credentials
+        )
+        if device_ids:
+            query = query.where(GAMDevice.id.in_(device_ids))
+        if zone_id:
+            query = query.where(GAMDevice.zone_id == zone_id)
+        if model:
+            query = query.where(GAMDevice.model.ilike(model))
+
+        async with self.session_factory() as session:
+            result = await session.execute(query.order_by(GAMDevice.name))
+            return [dict(row._mapping) for row in result.all()]
+
+    async def run(
+        self,
+        devices: List[Dict[str, Any]],
+        command: Optional[str] = None,
+        query: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run command (raw output) or query (parsed, see QUERIES) on each device.
+
+        Yields one result per device in completion order. Stopping the
+        iteration early cancels the devices still running. Raises
+        ValueError for anything but a show command.
+        """
+        if (command is None) == (query is None):
+            raise ValueError("Give exactly one of command or query")
+        if command is not None and not SHOW_COMMAND.match(command):
+            raise ValueError("Only show commands can be run fleet-wide")
+        if query is not None and query not in QUERIES:
+            raise ValueError(f"Unknown query: {query}")
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def _run(device: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.run_device(device, command, query)
+
+        tasks = [asyncio.create_task(_run(device)) for device in devices]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def run_device(
+        self,
+        device: Dict[str, Any],
+        command: Optional[str] = None,
+        query: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Run a command or query on one device, never raising"""
+        started = time.monotonic()
+        result = {
+            'device_id': str(device['id']),
+            'device_name': device['name'],
+            'ip_address': device['ip_address'],
+            'success': False
+        }
+
+        ssh_client = SSHClient.for_device(device)
+        if ssh_client is None:
+            result['error'] = 'SSH credentials not configured'
+            return result
+
+        cli_command, parser = QUERIES[query] if query is not None else (command, None)
+        try:
+            output = await asyncio.wait_for(self._execute(ssh_client, cli_command), self.timeout)
+            if parser is not None:
+                result['data'] = getattr(ssh_client, parser)(output)
+            else:
+                result['output'] = output
+            result['success'] = True
+        except asyncio.TimeoutError:
+            result['error'] = f"Timed out after {self.timeout}s"
+        except Exception as e:
+            result['error'] = str(e)
+
+        result['duration'] = round(time.monotonic() - started, 3)
+        if not result['success']:
+            logger.warning(f"CLI fan-out to {device['name']} failed: {result['error']}")
+        return result
+
+    @staticmethod
+    async def _execute(ssh_client: SSHClient, command: str) -> str:
+        if not await ssh_client.connect():
+            raise ConnectionError("SSH connection failed")
+        try:
+            response = await ssh_client.execute(command)
+        finally:
+            await ssh_client.disconnect()
+        if not response['success']:
+            raise RuntimeError(response['stderr'] or 'Command failed')
+        return response['stdout']
+
+
+# Global fan-out executor
+cli_fanout = CliFanout()
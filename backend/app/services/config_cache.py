@@ -0,0 +1,144 @@
+"""Per-device running-config cache"""
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, Dict, List, Any
+from datetime import datetime, timezone, timedelta
+import hashlib
+import logging
+
+from ..database import AsyncSessionLocal
+from ..models.device_config import DeviceConfig
+from ..models.gam import GAMDevice
+from ..utils.ssh_client import SSHClient, config_write_listeners
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever a running-config parser changes, so stored parses made by
+# an older version are redone rather than served
+PARSE_VERSION = 2
+
+
+def parse_running_config(ssh_client: SSHClient, running_config: str) -> Dict[str, Any]:
+    """Extract the G.hn endpoints, subscribers, bandwidth profiles and VLANs from a running-config"""
+    return {
+        'version': PARSE_VERSION,
+        'endpoints': ssh_client._parse_ghn_endpoint_from_config(running_config),
+        'subscribers': ssh_client._parse_ghn_subscriber_from_config(running_config),
+        'bw_profiles': ssh_client._parse_ghn_bw_profile_from_config(running_config),
+        'vlans': ssh_client._parse_vlans_from_config(running_config)
+    }
+
+
+class RunningConfigCache:
+    """
+    Keeps each device's running-config, and its parsed form, in the
+    device_configs table.
+
+    A cached config is served without touching the device until it is
+    invalidated or older than max_age. Any configuration command sent
+    through SSHClient invalidates the device's entry, so our own changes
+    are always seen; max_age bounds how long a change made outside this
+    system (e.g. on the device CLI) can go unnoticed. On refresh the config
+    is hashed, and when the hash is unchanged only fetched_at is updated and
+    the stored parse is reused, unless it was made by an older parser.
+    """
+
+    def __init__(self, session_factory=AsyncSessionLocal, max_age: Optional[int] = None):
+        self.session_factory = session_factory
+        self.max_age = timedelta(seconds=settings.config_cache_max_age if max_age is None else max_age)
+        # Device IP -> when a configuration command was last sent to it
+        self._written_at: Dict[str, datetime] = {}
+
+    def invalidate(self, ip_address: str):
+        """Mark a device's cached config as outdated"""
+        self._written_at[ip_address] = datetime.now(timezone.utc)
+
+    def is_fresh(self, device: GAMDevice, entry: Optional[DeviceConfig]) -> bool:
+        if entry is None or not self._parse_is_current(entry):
+            return False
+        written_at = self._written_at.get(device.ip_address)
+        if written_at is not None and written_at >= entry.fetched_at:
+            return False
+        return datetime.now(timezone.utc) - entry.fetched_at < self.max_age
+
+    async def get(self, db: AsyncSession, device: GAMDevice, refresh: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Get a device's running-config and its parse, fetching it over SSH
+        only when the cached copy is missing, invalidated or expired.
+
+        Returns None when the config could not be fetched. The caller
+        commits the session.
+        """
+        entry = await db.get(DeviceConfig, device.id)
+        if not refresh and self.is_fresh(device, entry):
+            return self._present(entry, cached=True)
+
+        ssh_client = SSHClient.for_device(device)
+        if ssh_client is None:
+            logger.error(f"No SSH credentials for device {device.name}")
+            return None
+
+        fetched_at = datetime.now(timezone.utc)
+        running_config = await ssh_client.get_running_config()
+        if running_config is None:
+            return None
+
+        config_hash = hashlib.sha256(running_config.encode()).hexdigest()
+        if entry is not None and entry.config_hash == config_hash and self._parse_is_current(entry):
+            entry.fetched_at = fetched_at
+            logger.debug(f"Running-config of {device.name} unchanged")
+            return self._present(entry, cached=False)
+
+        values = {
+            'gam_device_id': device.id,
+            'config_hash': config_hash,
+            'running_config': running_config,
+            'parsed': parse_running_config(ssh_client, running_config),
+            'fetched_at': fetched_at,
+            'changed_at': fetched_at
+        }
+        statement = insert(DeviceConfig).values(**values)
+        await db.execute(statement.on_conflict_do_update(
+            index_elements=[DeviceConfig.gam_device_id],
+            set_={key: statement.excluded[key] for key in values if key != 'gam_device_id'}
+        ))
+        logger.info(f"Running-config of {device.name} changed ({config_hash[:12]})")
+        return {**values, 'cached': False}
+
+    async def get_subscribers(self, device_id: Any) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get the subscribers configured on a device, from its cached
+        running-config when fresh. Uses a session of its own.
+        """
+        async with self.session_factory() as db:
+            device = await db.get(GAMDevice, device_id)
+            if device is None:
+                logger.error(f"Device {device_id} not found")
+                return None
+            device_config = await self.get(db, device)
+            await db.commit()
+        if device_config is None:
+            return None
+        return device_config['parsed']['subscribers']
+
+    @staticmethod
+    def _parse_is_current(entry: DeviceConfig) -> bool:
+        return (entry.parsed or {}).get('version') == PARSE_VERSION
+
+    @staticmethod
+    def _present(entry: DeviceConfig, cached: bool) -> Dict[str, Any]:
+        return {
+            'gam_device_id': entry.gam_device_id,
+            'config_hash': entry.config_hash,
+            'running_config': entry.running_config,
+            'parsed': entry.parsed,
+            'fetched_at': entry.fetched_at,
+            'changed_at': entry.changed_at,
+            'cached': cached
+        }
+
+
+# Global running-config cache
+config_cache = RunningConfigCache()
+config_write_listeners.append(config_cache.invalidate)
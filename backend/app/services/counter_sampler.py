@@ -0,0 +1,132 @@
+"""Interface octet counter sampling and throughput rates"""
+from typing import Optional, Dict, Any, Tuple
+from datetime import datetime, timezone
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# sysUpTime is a 32-bit TimeTicks value in hundredths of a second
+TICKS_MODULUS = 2 ** 32
+TICKS_PER_SECOND = 100
+
+# A delta implying more than this is a counter discontinuity, not traffic
+MAX_PLAUSIBLE_BPS = 10 ** 10
+
+
+class _PortCounters:
+    """Last sample and rate for one interface; fixed size regardless of history"""
+
+    __slots__ = ('in_octets', 'out_octets', 'bits', 'uptime', 'monotonic', 'sampled_at', 'in_bps', 'out_bps')
+
+    def __init__(self, in_octets: int, out_octets: int, bits: int, uptime: int, monotonic: float, sampled_at: datetime):
+        self.in_octets = in_octets
+        self.out_octets = out_octets
+        self.bits = bits
+        self.uptime = uptime
+        self.monotonic = monotonic
+        self.sampled_at = sampled_at
+        self.in_bps: Optional[float] = None
+        self.out_bps: Optional[float] = None
+
+
+class CounterSampler:
+    """
+    Turns successive ifIn/OutOctets samples into byte deltas and bps rates.
+
+    Only the previous sample is kept per interface. Deltas are taken modulo
+    the counter width so 32- and 64-bit wraparound is handled, and the interval
+    is measured in agent time (sysUpTime) so network delay does not skew
+    rates. A sysUpTime that goes backwards means the agent restarted and its
+    counters were reset, so the sample only re-seeds the baseline.
+    """
+
+    def __init__(self):
+        self._devices: Dict[Any, Dict[int, _PortCounters]] = {}
+
+    def update(
+        self,
+        device_id: Any,
+        uptime: int,
+        counters: Dict[int, Tuple[int, int, int]]
+    ) -> Dict[int, Tuple[int, int]]:
+        """
+        Record a sample from SNMPClient.get_port_counters.
+
+        Returns {ifIndex: (in_bytes, out_bytes)} transferred since the previous
+        sample, for interfaces where a trustworthy delta could be computed.
+        """
+        ports = self._devices.setdefault(device_id, {})
+        now = time.monotonic()
+        sampled_at = datetime.now(timezone.utc)
+        deltas: Dict[int, Tuple[int, int]] = {}
+
+        for if_index, (in_octets, out_octets, bits) in counters.items():
+            previous = ports.get(if_index)
+            current = _PortCounters(in_octets, out_octets, bits, uptime, now, sampled_at)
+            ports[if_index] = current
+
+            if previous is None or previous.bits != bits:
+                continue
+
+            elapsed = self._elapsed(previous, uptime, now)
+            if elapsed is None:
+                logger.info(f"Counters reset on {device_id} ifIndex {if_index} (agent restarted)")
+                continue
+            if elapsed <= 0:
+                # Same agent timestamp: a repeated sample, keep the old rate
+                current.in_bps, current.out_bps = previous.in_bps, previous.out_bps
+                continue
+
+            modulus = 2 ** bits
+            in_delta = (in_octets - previous.in_octets) % modulus
+            out_delta = (out_octets - previous.out_octets) % modulus
+
+            if max(in_delta, out_delta) * 8 / elapsed > MAX_PLAUSIBLE_BPS:
+                logger.warning(f"Discarding implausible counter jump on {device_id} ifIndex {if_index}")
+                continue
+
+            current.in_bps = in_delta * 8 / elapsed
+            current.out_bps = out_delta * 8 / elapsed
+            deltas[if_index] = (in_delta, out_delta)
+
+        return deltas
+
+    def get_rates(self, device_id: Any) -> Dict[int, Dict[str, Any]]:
+        """Get the latest rate per interface of a device"""
+        return {
+            if_index: {
+                'in_bps': state.in_bps,
+                'out_bps': state.out_bps,
+                'in_octets': state.in_octets,
+                'out_octets': state.out_octets,
+                'counter_bits': state.bits,
+                'sampled_at': state.sampled_at
+            }
+            for if_index, state in self._devices.get(device_id, {}).items()
+        }
+
+    def remove_device(self, device_id: Any):
+        """Drop all counter state for a device"""
+        self._devices.pop(device_id, None)
+
+    @staticmethod
+    def _elapsed(previous: _PortCounters, uptime: int, now: float) -> Optional[float]:
+        """Seconds between samples in agent time, or None if the agent restarted"""
+        ticks = uptime - previous.uptime
+        wall_ticks = (now - previous.monotonic) * TICKS_PER_SECOND
+        if ticks < 0:
+            # sysUpTime itself wraps after ~497 days; that looks like a huge
+            # backwards step right at the top of the range, unlike a reboot
+            if previous.uptime + wall_ticks * 2 < TICKS_MODULUS:
+                return None
+            ticks += TICKS_MODULUS
+        elif wall_ticks > 10 * TICKS_PER_SECOND and ticks < wall_ticks / 2:
+            # Agent clock advanced far less than ours: it restarted and has
+            # already been up longer than the previous sample's uptime
+            return None
+        return ticks / TICKS_PER_SECOND
+
+
+# Global sampler fed by the fleet poller
+counter_sampler = CounterSampler()
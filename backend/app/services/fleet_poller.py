@@ -0,0 +1,327 @@
+"""Fleet-wide SNMP poller for GAM devices"""
+from sqlalchemy import select, update, and_, bindparam, func
+from typing import List, Optional, Dict, Any
+from datetime import datetime, timezone
+import asyncio
+import logging
+import random
+import time
+
+from ..database import AsyncSessionLocal
+from ..models.gam import GAMDevice, GAMPort, DeviceStatus
+from ..models.subscriber import Subscriber, SubscriberStatus
+from ..utils.snmp_client import SNMPClient
+from ..utils.snmp_engine import SnmpError
+from .mac_index import mac_index
+from .counter_sampler import counter_sampler
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class FleetPoller:
+    """
+    Polls every GAM device concurrently on a fixed interval.
+
+    Each cycle loads the device list, polls devices in parallel (at most
+    `concurrency` at a time, each delayed by a random jitter so requests do
+    not arrive in lockstep), cancels whatever is still running when the cycle
+    deadline passes, and writes all results back in one transaction. Devices
+    cancelled at the deadline are written back as ERROR.
+
+    A full cycle (status, FDB walk and counter sampling) runs every
+    `interval` seconds. In between, a health check cycle every
+    `health_check_interval` seconds only reads system info, so a device
+    going down or coming back is noticed well before the next full cycle.
+    """
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        interval: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        jitter: Optional[float] = None,
+        deadline: Optional[float] = None,
+        health_check_interval: Optional[int] = None
+    ):
+        self.session_factory = session_factory
+        self.interval = interval or settings.monitoring_interval
+        self.concurrency = concurrency or settings.fleet_poll_concurrency
+        self.jitter = settings.fleet_poll_jitter if jitter is None else jitter
+        self.deadline = deadline or settings.fleet_poll_deadline
+        self.health_check_interval = health_check_interval or settings.health_check_interval
+        self.last_summary: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the background polling loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info(
+                f"Fleet poller started (interval={self.interval}s, "
+                f"health checks every {self.health_check_interval}s, "
+                f"concurrency={self.concurrency}, deadline={self.deadline}s)"
+            )
+
+    async def stop(self):
+        """Stop the background polling loop"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("Fleet poller stopped")
+
+    async def _run(self):
+        period = min(self.interval, self.health_check_interval)
+        last_full: Optional[float] = None
+        while True:
+            started = time.monotonic()
+            # Half a period of slack, so sleep drift cannot push a full cycle
+            # back by a whole period
+            full = last_full is None or started - last_full >= self.interval - period / 2
+            if full:
+                last_full = started
+            try:
+                await self.poll_once(full=full)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Fleet poll cycle failed: {e}", exc_info=True)
+
+            elapsed = time.monotonic() - started
+            await asyncio.sleep(max(0.0, period - elapsed))
+
+    async def poll_once(self, full: bool = True) -> Dict[str, Any]:
+        """
+        Run one poll cycle over the whole fleet and persist the results.
+        With full=False only device status is polled (a health check).
+        """
+        started = time.monotonic()
+        devices = await self._load_devices(full)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def _poll(device: Dict[str, Any]) -> Dict[str, Any]:
+            # Spread requests out so the whole fleet is not hit at the same instant
+            if self.jitter:
+                await asyncio.sleep(random.uniform(0, self.jitter))
+            async with semaphore:
+                return await self.poll_device(device, full)
+
+        tasks = {asyncio.create_task(_poll(device)): device for device in devices}
+        results: List[Dict[str, Any]] = []
+        timed_out = 0
+
+        if tasks:
+            done, pending = await asyncio.wait(tasks, timeout=self.deadline)
+
+            # Past the deadline: abandon stragglers rather than delay the whole fleet
+            for task in pending:
+                task.cancel()
+                timed_out += 1
+                device = tasks[task]
+                logger.warning(f"Poll of {device['name']} cancelled at cycle deadline")
+                results.append({'id': device['id'], 'status': DeviceStatus.ERROR})
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+            for task in done:
+                if task.exception() is not None:
+                    device = tasks[task]
+                    logger.error(f"Poll of {device['name']} failed: {task.exception()}")
+                    results.append({'id': device['id'], 'status': DeviceStatus.ERROR})
+                else:
+                    results.append(task.result())
+
+        suspended = sum(1 for r in results if r.get('suspended'))
+        await self._store_results(results)
+
+        summary = {
+            'type': 'full' if full else 'health_check',
+            'devices': len(devices),
+            'online': sum(1 for r in results if r['status'] == DeviceStatus.ONLINE),
+            'offline': sum(1 for r in results if r['status'] == DeviceStatus.OFFLINE),
+            'error': sum(1 for r in results if r['status'] == DeviceStatus.ERROR),
+            'unconfirmed': sum(1 for r in results if r['status'] is None),
+            'suspended': suspended,
+            'timed_out': timed_out,
+            'duration': round(time.monotonic() - started, 3)
+        }
+        self.last_summary = summary
+        logger.info(f"Fleet poll complete: {summary}")
+        return summary
+
+    async def poll_device(self, device: Dict[str, Any], full: bool = True) -> Dict[str, Any]:
+        """
+        Poll a single device; without full, only its status and uptime.
+
+        Returns the column values to write back for it, keyed by column name
+        and including the device id.
+        """
+        snmp_client = SNMPClient.for_device(device)
+        if await snmp_client.circuit_open():
+            # Known unreachable and still backing off: no traffic at all
+            return {'id': device['id'], 'status': DeviceStatus.OFFLINE, 'suspended': True}
+
+        # When the breaker is half-open this is the single probe that closes
+        # it again; the FDB walk and counters only follow a success
+        system_info = await snmp_client.get_system_info()
+
+        if system_info.get('uptime'):
+            if full and settings.fleet_poll_fdb:
+                await self._index_fdb(snmp_client, device)
+            result = {
+                'id': device['id'],
+                'status': DeviceStatus.ONLINE,
+                'uptime': SNMPClient.uptime_seconds(system_info['uptime']),
+                'last_seen': datetime.now(timezone.utc)
+            }
+            if full and settings.counter_sampling_enabled and device.get('ports'):
+                result['subscriber_usage'] = await self._sample_counters(snmp_client, device)
+            return result
+
+        if not await snmp_client.circuit_open():
+            # Not yet enough consecutive failures to call it down: one lost
+            # poll on a lossy link should not flap the device status
+            return {'id': device['id'], 'status': None}
+        return {'id': device['id'], 'status': DeviceStatus.OFFLINE}
+
+    async def _index_fdb(self, snmp_client: SNMPClient, device: Dict[str, Any]):
+        """Feed the device's bridge FDB into the MAC location index"""
+        entries = []
+        try:
+            async for entry in snmp_client.walk_fdb(q_bridge=settings.fleet_poll_fdb_q_bridge):
+                entries.append(entry)
+        except SnmpError as e:
+            # Index what was walked; the device itself still answered
+            logger.warning(f"FDB walk of {device['name']} stopped early: {e}")
+
+        moved = mac_index.update_from_fdb(device['id'], device['name'], entries)
+        if moved:
+            logger.debug(f"{moved} MAC locations changed on {device['name']}")
+
+    async def _sample_counters(self, snmp_client: SNMPClient, device: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Sample the G.hn port counters and attribute the traffic since the
+        previous sample to subscribers.
+
+        Port counters cannot be split between several endpoints, so bytes are
+        only attributed on ports with exactly one active subscriber.
+        """
+        if_indexes = {SNMPClient.GHN_IF_INDEX_BASE + port: port for port in device['ports']}
+        sample = await snmp_client.get_port_counters(list(if_indexes))
+        if sample is None:
+            return []
+
+        deltas = counter_sampler.update(device['id'], sample['uptime'], sample['counters'])
+
+        usage = []
+        for if_index, (in_bytes, out_bytes) in deltas.items():
+            subscribers = device['ports'][if_indexes[if_index]]
+            if len(subscribers) == 1 and (in_bytes or out_bytes):
+                # Out of the GAM port is towards the subscriber
+                usage.append({'sub_id': subscribers[0], 'downloaded': out_bytes, 'uploaded': in_bytes})
+        return usage
+
+    async def _load_devices(self, full: bool = True) -> List[Dict[str, Any]]:
+        """
+        Snapshot the fields needed for polling, so no session is held open.
+        Port subscribers are only loaded for a full cycle, which samples counters.
+        """
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(
+                    GAMDevice.id,
+                    GAMDevice.name,
+                    GAMDevice.ip_address,
+                    GAMDevice.snmp_community,
+                    GAMDevice.snmp_version,
+                    GAMDevice.snmp_v3_username,
+                    GAMDevice.snmp_v3_auth_protocol,
+                    GAMDevice.snmp_v3_auth_password,
+                    GAMDevice.snmp_v3_priv_protocol,
+                    GAMDevice.snmp_v3_priv_password,
+                    GAMDevice.status
+                ).where(GAMDevice.status != DeviceStatus.MAINTENANCE)
+            )
+            devices = [dict(row._mapping) for row in result.all()]
+
+            # Port number -> active subscriber ids, for counter attribution
+            ports: Dict[Any, Dict[int, List[Any]]] = {}
+            if full and settings.counter_sampling_enabled:
+                result = await session.execute(
+                    select(GAMPort.gam_device_id, GAMPort.port_number, Subscriber.id).outerjoin(
+                        Subscriber,
+                        and_(Subscriber.gam_port_id == GAMPort.id, Subscriber.status == SubscriberStatus.ACTIVE)
+                    )
+                )
+                for device_id, port_number, subscriber_id in result.all():
+                    subscribers = ports.setdefault(device_id, {}).setdefault(port_number, [])
+                    if subscriber_id is not None:
+                        subscribers.append(subscriber_id)
+
+            for device in devices:
+                device['ports'] = ports.get(device['id'], {})
+            return devices
+
+    @staticmethod
+    def _group_by_columns(rows: List[Dict[str, Any]]) -> Dict[tuple, List[Dict[str, Any]]]:
+        """Group device rows by the columns they set, as executemany parameters"""
+        groups: Dict[tuple, List[Dict[str, Any]]] = {}
+        for row in rows:
+            columns = tuple(sorted(key for key in row if key != 'id'))
+            params = {f'new_{column}': row[column] for column in columns}
+            params['device_id'] = row['id']
+            groups.setdefault(columns, []).append(params)
+        return groups
+
+    async def _store_results(self, results: List[Dict[str, Any]]):
+        """Write all poll results, MAC index changes and byte counts in a single transaction"""
+        if not results:
+            return
+
+        usage = []
+        rows = []
+        for result in results:
+            usage.extend(result.pop('subscriber_usage', None) or [])
+            # Suspended devices were already marked offline when their breaker
+            # tripped, and inconclusive polls leave the stored status alone
+            if result.pop('suspended', False) or result['status'] is None:
+                continue
+            rows.append(result)
+
+        async with self.session_factory() as session:
+            async with session.begin():
+                # One executemany per set of columns. Core rather than ORM
+                # bulk UPDATE, so a device deleted mid-cycle is simply not
+                # matched instead of failing the whole write
+                table = GAMDevice.__table__
+                for columns, params in self._group_by_columns(rows).items():
+                    await session.execute(
+                        update(table)
+                        .where(table.c.id == bindparam('device_id'))
+                        .values({column: bindparam(f'new_{column}') for column in columns}),
+                        params
+                    )
+                await mac_index.flush(session)
+
+                if usage:
+                    # Increment in SQL so concurrent writers cannot lose bytes
+                    table = Subscriber.__table__
+                    await session.execute(
+                        update(table)
+                        .where(table.c.id == bindparam('sub_id'))
+                        .values(
+                            bytes_downloaded=table.c.bytes_downloaded + bindparam('downloaded'),
+                            bytes_uploaded=table.c.bytes_uploaded + bindparam('uploaded'),
+                            last_activity=func.now()
+                        ),
+                        usage
+                    )
+
+
+# Global fleet poller, started with the application
+fleet_poller = FleetPoller()
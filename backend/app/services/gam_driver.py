@@ -0,0 +1,269 @@
+"""Device drivers: the management API used to configure a GAM"""
+from abc import ABC, abstractmethod
+from typing import Optional, List, Dict, Any
+import logging
+
+from ..utils.ssh_client import SSHClient
+from ..utils.device_fields import device_field
+from .config_cache import config_cache
+from ..utils.gam_jsonrpc import GamJsonRpcClient, ghn_ifindex, ghn_port_number, PORT_MODE_MIMO, PORT_MODE_SISO
+
+logger = logging.getLogger(__name__)
+
+MANAGEMENT_API_CLI = 'cli'
+MANAGEMENT_API_JSON_RPC = 'json_rpc'
+
+
+class GamDriver(ABC):
+    """
+    Operations PortManager and provisioning need from a GAM, independent of
+    the management API behind them.
+
+    Results have the same shape whatever the driver: failures are logged
+    and reported as False or None rather than raised.
+    """
+
+    name: str = ''
+    label: str = ''  # How the device is reached, for API responses
+
+    def __init__(self, ip_address: str):
+        self.ip_address = ip_address
+
+    @abstractmethod
+    async def configure_port(
+        self,
+        port_number: int,
+        vlan_id: int,
+        bandwidth_down: int,
+        bandwidth_up: int,
+        mimo_enabled: bool = False
+    ) -> bool:
+        """Configure and enable a G.hn port for a subscriber and save the config"""
+
+    @abstractmethod
+    async def disable_port(self, port_number: int) -> bool:
+        """Shut a G.hn port down and save the config"""
+
+    @abstractmethod
+    async def get_port_status(self, port_number: int) -> Optional[Dict[str, Any]]:
+        """
+        State of one G.hn port: port_number, enabled, link_up, and
+        mimo_enabled (None when the API does not report it)
+        """
+
+    @abstractmethod
+    async def get_ghn_endpoints(self) -> Optional[List[Dict[str, Any]]]:
+        """Discovered endpoints: port, mac_address, configured, is_up"""
+
+    @abstractmethod
+    async def get_ghn_subscribers(self) -> Optional[List[Dict[str, Any]]]:
+        """Configured subscribers: name, vlan_id, bw_profile, plus id/endpoint where known"""
+
+
+class CliDriver(GamDriver):
+    """Drives the device over its SSH CLI"""
+
+    name = MANAGEMENT_API_CLI
+    label = 'SSH CLI'
+
+    def __init__(self, ssh_client: SSHClient, device_id: Any = None):
+        super().__init__(ssh_client.ip_address)
+        self.ssh_client = ssh_client
+        # Set for a stored device, whose running-config is then read through config_cache
+        self.device_id = device_id
+
+    async def configure_port(
+        self,
+        port_number: int,
+        vlan_id: int,
+        bandwidth_down: int,
+        bandwidth_up: int,
+        mimo_enabled: bool = False
+    ) -> bool:
+        if not await self.ssh_client.connect():
+            return False
+        try:
+            report = await self.ssh_client.configure_port(
+                port_number,
+                vlan_id,
+                bandwidth_down,
+                bandwidth_up,
+                mimo_enabled
+            )
+            return report['success']
+        finally:
+            await self.ssh_client.disconnect()
+
+    async def disable_port(self, port_number: int) -> bool:
+        if not await self.ssh_client.connect():
+            return False
+        try:
+            return await self.ssh_client.disable_port(port_number)
+        finally:
+            await self.ssh_client.disconnect()
+
+    async def get_port_status(self, port_number: int) -> Optional[Dict[str, Any]]:
+        ports = await self.ssh_client.get_ghn_port_status()
+        if ports is None:
+            return None
+        for port in ports:
+            if port['port_number'] == port_number:
+                return {
+                    'port_number': port_number,
+                    'enabled': port['status'] == 'enabled',
+                    'link_up': port['link_state'] == 'up',
+                    'mimo_enabled': None  # Not shown by 'show ghn port'
+                }
+        return None
+
+    async def get_ghn_endpoints(self) -> Optional[List[Dict[str, Any]]]:
+        return await self.ssh_client.get_ghn_endpoints()
+
+    async def get_ghn_subscribers(self) -> Optional[List[Dict[str, Any]]]:
+        if self.device_id is not None:
+            return await config_cache.get_subscribers(self.device_id)
+        return await self.ssh_client.get_ghn_subscribers()
+
+
+class JsonRpcDriver(GamDriver):
+    """
+    Drives the device through its JSON-RPC API.
+
+    A port is configured as one subscriber named after the port, on a
+    bandwidth profile named after its rates, with the G.hn port mode (MIMO
+    or SISO) set and the interface taken out of shutdown, which mirrors
+    what the CLI driver sets on the interface.
+    """
+
+    name = MANAGEMENT_API_JSON_RPC
+    label = 'JSON-RPC'
+
+    def __init__(self, client: GamJsonRpcClient):
+        super().__init__(client.ip_address)
+        self.client = client
+
+    @staticmethod
+    def subscriber_name(port_number: int) -> str:
+        return f"port-{port_number}"
+
+    @staticmethod
+    def bw_profile_name(bandwidth_down: int, bandwidth_up: int) -> str:
+        return f"{bandwidth_down}M-{bandwidth_up}M"
+
+    async def configure_port(
+        self,
+        port_number: int,
+        vlan_id: int,
+        bandwidth_down: int,
+        bandwidth_up: int,
+        mimo_enabled: bool = False
+    ) -> bool:
+        try:
+            profile = self.bw_profile_name(bandwidth_down, bandwidth_up)
+            profiles = await self.client.get_bw_profiles()
+            if profile not in profiles:
+                await self.client.set_bw_profile(
+                    profile,
+                    {'Description': 'Managed by Positron GAM', 'DsBw': bandwidth_down, 'UsBw': bandwidth_up},
+                    add=True
+                )
+
+            name = self.subscriber_name(port_number)
+            subscribers = await self.client.get_subscribers()
+            config = {
+                **subscribers.get(name, {}),
+                'PortIfIndex': ghn_ifindex(port_number),
+                'VlanId': vlan_id,
+                'BwProfileName': profile
+            }
+            await self.client.set_subscriber(name, config, add=name not in subscribers)
+
+            ifindex = ghn_ifindex(port_number)
+            await self.client.set_port(ifindex, {'PortMode': PORT_MODE_MIMO if mimo_enabled else PORT_MODE_SISO})
+            await self.client.set_interface_config(ifindex, {'Shutdown': False})
+
+            await self.client.save_config()
+            return True
+
+        except Exception as e:
+            logger.error(f"Port configuration error on {self.ip_address}: {e}")
+            return False
+
+    async def disable_port(self, port_number: int) -> bool:
+        try:
+            await self.client.set_interface_config(ghn_ifindex(port_number), {'Shutdown': True})
+            await self.client.save_config()
+            return True
+        except Exception as e:
+            logger.error(f"Port disable error on {self.ip_address}: {e}")
+            return False
+
+    async def get_port_status(self, port_number: int) -> Optional[Dict[str, Any]]:
+        ifindex = ghn_ifindex(port_number)
+        try:
+            port = await self.client.get_port(ifindex)
+            interface = await self.client.get_interface_config(ifindex)
+            status = await self.client.get_interface_status(ifindex)
+        except Exception as e:
+            logger.error(f"Error getting G.hn port {port_number} status from {self.ip_address}: {e}")
+            return None
+
+        return {
+            'port_number': port_number,
+            'enabled': not interface.get('Shutdown', False),
+            'link_up': bool(status.get('Link')),
+            'mimo_enabled': port.get('PortMode') == PORT_MODE_MIMO
+        }
+
+    async def get_ghn_endpoints(self) -> Optional[List[Dict[str, Any]]]:
+        try:
+            status = await self.client.get_endpoint_status()
+        except Exception as e:
+            logger.error(f"Error getting G.hn endpoints from {self.ip_address}: {e}")
+            return None
+
+        endpoints = []
+        for mac_address, endpoint in status.items():
+            port = ghn_port_number(endpoint.get('DetectedPortIfIndex'))
+            configured_port = ghn_port_number(endpoint.get('ConfPortIfIndex'))
+            endpoints.append({
+                'port': port if port is not None else configured_port,
+                'mac_address': mac_address,
+                'configured': 'yes' if endpoint.get('ConfEndpointId') else 'no',
+                'is_up': 'yes' if port is not None else 'no'
+            })
+        return endpoints
+
+    async def get_ghn_subscribers(self) -> Optional[List[Dict[str, Any]]]:
+        try:
+            subscribers = await self.client.get_subscribers()
+        except Exception as e:
+            logger.error(f"Error getting G.hn subscribers from {self.ip_address}: {e}")
+            return None
+
+        return [
+            {
+                'name': name,
+                'vlan_id': config.get('VlanId'),
+                'endpoint': config.get('EndpointName'),
+                'bw_profile': config.get('BwProfileName'),
+                'port': ghn_port_number(config.get('PortIfIndex'))
+            }
+            for name, config in subscribers.items()
+        ]
+
+
+def driver_for_device(device: Any) -> Optional[GamDriver]:
+    """
+    Pick the driver for a GAMDevice (or a mapping with its field names) from
+    its management_api. Returns None when the device has no credentials.
+    """
+    management_api = device_field(device, 'management_api') or MANAGEMENT_API_CLI
+
+    if management_api == MANAGEMENT_API_JSON_RPC:
+        client = GamJsonRpcClient.for_device(device)
+        return JsonRpcDriver(client) if client is not None else None
+    if management_api == MANAGEMENT_API_CLI:
+        ssh_client = SSHClient.for_device(device)
+        return CliDriver(ssh_client, device_field(device, 'id')) if ssh_client is not None else None
+    raise ValueError(f"Unknown management API: {management_api}")
@@ -1,14 +1,20 @@
 """GAM device manager service"""
-from sqlalchemy import select
+from sqlalchemy import select, update, bindparam
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.sql import func
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from uuid import UUID
 import logging
 
 from ..models.gam import GAMDevice, GAMPort, DeviceStatus, PortStatus, PortType
+from ..models.port_index import GAMPortIndex
 from ..utils.snmp_client import SNMPClient
 from ..utils.ssh_client import SSHClient
+from .gam_driver import GamDriver, driver_for_device
+from .mac_index import mac_index
+from .counter_sampler import counter_sampler
 from ..config import settings
 
 logger = logging.getLogger(__name__)
@@ -26,10 +32,18 @@ class GAMManager:
         ip_address: str,
         model: str,
         snmp_community: Optional[str] = None,
+        snmp_version: Optional[str] = None,
+        snmp_v3_username: Optional[str] = None,
+        snmp_v3_auth_protocol: Optional[str] = None,
+        snmp_v3_auth_password: Optional[str] = None,
+        snmp_v3_priv_protocol: Optional[str] = None,
+        snmp_v3_priv_password: Optional[str] = None,
         ssh_credentials: Optional[Dict] = None,
         ssh_username: Optional[str] = None,
         ssh_password: Optional[str] = None,
         ssh_port: Optional[int] = None,
+        management_api: Optional[str] = None,
+        api_port: Optional[int] = None,
         location: Optional[str] = None,
         management_vlan: Optional[int] = None,
         mac_address: Optional[str] = None,
@@ -37,32 +51,129 @@ class GAMManager:
         serial_number: Optional[str] = None
     ) -> GAMDevice:
         """Create new GAM device"""
-        device = GAMDevice(
+        devices = await self.create_devices([dict(
             name=name,
             ip_address=ip_address,
             model=model,
-            snmp_community=snmp_community or settings.default_snmp_community,
+            snmp_community=snmp_community,
+            snmp_version=snmp_version,
+            snmp_v3_username=snmp_v3_username,
+            snmp_v3_auth_protocol=snmp_v3_auth_protocol,
+            snmp_v3_auth_password=snmp_v3_auth_password,
+            snmp_v3_priv_protocol=snmp_v3_priv_protocol,
+            snmp_v3_priv_password=snmp_v3_priv_password,
             ssh_credentials=ssh_credentials,
             ssh_username=ssh_username,
             ssh_password=ssh_password,
-            ssh_port=ssh_port or 22,
+            ssh_port=ssh_port,
+            management_api=management_api,
+            api_port=api_port,
             location=location,
-            management_vlan=management_vlan or settings.default_management_vlan,
+            management_vlan=management_vlan,
             mac_address=mac_address,
             firmware_version=firmware_version,
             serial_number=serial_number,
             status=DeviceStatus.ONLINE  # Device is online if we successfully discovered it via SNMP
+        )])
+
+        logger.info(f"Created GAM device: {name} ({ip_address})")
+        return devices[0]
+
+    async def create_devices(self, devices: List[Dict[str, Any]]) -> List[GAMDevice]:
+        """
+        Create GAM devices and their ports in one transaction
+
+        Args:
+            devices: Column values for each device, as accepted by create_device
+                (plus an optional status, offline by default)
+
+        Returns:
+            List of created GAMDevice objects, in the order given
+        """
+        if not devices:
+            return []
+
+        rows = [self._device_values(**fields) for fields in devices]
+        result = await self.db.execute(
+            insert(GAMDevice).returning(GAMDevice, sort_by_parameter_order=True),
+            rows
         )
+        created = list(result.scalars().all())
+        for device in created:
+            # Not part of RETURNING; a new device has no subscribers
+            set_committed_value(device, 'active_subscribers', 0)
 
-        self.db.add(device)
+        # Seed the ports in the same transaction as their devices
+        await self._initialize_ports(created)
         await self.db.commit()
-        await self.db.refresh(device)
+        return created
 
-        # Initialize ports for the device
-        await self._initialize_ports(device)
+    async def import_devices(self, devices: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Bulk-create devices, skipping those whose name or IP address is taken
 
-        logger.info(f"Created GAM device: {name} ({ip_address})")
-        return device
+        Returns:
+            Dict with the created GAMDevice objects and the skipped entries
+        """
+        names = {fields['name'] for fields in devices}
+        addresses = {fields['ip_address'] for fields in devices}
+        result = await self.db.execute(
+            select(GAMDevice.name, GAMDevice.ip_address)
+            .where(GAMDevice.name.in_(names) | GAMDevice.ip_address.in_(addresses))
+        )
+        taken_names = set()
+        taken_addresses = set()
+        for row in result:
+            taken_names.add(row.name)
+            taken_addresses.add(row.ip_address)
+
+        to_create = []
+        skipped = []
+        for fields in devices:
+            if fields['name'] in taken_names:
+                reason = 'name already exists'
+            elif fields['ip_address'] in taken_addresses:
+                reason = 'IP address already exists'
+            else:
+                reason = None
+                to_create.append(fields)
+            taken_names.add(fields['name'])
+            taken_addresses.add(fields['ip_address'])
+            if reason:
+                skipped.append({'name': fields['name'], 'ip_address': fields['ip_address'], 'reason': reason})
+
+        created = await self.create_devices(to_create)
+        logger.info(f"Imported {len(created)} GAM devices ({len(skipped)} skipped)")
+        return {'created': created, 'skipped': skipped}
+
+    @staticmethod
+    def _device_values(
+        name: str,
+        ip_address: str,
+        model: str,
+        snmp_community: Optional[str] = None,
+        snmp_version: Optional[str] = None,
+        ssh_port: Optional[int] = None,
+        management_api: Optional[str] = None,
+        api_port: Optional[int] = None,
+        management_vlan: Optional[int] = None,
+        status: DeviceStatus = DeviceStatus.OFFLINE,
+        **fields
+    ) -> Dict[str, Any]:
+        """Column values for a new device, with the defaults filled in"""
+        return dict(
+            fields,
+            name=name,
+            ip_address=ip_address,
+            model=model,
+            snmp_community=snmp_community or settings.default_snmp_community,
+            snmp_version=snmp_version or 'v2c',
+            ssh_port=ssh_port or 22,
+            management_api=management_api or 'cli',
+            api_port=api_port or 80,
+            management_vlan=management_vlan or settings.default_management_vlan,
+            status=status
+        )
 
     async def get_device(self, device_id: UUID) -> Optional[GAMDevice]:
         """Get device by ID"""
@@ -121,27 +232,31 @@ class GAMManager:
 
         await self.db.delete(device)
         await self.db.commit()
+        mac_index.remove_device(device_id)
+        counter_sampler.remove_device(device_id)
         logger.info(f"Deleted device {device.name}")
         return True
 
-    async def _initialize_ports(self, device: GAMDevice):
-        """Initialize ports for a device"""
-        port_count = device.port_count
-        port_type = PortType.COAX if device.is_coax_model else PortType.MIMO
-
-        for port_num in range(1, port_count + 1):
-            port = GAMPort(
-                gam_device_id=device.id,
-                port_number=port_num,
-                port_type=port_type,
-                status=PortStatus.DOWN,
-                enabled=True,
-                name=f"Port {port_num}"
+    async def _initialize_ports(self, devices: List[GAMDevice]):
+        """Initialize ports for new devices (does not commit)"""
+        rows = []
+        for device in devices:
+            port_type = PortType.COAX if device.is_coax_model else PortType.MIMO
+            rows.extend(
+                {
+                    'gam_device_id': device.id,
+                    'port_number': port_num,
+                    'port_type': port_type,
+                    'status': PortStatus.DOWN,
+                    'enabled': True,
+                    'name': f"Port {port_num}"
+                }
+                for port_num in range(1, device.port_count + 1)
             )
-            self.db.add(port)
 
-        await self.db.commit()
-        logger.info(f"Initialized {port_count} ports for device {device.name}")
+        if rows:
+            await self.db.execute(insert(GAMPort), rows)
+        logger.info(f"Initialized {len(rows)} ports for {len(devices)} devices")
 
     async def get_port(self, port_id: UUID) -> Optional[GAMPort]:
         """Get port by ID"""
@@ -192,20 +307,17 @@ class GAMManager:
 
         # Test SNMP
         try:
-            snmp_client = SNMPClient(device.ip_address, device.snmp_community)
+            snmp_client = SNMPClient.for_device(device)
             results['snmp_test'] = await snmp_client.test_connection()
         except Exception as e:
             results['errors'].append(f"SNMP test failed: {str(e)}")
 
         # Test SSH
-        if device.ssh_credentials:
+        ssh_client = SSHClient.for_device(device)
+        if ssh_client is None:
+            results['errors'].append("SSH credentials not configured")
+        else:
             try:
-                ssh_client = SSHClient(
-                    device.ip_address,
-                    device.ssh_credentials.get('username'),
-                    password=device.ssh_credentials.get('password'),
-                    private_key=device.ssh_credentials.get('private_key')
-                )
                 results['ssh_test'] = await ssh_client.test_connection()
             except Exception as e:
                 results['errors'].append(f"SSH test failed: {str(e)}")
@@ -220,13 +332,13 @@ class GAMManager:
             return {'success': False, 'error': 'Device not found'}
 
         try:
-            snmp_client = SNMPClient(device.ip_address, device.snmp_community)
+            snmp_client = SNMPClient.for_device(device)
             system_info = await snmp_client.get_system_info()
 
             if system_info.get('uptime'):
                 # Device is online
                 device.status = DeviceStatus.ONLINE
-                device.uptime = int(system_info.get('uptime', 0))
+                device.uptime = SNMPClient.uptime_seconds(system_info['uptime'])
                 device.last_seen = func.now()
 
                 await self.db.commit()
@@ -255,75 +367,100 @@ class GAMManager:
         """
         Update port information from SNMP data
 
+        Each row of the Positron port table is mapped to a port through the
+        device's learned index mapping (gam_port_indexes). Indexes not seen
+        before are learned from the G.hn ifIndex numbering (1000000 + port);
+        rows that do not name an existing port (the extra rows a GAM-4-C
+        reports) are ignored. Status changes are written in one transaction.
+
         Args:
             device_id: UUID of the GAM device
             port_info: Dict from SNMP client with port information
 
         Returns:
-            List of updated GAMPort objects
+            List of GAMPort objects the SNMP data was mapped to
         """
         device = await self.get_device(device_id)
         if not device:
             raise ValueError(f"Device {device_id} not found")
 
-        # Get existing ports
-        existing_ports = await self.get_device_ports(device_id)
-
-        # Create mapping of port_number to GAMPort
-        port_map = {port.port_number: port for port in existing_ports}
+        result = await self.db.execute(
+            select(GAMPort.id, GAMPort.port_number, GAMPort.status)
+            .where(GAMPort.gam_device_id == device_id)
+        )
+        ports = {row.port_number: row for row in result}
 
-        updated_ports = []
+        result = await self.db.execute(
+            select(GAMPortIndex.snmp_index, GAMPortIndex.port_number)
+            .where(GAMPortIndex.gam_device_id == device_id)
+        )
+        index_map = dict(result.all())
+
+        # Learn indexes seen for the first time; a port keeps the index it
+        # was first mapped to
+        mapped_ports = set(index_map.values())
+        learned = []
+        for idx in sorted(port_info):
+            if idx in index_map:
+                continue
+            port_number = SNMPClient.port_number_for_if_index(idx)
+            if port_number not in ports or port_number in mapped_ports:
+                logger.debug(f"No port for SNMP index {idx} on {device.name}")
+                continue
+            index_map[idx] = port_number
+            mapped_ports.add(port_number)
+            learned.append({'gam_device_id': device_id, 'snmp_index': idx, 'port_number': port_number})
+
+        if learned:
+            await self.db.execute(
+                insert(GAMPortIndex).values(learned).on_conflict_do_nothing()
+            )
 
-        # Process SNMP port data
+        # Only link state is reported here: ports in ERROR or DISABLED (set
+        # from traps) keep their status
+        synced_ids = []
+        changes = []
         for idx, data in port_info.items():
-            # Positron OID data interpretation:
-            # The .5 sub-OID seems to indicate link status (0=down, 1=up)
-            # The .11 sub-OID might indicate subscriber count on coax ports
+            port_number = index_map.get(idx)
+            port = ports.get(port_number)
+            if port is None:
+                continue
+            synced_ids.append(port.id)
 
             link_status = data.get('link_status', 'down')
-            subscriber_count = data.get('subscriber_count', 0)
-
-            # Map positron index to actual port number
-            # For GAM-4-C, we have 4 ports but 6 SNMP indices
-            # Indices 1000005 and 1000006 appear to be the active ones
-            # We need to figure out the mapping
-
-            # For now, try to use the port_indicator value
-            port_indicator = data.get('port_indicator', 0)
-
-            # Attempt to find corresponding database port
-            # This is a best-guess mapping without the MIB file
-            db_port = None
-
-            # Strategy: If subscriber_count > 0 or link_status == 'up', it's likely a real port
-            if subscriber_count > 0 or link_status == 'up':
-                # Try to match by looking for ports that aren't already mapped
-                for port in existing_ports:
-                    if port.status == PortStatus.DOWN and link_status == 'up':
-                        db_port = port
-                        break
-
-            if db_port:
-                # Update port status
-                db_port.status = PortStatus.UP if link_status == 'up' else PortStatus.DOWN
-
-                # Store raw SNMP data for debugging
-                if not hasattr(db_port, 'snmp_data'):
-                    # Note: This would require a JSON column in the model
-                    pass
+            status = PortStatus.UP if link_status == 'up' else PortStatus.DOWN
+            if port.status in (PortStatus.UP, PortStatus.DOWN) and port.status != status:
+                changes.append({'port_id': port.id, 'new_status': status})
+                logger.debug(
+                    f"Port {port_number} on {device.name}: {port.status.value} -> {status.value}, "
+                    f"subscribers={data.get('subscriber_count', 0)}, idx={idx}"
+                )
 
-                await self.db.commit()
-                await self.db.refresh(db_port)
-                updated_ports.append(db_port)
+        if changes:
+            table = GAMPort.__table__
+            await self.db.execute(
+                update(table)
+                .where(table.c.id == bindparam('port_id'))
+                .values(status=bindparam('new_status')),
+                changes
+            )
+        await self.db.commit()
 
-                logger.info(
-                    f"Updated port {db_port.port_number} on {device.name}: "
-                    f"status={db_port.status}, link_status={link_status}, "
-                    f"subscribers={subscriber_count}, idx={idx}"
-                )
+        if not synced_ids:
+            return []
+        result = await self.db.execute(
+            select(GAMPort)
+            .where(GAMPort.id.in_(synced_ids))
+            .order_by(GAMPort.port_number)
+            .execution_options(populate_existing=True)
+        )
+        synced_ports = list(result.scalars().all())
 
-        logger.info(f"Updated {len(updated_ports)} ports for device {device.name}")
-        return updated_ports
+        logger.info(
+            f"Synced {len(synced_ports)} ports for device {device.name}: "
+            f"{len(changes)} status changes, {len(learned)} indexes learned"
+        )
+        return synced_ports
 
     async def discover_devices(self, network_range: str) -> List[Dict[str, Any]]:
         """Discover GAM devices on network (basic implementation)"""
@@ -346,15 +483,8 @@ class PortManager:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def configure_port(
-        self,
-        port_id: UUID,
-        vlan_id: int,
-        bandwidth_down: int,
-        bandwidth_up: int,
-        mimo_enabled: bool = False
-    ) -> bool:
-        """Configure port via SSH"""
+    async def _port_and_driver(self, port_id: UUID) -> Tuple[Optional[GAMPort], Optional[GAMDevice], Optional[GamDriver]]:
+        """Load a port, its device and the driver for the device's management API"""
         result = await self.db.execute(
             select(GAMPort).where(GAMPort.id == port_id)
         )
@@ -362,40 +492,69 @@ class PortManager:
 
         if not port:
             logger.error(f"Port {port_id} not found")
-            return False
-
-        device = port.device
+            return None, None, None
 
-        if not device.ssh_credentials:
-            logger.error(f"No SSH credentials for device {device.name}")
-            return False
+        device = await self.db.get(GAMDevice, port.gam_device_id)
+        driver = driver_for_device(device)
+        if driver is None:
+            logger.error(f"No management credentials for device {device.name}")
+        return port, device, driver
 
+    async def configure_port(
+        self,
+        port_id: UUID,
+        vlan_id: int,
+        bandwidth_down: int,
+        bandwidth_up: int,
+        mimo_enabled: bool = False
+    ) -> bool:
+        """
+        Configure port through the device's management API, then read the
+        port back to record its link state
+        """
         try:
-            ssh_client = SSHClient(
-                device.ip_address,
-                device.ssh_credentials.get('username'),
-                password=device.ssh_credentials.get('password'),
-                private_key=device.ssh_credentials.get('private_key')
-            )
+            port, device, driver = await self._port_and_driver(port_id)
+            if driver is None:
+                return False
 
-            await ssh_client.connect()
-            success = await ssh_client.configure_port(
+            success = await driver.configure_port(
                 port.port_number,
                 vlan_id,
                 bandwidth_down,
                 bandwidth_up,
                 mimo_enabled
             )
-            await ssh_client.disconnect()
 
             if success:
                 port.status = PortStatus.UP
                 port.mimo_enabled = mimo_enabled
+                status = await driver.get_port_status(port.port_number)
+                if status is not None:
+                    port.status = PortStatus.UP if status['link_up'] else PortStatus.DOWN
+                    if status['mimo_enabled'] is not None:
+                        port.mimo_enabled = status['mimo_enabled']
                 await self.db.commit()
-                logger.info(f"Configured port {port.port_number} on device {device.name}")
+                logger.info(f"Configured port {port.port_number} on device {device.name} via {driver.label}")
 
             return success
 
         except Exception as e:
             logger.error(f"Error configuring port: {e}")
             return False
+
+    async def disable_port(self, port_id: UUID) -> bool:
+        """Shut a port down through the device's management API"""
+        try:
+            port, device, driver = await self._port_and_driver(port_id)
+            if driver is None:
+                return False
+
+            success = await driver.disable_port(port.port_number)
+            if success:
+                port.status = PortStatus.DISABLED
+                logger.info(f"Disabled port {port.port_number} on device {device.name} via {driver.label}")
+            return success
+
+        except Exception as e:
+            logger.error(f"Error disabling port: {e}")
+            return False
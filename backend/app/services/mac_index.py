@@ -0,0 +1,304 @@
+"""Fleet-wide MAC address location index"""
+from sqlalchemy import select, event
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, Dict, Any, List, Set, Iterable
+from datetime import datetime, timezone, timedelta
+from uuid import UUID
+import logging
+import re
+
+from ..models.mac_location import MACLocation
+from ..models.gam import GAMDevice
+from ..utils.snmp_client import SNMPClient
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+SOURCE_FDB = 'fdb'
+SOURCE_GHN_DISCOVER = 'ghn_discover'
+
+# Session.info key of the rows flushed in a session's open transaction
+_STAGED_KEY = 'mac_index_staged'
+
+_HEX_RE = re.compile(r'[^0-9a-f]')
+
+
+def normalize_mac(mac_address: str) -> Optional[str]:
+    """Normalize any common MAC notation to lowercase aa:bb:cc:dd:ee:ff"""
+    digits = _HEX_RE.sub('', mac_address.lower())
+    if len(digits) != 12:
+        return None
+    return ':'.join(digits[i:i + 2] for i in range(0, 12, 2))
+
+
+def normalize_oui(prefix: str) -> Optional[str]:
+    """Normalize an OUI prefix (first three octets) to lowercase aa:bb:cc"""
+    digits = _HEX_RE.sub('', prefix.lower())
+    if len(digits) < 6:
+        return None
+    return ':'.join(digits[i:i + 2] for i in range(0, 6, 2))
+
+
+class MACLocationIndex:
+    """
+    In-memory index of where every known MAC address is attached.
+
+    Lookups by MAC and by OUI are plain dict lookups across the whole fleet.
+    The index is fed incrementally: each FDB walk or endpoint discovery only
+    updates the MACs it saw, and only entries whose location changed (or whose
+    persisted last_seen has grown stale) are queued for the next flush to the
+    mac_locations table.
+    """
+
+    def __init__(self, persist_interval: Optional[int] = None):
+        self.persist_interval = timedelta(
+            seconds=settings.mac_index_persist_interval if persist_interval is None else persist_interval
+        )
+        self._by_mac: Dict[str, Dict[str, Any]] = {}
+        self._by_oui: Dict[str, Set[str]] = {}
+        self._device_names: Dict[UUID, str] = {}
+        self._persisted_at: Dict[str, datetime] = {}
+        self._dirty: Dict[str, Dict[str, Any]] = {}
+
+    def __len__(self):
+        return len(self._by_mac)
+
+    def lookup(self, mac_address: str) -> Optional[Dict[str, Any]]:
+        """Get the last known location of a MAC address"""
+        mac = normalize_mac(mac_address)
+        if mac is None or mac not in self._by_mac:
+            return None
+        return self._present(self._by_mac[mac])
+
+    def lookup_oui(self, prefix: str) -> List[Dict[str, Any]]:
+        """Get the locations of every known MAC with the given OUI prefix"""
+        oui = normalize_oui(prefix)
+        if oui is None:
+            return []
+        return [self._present(self._by_mac[mac]) for mac in sorted(self._by_oui.get(oui, ()))]
+
+    def update_from_fdb(
+        self,
+        device_id: UUID,
+        device_name: str,
+        entries: Iterable[Dict[str, Any]],
+        seen_at: Optional[datetime] = None
+    ) -> int:
+        """
+        Record MACs from a bridge FDB walk (SNMPClient.walk_fdb entries).
+
+        Returns the number of entries that changed location.
+        """
+        seen_at = seen_at or datetime.now(timezone.utc)
+        self._device_names[device_id] = device_name
+        changed = 0
+
+        for entry in entries:
+            changed += self._record(entry['mac_address'], {
+                'gam_device_id': device_id,
+                'bridge_port': entry.get('bridge_port'),
+                'interface_index': entry.get('interface_index'),
+                'port_number': None,
+                'vlan_id': entry.get('vlan_id'),
+                'source': SOURCE_FDB,
+                'last_seen': seen_at
+            })
+
+        return changed
+
+    def update_from_endpoints(
+        self,
+        device_id: UUID,
+        device_name: str,
+        endpoints: Iterable[Dict[str, Any]],
+        seen_at: Optional[datetime] = None
+    ) -> int:
+        """
+        Record MACs from G.hn endpoint discovery (SSHClient.get_ghn_endpoints).
+
+        Returns the number of entries that changed location.
+        """
+        seen_at = seen_at or datetime.now(timezone.utc)
+        self._device_names[device_id] = device_name
+        changed = 0
+
+        for endpoint in endpoints:
+            port = endpoint.get('port')
+            changed += self._record(endpoint['mac_address'], {
+                'gam_device_id': device_id,
+                'bridge_port': None,
+                'interface_index': SNMPClient.GHN_IF_INDEX_BASE + port if port else None,
+                'port_number': port,
+                'vlan_id': None,
+                'source': SOURCE_GHN_DISCOVER,
+                'last_seen': seen_at
+            })
+
+        return changed
+
+    def remove_device(self, device_id: UUID):
+        """Forget every MAC located on a device (rows cascade in the database)"""
+        for mac, record in list(self._by_mac.items()):
+            if record['gam_device_id'] == device_id:
+                self._forget(mac)
+        self._device_names.pop(device_id, None)
+
+    async def load(self, session: AsyncSession):
+        """Rebuild the in-memory index from the mac_locations table"""
+        result = await session.execute(
+            select(MACLocation, GAMDevice.name).join(GAMDevice, MACLocation.gam_device_id == GAMDevice.id)
+        )
+
+        self._by_mac.clear()
+        self._by_oui.clear()
+        self._device_names.clear()
+        self._persisted_at.clear()
+        self._dirty.clear()
+
+        for location, device_name in result.all():
+            record = {column.name: getattr(location, column.name) for column in MACLocation.__table__.columns}
+            self._store(record)
+            self._persisted_at[location.mac_address] = location.last_seen
+            self._device_names[location.gam_device_id] = device_name
+
+        logger.info(f"Loaded {len(self._by_mac)} MAC locations")
+
+    async def flush(self, session: AsyncSession) -> int:
+        """
+        Upsert pending index changes in the caller's transaction.
+
+        Entries on devices that no longer exist are dropped first. Written
+        entries only count as persisted once the transaction commits; on
+        rollback they are queued again.
+
+        Returns the number of rows written.
+        """
+        if not self._dirty:
+            return 0
+
+        # A walk that finished after its device was deleted would otherwise
+        # violate the foreign key, in this and every later flush
+        device_ids = {record['gam_device_id'] for record in self._dirty.values()}
+        result = await session.execute(select(GAMDevice.id).where(GAMDevice.id.in_(device_ids)))
+        for device_id in device_ids - set(result.scalars().all()):
+            logger.debug(f"Dropping MAC locations of deleted device {device_id}")
+            self.remove_device(device_id)
+        if not self._dirty:
+            return 0
+
+        pending, self._dirty = self._dirty, {}
+        rows = list(pending.values())
+        try:
+            stmt = insert(MACLocation)
+            await session.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[MACLocation.mac_address],
+                    set_={
+                        name: stmt.excluded[name]
+                        for name in (
+                            'gam_device_id', 'bridge_port', 'interface_index',
+                            'port_number', 'vlan_id', 'source', 'last_seen'
+                        )
+                    }
+                ),
+                rows
+            )
+        except Exception:
+            self._requeue(rows)
+            raise
+
+        # Persisted once the caller's transaction commits
+        session.info.setdefault(_STAGED_KEY, []).extend(rows)
+        sync_session = session.sync_session
+        if not event.contains(sync_session, 'after_commit', self._committed):
+            event.listen(sync_session, 'after_commit', self._committed)
+            event.listen(sync_session, 'after_rollback', self._rolled_back)
+
+        logger.debug(f"Flushed {len(rows)} MAC locations")
+        return len(rows)
+
+    def _committed(self, session):
+        for row in session.info.pop(_STAGED_KEY, ()):
+            if row['mac_address'] in self._by_mac:
+                self._persisted_at[row['mac_address']] = row['last_seen']
+
+    def _rolled_back(self, session):
+        self._requeue(session.info.pop(_STAGED_KEY, ()))
+
+    def _requeue(self, rows: Iterable[Dict[str, Any]]):
+        # Queue the current location of each MAC again for the next flush
+        # (newer sightings win; forgotten MACs stay forgotten)
+        for row in rows:
+            mac = row['mac_address']
+            current = self._by_mac.get(mac)
+            if current is not None:
+                self._dirty.setdefault(mac, current)
+
+    def _record(self, mac_address: str, location: Dict[str, Any]) -> int:
+        mac = normalize_mac(mac_address)
+        if mac is None:
+            return 0
+
+        current = self._by_mac.get(mac)
+        if current is not None and not self._should_replace(current, location):
+            return 0
+
+        record = {'mac_address': mac, **location}
+        moved = current is None or any(
+            current[key] != record[key]
+            for key in ('gam_device_id', 'bridge_port', 'interface_index', 'port_number', 'vlan_id')
+        )
+        if moved and current is not None:
+            logger.debug(f"MAC {mac} moved from {current['gam_device_id']}/{current['interface_index']} "
+                         f"to {record['gam_device_id']}/{record['interface_index']}")
+
+        self._store(record)
+
+        persisted_at = self._persisted_at.get(mac)
+        if moved or persisted_at is None or record['last_seen'] - persisted_at >= self.persist_interval:
+            self._dirty[mac] = record
+
+        return 1 if moved else 0
+
+    def _should_replace(self, current: Dict[str, Any], location: Dict[str, Any]) -> bool:
+        # A CPE MAC is also learned on the uplinks of every other bridge in the
+        # same L2 domain; a sighting on an uplink never displaces a recent
+        # sighting on a subscriber-facing G.hn port
+        if self._is_subscriber_facing(location) or not self._is_subscriber_facing(current):
+            return True
+        if current['gam_device_id'] == location['gam_device_id'] and current['source'] == location['source']:
+            return True
+        return location['last_seen'] - current['last_seen'] >= self.persist_interval
+
+    @staticmethod
+    def _is_subscriber_facing(location: Dict[str, Any]) -> bool:
+        if location['source'] == SOURCE_GHN_DISCOVER:
+            return True
+        return SNMPClient.port_number_for_if_index(location['interface_index']) is not None
+
+    def _store(self, record: Dict[str, Any]):
+        mac = record['mac_address']
+        self._by_mac[mac] = record
+        self._by_oui.setdefault(mac[:8], set()).add(mac)
+
+    def _forget(self, mac: str):
+        self._by_mac.pop(mac, None)
+        self._persisted_at.pop(mac, None)
+        self._dirty.pop(mac, None)
+        bucket = self._by_oui.get(mac[:8])
+        if bucket is not None:
+            bucket.discard(mac)
+            if not bucket:
+                del self._by_oui[mac[:8]]
+
+    def _present(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            **record,
+            'gam_device_name': self._device_names.get(record['gam_device_id']),
+            'vendor_oui': record['mac_address'][:8].upper()
+        }
+
+
+# Global index shared by the fleet poller and the API
+mac_index = MACLocationIndex()
@@ -6,7 +6,7 @@ from uuid import UUID
 import logging
 
 from ..models.subscriber import Subscriber, SubscriberStatus
-from ..models.gam import GAMPort, PortStatus
+from ..models.gam import GAMPort
 from ..models.bandwidth import BandwidthPlan
 from ..services.gam_manager import PortManager
 from ..config import settings
@@ -126,10 +126,11 @@ class ProvisioningEngine:
             port = port_result.scalar_one_or_none()
 
             if port:
-                # For copper ports, disable the port
+                # For copper ports, disable the port on the device
                 # For coax ports, just mark subscriber as inactive
                 if port.port_type.value in ['mimo', 'siso']:
-                    port.status = PortStatus.DISABLED
+                    if not await self.port_manager.disable_port(port.id):
+                        return {'success': False, 'error': 'Port disable failed'}
 
             # Update subscriber
             subscriber.status = SubscriberStatus.SUSPENDED
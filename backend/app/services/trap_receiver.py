@@ -0,0 +1,564 @@
+"""SNMP trap and inform receiver for GAM devices"""
+from pyasn1.codec.ber import encoder, decoder
+from pyasn1.error import PyAsn1Error
+from pysnmp.proto import api, rfc1905
+from pysnmp.proto.api import v2c
+from pysnmp.proto.mpmod.rfc3412 import SNMPv3Message
+from pysnmp.proto.secmod.rfc3414.service import UsmSecurityParameters
+from sqlalchemy import select, update
+from typing import Optional, Dict, Any, List, Tuple
+from datetime import datetime, timezone
+import asyncio
+import logging
+import time
+
+from ..database import AsyncSessionLocal
+from ..models.gam import GAMDevice, GAMPort, DeviceStatus, PortStatus
+from ..utils.snmp_client import SNMPClient
+from ..utils.snmp_usm import UsmError, UsmSession, UsmUser, SNMP_V3, FLAG_AUTH, FLAG_PRIV
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Generic notifications (SNMPv2-MIB / IF-MIB)
+OID_SNMP_TRAPS = '1.3.6.1.6.3.1.1.5'
+TRAP_COLD_START = '1.3.6.1.6.3.1.1.5.1'
+TRAP_WARM_START = '1.3.6.1.6.3.1.1.5.2'
+TRAP_LINK_DOWN = '1.3.6.1.6.3.1.1.5.3'
+TRAP_LINK_UP = '1.3.6.1.6.3.1.1.5.4'
+
+OID_SYS_UPTIME = '1.3.6.1.2.1.1.3.0'
+OID_SNMP_TRAP_OID = '1.3.6.1.6.3.1.1.4.1.0'
+OID_IF_INDEX = '1.3.6.1.2.1.2.2.1.1'
+OID_IF_ADMIN_STATUS = '1.3.6.1.2.1.2.2.1.7'
+
+# GAM-ALARM-MIB: gamAlarmTrap and the gamAlarmStatusActiveEntry columns it carries
+OID_GAM_ALARM_TRAP = '1.3.6.1.4.1.20095.2001.145.1.6'
+OID_GAM_ALARM_ACTIVE_ENTRY = '1.3.6.1.4.1.20095.2001.145.1.3.1.1'
+ALARM_TRAP_ADD = 1
+ALARM_TRAP_MOD = 2
+ALARM_TRAP_DEL = 3
+ALARM_COL_INDEX = 1
+ALARM_COL_IF_INDEX = 2
+ALARM_COL_SERVICE_AFFECTING = 11
+
+# How often an unknown source or community may trigger a device list reload
+DEVICE_REFRESH_INTERVAL = 30
+
+# RFC 3414 3.2.7: how far behind the agent's clock an authentic message may be
+TIME_WINDOW = 150
+
+
+class _TrapProtocol(asyncio.DatagramProtocol):
+    """Datagram protocol handing notifications to the receiver"""
+
+    def __init__(self, receiver: "TrapReceiver"):
+        self.receiver = receiver
+
+    def datagram_received(self, data: bytes, addr):
+        self.receiver._enqueue(('datagram', data, addr))
+
+    def error_received(self, exc: Exception):
+        logger.debug(f"Trap socket error: {exc}")
+
+
+class TrapReceiver:
+    """
+    Listens for SNMP notifications and applies them to port and device state.
+
+    Handles SNMPv1 traps, SNMPv2c traps and informs (informs are
+    acknowledged), and SNMPv3 traps from devices with snmp_version 'v3',
+    authenticated and decrypted with the device's USM user. SNMPv3 informs
+    are not supported: they need this receiver to act as an authoritative
+    engine, so they are counted and dropped unanswered.
+    linkUp/linkDown set GAMPort.status, cold/warm starts reset
+    the device uptime, and GAM-ALARM-MIB traps flag ports with
+    service-affecting alarms. Any authenticated notification marks its device
+    online. Datagrams are decoded on the socket callback and processed by a
+    single task that drains everything queued and writes it in one transaction.
+    """
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        host: Optional[str] = None,
+        port: Optional[int] = None
+    ):
+        self.session_factory = session_factory
+        self.host = host or settings.trap_receiver_host
+        self.port = port or settings.trap_receiver_port
+        self.stats = {
+            'received': 0,
+            'applied': 0,
+            'informs_acknowledged': 0,
+            'unknown_source': 0,
+            'bad_community': 0,
+            'auth_failed': 0,
+            'unsupported': 0,
+            'undecodable': 0,
+            'dropped': 0
+        }
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=10000)
+        self._transport: Optional[asyncio.DatagramTransport] = None
+        self._task: Optional[asyncio.Task] = None
+        self._devices: Dict[str, Dict[str, Any]] = {}
+        self._devices_loaded_at = 0.0
+        # Active service-affecting port alarms: (device_id, alarm_index) -> ifIndex
+        self._port_alarms: Dict[Tuple[Any, int], int] = {}
+        self._refreshes: set = set()
+        # Device id -> USM state for its SNMPv3 traps
+        self._usm_sessions: Dict[Any, UsmSession] = {}
+
+    async def start(self):
+        """Bind the trap socket and start processing"""
+        if self._transport is not None:
+            return
+
+        try:
+            self._transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+                lambda: _TrapProtocol(self),
+                local_addr=(self.host, self.port)
+            )
+        except OSError as e:
+            logger.error(f"Trap receiver could not bind {self.host}:{self.port}: {e}")
+            return
+
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Trap receiver listening on {self.host}:{self.port}")
+
+    async def stop(self):
+        """Close the trap socket and stop processing"""
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("Trap receiver stopped")
+
+    def _enqueue(self, item: Tuple):
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.stats['dropped'] += 1
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            device_updates: Dict[Any, Dict[str, Any]] = {}
+            port_updates: List[Dict[str, Any]] = []
+            try:
+                for item in batch:
+                    if item[0] == 'datagram':
+                        await self._handle_datagram(item[1], item[2], device_updates, port_updates)
+                    else:
+                        port_updates.append(item[1])
+                await self._apply(device_updates, port_updates)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Failed to apply {len(batch)} notifications: {e}", exc_info=True)
+
+    async def _handle_datagram(
+        self,
+        data: bytes,
+        addr,
+        device_updates: Dict[Any, Dict[str, Any]],
+        port_updates: List[Dict[str, Any]]
+    ):
+        self.stats['received'] += 1
+        try:
+            version = int(api.decodeMessageVersion(data))
+        except (PyAsn1Error, ValueError):
+            version = None
+        if version == SNMP_V3:
+            await self._handle_v3(data, addr, device_updates, port_updates)
+            return
+
+        notification = self._decode(data)
+        if notification is None:
+            self.stats['undecodable'] += 1
+            return
+
+        device = await self._resolve_device(addr[0], notification.get('agent_address'))
+        if device is None:
+            self.stats['unknown_source'] += 1
+            logger.debug(f"Ignoring notification from unknown source {addr[0]}")
+            return
+
+        if notification['community'] != device['snmp_community']:
+            # The community may have just been changed; reload once and recheck
+            device = await self._resolve_device(addr[0], notification.get('agent_address'), reload=True)
+            if device is None or notification['community'] != device['snmp_community']:
+                self.stats['bad_community'] += 1
+                logger.warning(f"Ignoring notification from {addr[0]} with wrong community")
+                return
+
+        if notification['inform'] is not None:
+            self._acknowledge(notification['inform'], addr)
+
+        self.stats['applied'] += 1
+        self._interpret(device, notification, device_updates, port_updates)
+
+    async def _handle_v3(
+        self,
+        data: bytes,
+        addr,
+        device_updates: Dict[Any, Dict[str, Any]],
+        port_updates: List[Dict[str, Any]]
+    ):
+        try:
+            message, _ = decoder.decode(data, asn1Spec=SNMPv3Message())
+            flags = bytes(message['msgGlobalData']['msgFlags'])[0]
+            params, _ = decoder.decode(bytes(message['msgSecurityParameters']), asn1Spec=UsmSecurityParameters())
+        except (PyAsn1Error, IndexError) as e:
+            self.stats['undecodable'] += 1
+            logger.debug(f"Dropping undecodable SNMPv3 notification: {e}")
+            return
+
+        device = await self._resolve_device(addr[0])
+        if device is None:
+            self.stats['unknown_source'] += 1
+            logger.debug(f"Ignoring notification from unknown source {addr[0]}")
+            return
+
+        try:
+            pdu = self._unwrap_v3(device, message, data, flags, params)
+        except (UsmError, ValueError) as e:
+            self.stats['auth_failed'] += 1
+            logger.warning(f"Ignoring SNMPv3 notification from {device['name']}: {e}")
+            return
+
+        if pdu.tagSet == rfc1905.InformRequestPDU.tagSet:
+            self.stats['unsupported'] += 1
+            logger.warning(f"Dropping SNMPv3 inform from {device['name']}; configure it to send traps")
+            return
+        if pdu.tagSet != rfc1905.SNMPv2TrapPDU.tagSet:
+            self.stats['undecodable'] += 1
+            return
+
+        var_binds = {str(oid): value for oid, value in v2c.apiPDU.getVarBinds(pdu)}
+        trap_oid = var_binds.pop(OID_SNMP_TRAP_OID, None)
+        if trap_oid is None:
+            self.stats['undecodable'] += 1
+            return
+        uptime = var_binds.pop(OID_SYS_UPTIME, None)
+
+        self.stats['applied'] += 1
+        self._interpret(device, {
+            'community': None,
+            'trap_oid': str(trap_oid),
+            'uptime': int(uptime) if uptime is not None else None,
+            'var_binds': var_binds,
+            'agent_address': None,
+            'inform': None
+        }, device_updates, port_updates)
+
+    def _unwrap_v3(self, device: Dict[str, Any], message: Any, data: bytes, flags: int, params: Any):
+        """
+        Authenticate and decrypt an SNMPv3 trap with the device's USM user.
+
+        The sending agent is the authoritative engine of a trap, so keys are
+        localized to the engine ID the message carries; the digest check
+        then proves the sender knows the user's keys. Messages below the
+        user's security level, or older than the agent clock seen so far
+        allows, are rejected.
+        """
+        if device['snmp_version'] != 'v3' or not device['snmp_v3_username']:
+            raise UsmError("device is not configured for SNMPv3")
+        user = UsmUser(
+            device['snmp_v3_username'],
+            auth_protocol=device['snmp_v3_auth_protocol'],
+            auth_password=device['snmp_v3_auth_password'],
+            priv_protocol=device['snmp_v3_priv_protocol'],
+            priv_password=device['snmp_v3_priv_password']
+        )
+        if bytes(params['msgUserName']) != user.user_name.encode():
+            raise UsmError("unknown user name")
+        if flags & (FLAG_AUTH | FLAG_PRIV) != user.flags:
+            raise UsmError("unsupported security level")
+
+        engine_id = bytes(params['msgAuthoritativeEngineId'])
+        boots = int(params['msgAuthoritativeEngineBoots'])
+        engine_time = int(params['msgAuthoritativeEngineTime'])
+
+        session = self._usm_sessions.get(device['id'])
+        if session is None or session.user.key != user.key or session.engine_id != engine_id:
+            # New user or agent engine: only cached once a message verifies
+            session = UsmSession(user)
+            session.set_engine(engine_id, boots, engine_time)
+        elif boots < session.engine_boots or (
+            boots == session.engine_boots and engine_time < session.engine_time - TIME_WINDOW
+        ):
+            raise UsmError("not in time window")
+
+        pdu, _ = session.unwrap(message, data)
+        self._usm_sessions[device['id']] = session
+        return pdu
+
+    def _decode(self, data: bytes) -> Optional[Dict[str, Any]]:
+        """Decode a v1/v2c notification into its trap OID and varbinds"""
+        try:
+            version = int(api.decodeMessageVersion(data))
+            p_mod = api.protoModules[version]
+            message, _ = decoder.decode(data, asn1Spec=p_mod.Message())
+            pdu = p_mod.apiMessage.getPDU(message)
+        except (PyAsn1Error, KeyError, ValueError) as e:
+            logger.debug(f"Dropping undecodable notification: {e}")
+            return None
+
+        community = str(p_mod.apiMessage.getCommunity(message))
+
+        if version == api.protoVersion1:
+            if not pdu.isSameTypeWith(p_mod.TrapPDU()):
+                return None
+            # RFC 3584 translation of the v1 trap header into a v2 trap OID
+            generic = int(p_mod.apiTrapPDU.getGenericTrap(pdu))
+            enterprise = str(p_mod.apiTrapPDU.getEnterprise(pdu))
+            if generic == 6:
+                trap_oid = f"{enterprise}.0.{int(p_mod.apiTrapPDU.getSpecificTrap(pdu))}"
+            else:
+                trap_oid = f"{OID_SNMP_TRAPS}.{generic + 1}"
+            return {
+                'community': community,
+                'trap_oid': trap_oid,
+                'uptime': int(p_mod.apiTrapPDU.getTimeStamp(pdu)),
+                'var_binds': {str(oid): value for oid, value in p_mod.apiTrapPDU.getVarBinds(pdu)},
+                'agent_address': p_mod.apiTrapPDU.getAgentAddr(pdu).prettyPrint(),
+                'inform': None
+            }
+
+        is_inform = pdu.isSameTypeWith(p_mod.InformRequestPDU())
+        if not is_inform and not pdu.isSameTypeWith(p_mod.TrapPDU()):
+            return None
+
+        var_binds = {str(oid): value for oid, value in p_mod.apiPDU.getVarBinds(pdu)}
+        trap_oid = var_binds.pop(OID_SNMP_TRAP_OID, None)
+        if trap_oid is None:
+            return None
+        uptime = var_binds.pop(OID_SYS_UPTIME, None)
+
+        return {
+            'community': community,
+            'trap_oid': str(trap_oid),
+            'uptime': int(uptime) if uptime is not None else None,
+            'var_binds': var_binds,
+            'agent_address': None,
+            'inform': (p_mod, message) if is_inform else None
+        }
+
+    def _acknowledge(self, inform: Tuple, addr):
+        """Answer an inform with a Response carrying the same varbinds"""
+        p_mod, message = inform
+        response = p_mod.apiMessage.getResponse(message)
+        p_mod.apiPDU.setVarBinds(
+            p_mod.apiMessage.getPDU(response),
+            p_mod.apiPDU.getVarBinds(p_mod.apiMessage.getPDU(message))
+        )
+        if self._transport is not None:
+            self._transport.sendto(encoder.encode(response), addr)
+            self.stats['informs_acknowledged'] += 1
+
+    def _interpret(
+        self,
+        device: Dict[str, Any],
+        notification: Dict[str, Any],
+        device_updates: Dict[Any, Dict[str, Any]],
+        port_updates: List[Dict[str, Any]]
+    ):
+        trap_oid = notification['trap_oid']
+        var_binds = notification['var_binds']
+        now = datetime.now(timezone.utc)
+
+        # Any authenticated notification proves the device is up
+        values = device_updates.setdefault(device['id'], {})
+        values.update({'status': DeviceStatus.ONLINE, 'last_seen': now})
+
+        if trap_oid in (TRAP_COLD_START, TRAP_WARM_START):
+            logger.info(f"{device['name']} restarted")
+            if notification['uptime'] is not None:
+                values['uptime'] = SNMPClient.uptime_seconds(notification['uptime'])
+
+        elif trap_oid in (TRAP_LINK_DOWN, TRAP_LINK_UP):
+            if_index = self._column_value(var_binds, OID_IF_INDEX)
+            if if_index is None:
+                # Some agents only send ifAdminStatus/ifOperStatus; take the index from the OID
+                if_index = self._column_index(var_binds, SNMPClient.OID_IF_OPER_STATUS)
+            port_number = SNMPClient.port_number_for_if_index(if_index)
+            if port_number is None:
+                return
+
+            if trap_oid == TRAP_LINK_UP:
+                status = PortStatus.UP
+            elif self._column_value(var_binds, OID_IF_ADMIN_STATUS) == 2:
+                status = PortStatus.DISABLED
+            else:
+                status = PortStatus.DOWN
+
+            logger.info(f"{device['name']} port {port_number} is {status.value}")
+            port_updates.append({'device_id': device['id'], 'port_number': port_number, 'status': status})
+
+        elif trap_oid.startswith(OID_GAM_ALARM_TRAP + '.'):
+            self._interpret_alarm(device, trap_oid, var_binds, port_updates, now)
+
+        else:
+            logger.debug(f"Unhandled notification {trap_oid} from {device['name']}")
+
+    def _interpret_alarm(
+        self,
+        device: Dict[str, Any],
+        trap_oid: str,
+        var_binds: Dict[str, Any],
+        port_updates: List[Dict[str, Any]],
+        now: datetime
+    ):
+        # v2 form is gamAlarmTrap.N, v1-translated form is gamAlarmTrap.0.N
+        trap_type = int(trap_oid.rsplit('.', 1)[1])
+        alarm_index = self._column_value(var_binds, f"{OID_GAM_ALARM_ACTIVE_ENTRY}.{ALARM_COL_INDEX}")
+        if alarm_index is None:
+            alarm_index = self._column_index(var_binds, f"{OID_GAM_ALARM_ACTIVE_ENTRY}.{ALARM_COL_IF_INDEX}")
+        if alarm_index is None:
+            return
+        key = (device['id'], alarm_index)
+
+        if trap_type in (ALARM_TRAP_ADD, ALARM_TRAP_MOD):
+            if_index = self._column_value(var_binds, f"{OID_GAM_ALARM_ACTIVE_ENTRY}.{ALARM_COL_IF_INDEX}")
+            service_affecting = self._column_value(
+                var_binds, f"{OID_GAM_ALARM_ACTIVE_ENTRY}.{ALARM_COL_SERVICE_AFFECTING}"
+            ) == 1
+            port_number = SNMPClient.port_number_for_if_index(if_index)
+            logger.warning(
+                f"Alarm {alarm_index} on {device['name']} (ifIndex={if_index}, "
+                f"service_affecting={service_affecting})"
+            )
+            if port_number is None or not service_affecting:
+                self._port_alarms.pop(key, None)
+                return
+
+            self._port_alarms[key] = if_index
+            port_updates.append({
+                'device_id': device['id'],
+                'port_number': port_number,
+                'status': PortStatus.ERROR,
+                'error_at': now
+            })
+
+        elif trap_type == ALARM_TRAP_DEL:
+            if_index = self._port_alarms.pop(key, None)
+            logger.info(f"Alarm {alarm_index} on {device['name']} cleared")
+            if if_index is not None and if_index not in {
+                i for (device_id, _), i in self._port_alarms.items() if device_id == device['id']
+            }:
+                # The alarm says nothing about the link; read it back
+                task = asyncio.create_task(self._refresh_port(device, if_index))
+                self._refreshes.add(task)
+                task.add_done_callback(self._refreshes.discard)
+
+    async def _refresh_port(self, device: Dict[str, Any], if_index: int):
+        """Read a port's current oper status and queue it for writing"""
+        snmp_client = SNMPClient.for_device(device)
+        try:
+            status = await snmp_client.get_interface_status(if_index)
+        except Exception as e:
+            logger.warning(f"Could not read ifIndex {if_index} on {device['name']}: {e}")
+            return
+        if status['operational_status'] is None:
+            return
+
+        self._enqueue(('port', {
+            'device_id': device['id'],
+            'port_number': SNMPClient.port_number_for_if_index(if_index),
+            'status': PortStatus.UP if status['operational_status'] == '1' else PortStatus.DOWN,
+            'only_if': PortStatus.ERROR
+        }))
+
+    @staticmethod
+    def _column_value(var_binds: Dict[str, Any], column_oid: str) -> Optional[int]:
+        prefix = column_oid + '.'
+        for oid, value in var_binds.items():
+            if oid.startswith(prefix):
+                try:
+                    return int(value)
+                except (TypeError, ValueError):
+                    return None
+        return None
+
+    @staticmethod
+    def _column_index(var_binds: Dict[str, Any], column_oid: str) -> Optional[int]:
+        prefix = column_oid + '.'
+        for oid in var_binds:
+            if oid.startswith(prefix):
+                return int(oid[len(prefix):].split('.')[0])
+        return None
+
+    async def _resolve_device(
+        self,
+        ip_address: str,
+        agent_address: Optional[str] = None,
+        reload: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        device = self._devices.get(ip_address) or self._devices.get(agent_address)
+        if (device is None or reload) and time.monotonic() - self._devices_loaded_at >= DEVICE_REFRESH_INTERVAL:
+            await self._load_devices()
+            device = self._devices.get(ip_address) or self._devices.get(agent_address)
+        return device
+
+    async def _load_devices(self):
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(
+                    GAMDevice.id,
+                    GAMDevice.name,
+                    GAMDevice.ip_address,
+                    GAMDevice.snmp_community,
+                    GAMDevice.snmp_version,
+                    GAMDevice.snmp_v3_username,
+                    GAMDevice.snmp_v3_auth_protocol,
+                    GAMDevice.snmp_v3_auth_password,
+                    GAMDevice.snmp_v3_priv_protocol,
+                    GAMDevice.snmp_v3_priv_password
+                )
+            )
+            self._devices = {row.ip_address: dict(row._mapping) for row in result.all()}
+        self._devices_loaded_at = time.monotonic()
+
+    async def _apply(self, device_updates: Dict[Any, Dict[str, Any]], port_updates: List[Dict[str, Any]]):
+        """Write the state changes from one batch of notifications in a single transaction"""
+        if not device_updates and not port_updates:
+            return
+
+        async with self.session_factory() as session:
+            async with session.begin():
+                for device_id, values in device_updates.items():
+                    # Devices under maintenance keep their status until released
+                    await session.execute(
+                        update(GAMDevice)
+                        .where(GAMDevice.id == device_id, GAMDevice.status != DeviceStatus.MAINTENANCE)
+                        .values(**values)
+                    )
+
+                # Applied in arrival order so a flap ends in its final state
+                for change in port_updates:
+                    stmt = update(GAMPort).where(
+                        GAMPort.gam_device_id == change['device_id'],
+                        GAMPort.port_number == change['port_number']
+                    )
+                    if change.get('only_if') is not None:
+                        stmt = stmt.where(GAMPort.status == change['only_if'])
+
+                    values = {'status': change['status']}
+                    if change.get('error_at') is not None:
+                        values['last_error'] = change['error_at']
+                        values['error_count'] = GAMPort.error_count + 1
+                    await session.execute(stmt.values(**values))
+
+
+# Global trap receiver, started with the application
+trap_receiver = TrapReceiver()
@@ -0,0 +1,96 @@
+"""Single-pass parser for the tables in GAM CLI show output"""
+import re
+from typing import Any, Callable, Dict, List, Tuple
+
+# Cell kinds: (regex, converter)
+INT = (r'\d+', int)
+TOKEN = (r'\S+', None)
+NAME = (r'"[^"]*"|\S+', lambda value: value.strip('"'))  # Quoted names may contain spaces
+
+# A line of dashes (optionally in groups) between the header and the rows
+SEPARATOR_LINE = re.compile(r'^[ \t]*-{3,}[- \t]*$', re.MULTILINE)
+
+
+class CliTable:
+    """
+    Parser for one kind of CLI table, compiled once at import.
+
+    Columns are given in order as (name, kind) or (name, kind, default);
+    columns with a default may be missing from the end of a row. A table
+    has at least two columns.
+
+    The columns are compiled into a single row regex, and parse() runs it
+    over the output after the header separator with findall(), so the
+    output is scanned once, in C, without splitting it into lines or
+    tokens. Lines that do not fit the columns (headers, prompts, % messages,
+    blank lines) simply do not match, and cells are already validated when
+    they are converted. Each row is then built from a list of (name, index,
+    converter, default) computed here, so building a row does no more than
+    index, convert and store each cell.
+    """
+
+    def __init__(self, *columns: Tuple):
+        self.names: List[str] = []
+        self.cells: List[Tuple[str, int, Callable[[str], Any], Any]] = []
+        pattern = r'^[ \t]*'
+
+        for index, column in enumerate(columns):
+            name, (cell, converter) = column[0], column[1]
+            optional = len(column) > 2
+            self.names.append(name)
+            # A missing optional cell matches as '' and takes the default;
+            # a required cell always matches something
+            self.cells.append((name, index, converter or str, column[2] if optional else None))
+
+            cell = f"({cell})"
+            if index:
+                cell = r'[ \t]+' + cell
+            pattern += f"(?:{cell})?" if optional else cell
+
+        self.row = re.compile(pattern + r'(?:[ \t].*)?$', re.MULTILINE)
+
+        cells = tuple(self.cells)
+
+        def build_row(c: Tuple[str, ...]) -> Dict[str, Any]:
+            return {name: convert(c[i]) if c[i] else default for name, i, convert, default in cells}
+
+        self.build_row: Callable[[Tuple[str, ...]], Dict[str, Any]] = build_row
+
+    def parse(self, output: str) -> List[Dict[str, Any]]:
+        """Parse every row of the table in output"""
+        separator = SEPARATOR_LINE.search(output)
+        start = separator.end() if separator else 0
+        return list(map(self.build_row, self.row.findall(output, start)))
+
+
+# show ghn discover all
+GHN_DISCOVER_TABLE = CliTable(
+    ('port', INT),
+    ('mac_address', TOKEN),
+    ('configured', TOKEN, 'unknown'),
+    ('is_up', TOKEN, 'unknown')
+)
+
+# show ghn endpoint
+GHN_ENDPOINT_TABLE = CliTable(
+    ('id', INT),
+    ('name', NAME),
+    ('mac_address', TOKEN),
+    ('port', INT)
+)
+
+# show ghn subscriber
+GHN_SUBSCRIBER_TABLE = CliTable(
+    ('id', INT),
+    ('name', NAME),
+    ('vlan_id', INT),
+    ('endpoint_id', INT),
+    ('bw_profile', TOKEN, None)
+)
+
+# show ghn port
+GHN_PORT_TABLE = CliTable(
+    ('port_number', INT),
+    ('status', TOKEN, 'unknown'),
+    ('link_state', TOKEN, 'unknown')
+)
@@ -0,0 +1,13 @@
+"""Field access for device records given as models or mappings"""
+from collections.abc import Mapping
+from typing import Any
+
+
+def device_field(device: Any, name: str) -> Any:
+    """
+    Read a field of a GAMDevice, or of a mapping with the same field names
+    (as the fleet poller, fan-out and simulators pass). Missing fields are None.
+    """
+    if isinstance(device, Mapping):
+        return device.get(name)
+    return getattr(device, name, None)
@@ -0,0 +1,237 @@
+"""Client for the GAM JSON-RPC management API"""
+import httpx
+import itertools
+import logging
+from typing import Optional, Dict, List, Any
+from ..config import settings
+from .ssh_client import config_write_listeners
+from .device_fields import device_field
+
+logger = logging.getLogger(__name__)
+
+# Startup config save, the JSON-RPC equivalent of 'write memory'
+SAVE_RUNNING_CONFIG = {
+    'Copy': True,
+    'SourceConfigType': 'runningConfig',
+    'SourceConfigFile': 'runningConfig',
+    'DestinationConfigType': 'startupConfig',
+    'DestinationConfigFile': 'startupConfig',
+    'Merge': False
+}
+
+# G.hn port modes (ghnAgent.config.port PortMode)
+PORT_MODE_MIMO = 'mimo'
+PORT_MODE_SISO = 'siso'
+
+
+def ghn_ifindex(port_number: int, unit: int = 1) -> str:
+    """Interface index of a G.hn port as the JSON-RPC API names it, e.g. 'G.hn 1/4'"""
+    return f"G.hn {unit}/{port_number}"
+
+
+def ghn_port_number(ifindex: Any) -> Optional[int]:
+    """Port number from a G.hn interface index; None when not on a G.hn port"""
+    if not isinstance(ifindex, str) or not ifindex.startswith('G.hn'):
+        return None
+    try:
+        return int(ifindex.rsplit('/', 1)[-1])
+    except ValueError:
+        return None
+
+
+class GamJsonRpcError(Exception):
+    """The GAM answered a JSON-RPC call with an error object"""
+
+    def __init__(self, method: str, code: Optional[int], message: str, data: Optional[Dict[str, Any]] = None):
+        super().__init__(f"{method}: {message} ({code})")
+        self.method = method
+        self.code = code
+        self.message = message
+        self.data = data or {}
+
+    @property
+    def vtss_error_code(self) -> Optional[int]:
+        return self.data.get('vtss-error-code')
+
+
+class GamJsonRpcPool:
+    """
+    HTTP connections shared by every GamJsonRpcClient in the process.
+
+    Each call is one POST, and the connection to the device is kept alive
+    for keepalive_expiry seconds, so a burst of calls against a GAM costs
+    one TCP handshake instead of one per call. At most max_connections
+    requests are in flight across all devices.
+    """
+
+    def __init__(self, max_connections: int = 100, keepalive_expiry: float = 30, timeout: float = 10):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout)
+        return self._client
+
+    async def aclose(self):
+        """Close all pooled connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Global connection pool shared by every GamJsonRpcClient
+jsonrpc_pool = GamJsonRpcPool(
+    max_connections=settings.gam_jsonrpc_max_connections,
+    keepalive_expiry=settings.gam_jsonrpc_keepalive_expiry,
+    timeout=settings.gam_jsonrpc_timeout
+)
+
+
+class GamJsonRpcClient:
+    """
+    JSON-RPC client for one GAM device.
+
+    Calls POST to http://<device>:<port>/json_rpc with HTTP basic auth, the
+    same accounts as the CLI. Configuration is read and written as JSON
+    objects, so there is no prompt handling or output scraping involved.
+    """
+
+    def __init__(
+        self,
+        ip_address: str,
+        username: str,
+        password: str,
+        port: int = 80,
+        timeout: Optional[float] = None,
+        scheme: Optional[str] = None
+    ):
+        self.ip_address = ip_address
+        self.username = username
+        self.password = password
+        self.port = port or 80
+        self.timeout = timeout
+        self.url = f"{scheme or settings.gam_jsonrpc_scheme}://{ip_address}:{self.port}/json_rpc"
+        self._auth = httpx.BasicAuth(username, password)
+        self._ids = itertools.count(1)
+
+    @classmethod
+    def for_device(cls, device: Any, timeout: Optional[float] = None) -> Optional["GamJsonRpcClient"]:
+        """
+        Build a client from a GAMDevice, or a mapping with the same field names.
+
+        Uses the device's CLI credentials (ssh_username/ssh_password, falling
+        back to the legacy ssh_credentials field). Returns None when the
+        device has no password.
+        """
+        username, password = device_field(device, 'ssh_username'), device_field(device, 'ssh_password')
+        if not username or not password:
+            legacy = device_field(device, 'ssh_credentials') or {}
+            username = legacy.get('username')
+            password = legacy.get('password')
+        if not username or not password:
+            return None
+
+        return cls(
+            device_field(device, 'ip_address'),
+            username,
+            password,
+            port=device_field(device, 'api_port') or 80,
+            timeout=timeout
+        )
+
+    async def call(self, method: str, *params: Any) -> Any:
+        """
+        Call a JSON-RPC method and return its result.
+
+        Raises GamJsonRpcError when the device reports an error, and
+        httpx.HTTPError when it cannot be reached.
+        """
+        request_id = next(self._ids)
+        response = await jsonrpc_pool.client.post(
+            self.url,
+            json={'method': method, 'params': list(params), 'id': request_id},
+            auth=self._auth,
+            timeout=self.timeout or httpx.USE_CLIENT_DEFAULT
+        )
+        response.raise_for_status()
+        body = response.json()
+
+        if not method.endswith('.get'):
+            # Notified even when the call failed; it may have been applied in part
+            for listener in config_write_listeners:
+                listener(self.ip_address)
+
+        error = body.get('error')
+        if error:
+            raise GamJsonRpcError(method, error.get('code'), error.get('message', 'Unknown error'), error.get('data'))
+        if body.get('id') not in (request_id, str(request_id)):
+            raise GamJsonRpcError(method, None, f"Response id {body.get('id')!r} does not match request {request_id}")
+        return body.get('result')
+
+    async def get_all(self, method: str) -> Dict[Any, Dict[str, Any]]:
+        """Call a get-all method and return its [{key, val}] result as a dict"""
+        return {entry['key']: entry['val'] for entry in await self.call(method) or []}
+
+    async def get_global_config(self) -> Dict[str, Any]:
+        return await self.call('ghnAgent.config.global.get')
+
+    async def set_global_config(self, config: Dict[str, Any]):
+        await self.call('ghnAgent.config.global.set', config)
+
+    async def get_bw_profiles(self) -> Dict[str, Dict[str, Any]]:
+        """Bandwidth profiles by name"""
+        return await self.get_all('ghnAgent.config.bwProfileByName.get')
+
+    async def set_bw_profile(self, name: str, config: Dict[str, Any], add: bool = False):
+        await self.call(f"ghnAgent.config.bwProfileByName.{'add' if add else 'set'}", name, config)
+
+    async def get_subscribers(self) -> Dict[str, Dict[str, Any]]:
+        """Subscribers by name"""
+        return await self.get_all('ghnAgent.config.userByName.get')
+
+    async def set_subscriber(self, name: str, config: Dict[str, Any], add: bool = False):
+        await self.call(f"ghnAgent.config.userByName.{'add' if add else 'set'}", name, config)
+
+    async def delete_subscriber(self, name: str):
+        await self.call('ghnAgent.config.userByName.del', name)
+
+    async def get_endpoints(self) -> Dict[str, Dict[str, Any]]:
+        """Configured endpoints by name"""
+        return await self.get_all('ghnAgent.config.endpointByName.get')
+
+    async def get_endpoint_status(self) -> Dict[str, Dict[str, Any]]:
+        """Every endpoint the GAM knows of, configured or detected, by MAC address"""
+        return await self.get_all('ghnAgent.status.endpointByMac.brief.get')
+
+    async def get_ports(self) -> Dict[str, Dict[str, Any]]:
+        """G.hn port configuration by interface index"""
+        return await self.get_all('ghnAgent.config.port.get')
+
+    async def get_port(self, ifindex: str) -> Dict[str, Any]:
+        """G.hn configuration of one port (PortMode, ...)"""
+        return await self.call('ghnAgent.config.port.get', ifindex)
+
+    async def set_port(self, ifindex: str, config: Dict[str, Any]):
+        await self.call('ghnAgent.config.port.set', ifindex, config)
+
+    async def get_interface_config(self, ifindex: str) -> Dict[str, Any]:
+        """Interface configuration of one port (Shutdown, ...)"""
+        return await self.call('port.config.get', ifindex)
+
+    async def set_interface_config(self, ifindex: str, config: Dict[str, Any]):
+        await self.call('port.config.set', ifindex, config)
+
+    async def get_interface_status(self, ifindex: str) -> Dict[str, Any]:
+        """Interface status of one port (Link, ...)"""
+        return await self.call('port.status.get', ifindex)
+
+    async def save_config(self):
+        """Copy the running config to the startup config"""
+        await self.call('icfg.control.copy.set', SAVE_RUNNING_CONFIG)
@@ -1,8 +1,15 @@
 """SNMP client for GAM device communication"""
-from pysnmp.hlapi import *
+from pysnmp.proto.api import v2c
+import asyncio
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, AsyncIterator, Tuple
 from ..config import settings
+from .snmp_engine import (
+    snmp_registry, SnmpError, SnmpCircuitOpen, SnmpTarget, SNMP_V1, SNMP_V2C,
+    ERROR_TOO_BIG, ERROR_NO_SUCH_NAME, error_status_name, is_exception_value
+)
+from .snmp_usm import UsmUser
+from .device_fields import device_field
 
 logger = logging.getLogger(__name__)
 
@@ -18,118 +25,331 @@ class SNMPClient:
     OID_IF_DESC = '1.3.6.1.2.1.2.2.1.2'
     OID_IF_OPER_STATUS = '1.3.6.1.2.1.2.2.1.8'
     OID_IF_ADMIN_STATUS = '1.3.6.1.2.1.2.2.1.7'
+    OID_IF_PHYS_ADDRESS = '1.3.6.1.2.1.2.2.1.6'
+    OID_ENT_PHYSICAL_SERIAL = '1.3.6.1.2.1.47.1.1.1.1.11'
+    OID_IF_IN_OCTETS = '1.3.6.1.2.1.2.2.1.10'
+    OID_IF_OUT_OCTETS = '1.3.6.1.2.1.2.2.1.16'
+    OID_IF_HC_IN_OCTETS = '1.3.6.1.2.1.31.1.1.1.6'
+    OID_IF_HC_OUT_OCTETS = '1.3.6.1.2.1.31.1.1.1.10'
+
+    # Interface tables (entry OIDs) and the columns polled from them
+    OID_IF_ENTRY = '1.3.6.1.2.1.2.2.1'
+    OID_IFX_ENTRY = '1.3.6.1.2.1.31.1.1.1'
+    IF_COL_DESCR = 2
+    IF_COL_ADMIN_STATUS = 7
+    IF_COL_OPER_STATUS = 8
+    IFX_COL_NAME = 1
+    IFX_COL_HC_IN_OCTETS = 6
+    IFX_COL_HC_OUT_OCTETS = 10
+    IFX_COL_HIGH_SPEED = 15
+
+    # Bridge forwarding tables
+    OID_DOT1D_BASE_PORT_ENTRY = '1.3.6.1.2.1.17.1.4.1'
+    OID_DOT1D_TP_FDB_PORT = '1.3.6.1.2.1.17.4.3.1.2'
+    OID_DOT1Q_TP_FDB_PORT = '1.3.6.1.2.1.17.7.1.2.2.1.2'
+    OID_DOT1Q_VLAN_CURRENT_ENTRY = '1.3.6.1.2.1.17.7.1.4.2.1'
+
+    # Positron G.hn endpoint MAC OUI
+    POSITRON_OUI = '00:0e:d8'
+
+    # G.hn port N is reported as ifIndex GHN_IF_INDEX_BASE + N (1000001, ...)
+    GHN_IF_INDEX_BASE = 1000000
 
     def __init__(
         self,
         ip_address: str,
         community: Optional[str] = None,
         timeout: Optional[int] = None,
-        retries: Optional[int] = None
+        retries: Optional[int] = None,
+        usm_user: Optional[UsmUser] = None,
+        port: int = 161
     ):
         self.ip_address = ip_address
+        self.port = port
         self.community = community or settings.default_snmp_community
         self.timeout = timeout or settings.snmp_timeout
         self.retries = retries or settings.snmp_retries
+        self.usm_user = usm_user
+
+    @classmethod
+    def for_device(cls, device: Any) -> "SNMPClient":
+        """
+        Build a client from a GAMDevice, or a mapping with the same field names.
+
+        Devices with snmp_version 'v3' use their USM credentials, all others
+        their community. A mapping may also give an snmp_port, for agents not
+        on port 161 such as the simulated ones in scripts/snmp_agent_simulator.py.
+        """
+        usm_user = None
+        if device_field(device, 'snmp_version') == 'v3':
+            usm_user = UsmUser(
+                device_field(device, 'snmp_v3_username'),
+                auth_protocol=device_field(device, 'snmp_v3_auth_protocol'),
+                auth_password=device_field(device, 'snmp_v3_auth_password'),
+                priv_protocol=device_field(device, 'snmp_v3_priv_protocol'),
+                priv_password=device_field(device, 'snmp_v3_priv_password')
+            )
+        return cls(
+            device_field(device, 'ip_address'),
+            device_field(device, 'snmp_community'),
+            usm_user=usm_user,
+            port=device_field(device, 'snmp_port') or 161
+        )
+
+    async def _target(
+        self,
+        version: int = SNMP_V2C,
+        timeout: Optional[float] = None,
+        retries: Optional[int] = None
+    ) -> SnmpTarget:
+        """Get the shared transport target for this device"""
+        return await snmp_registry.get_target(
+            self.ip_address,
+            self.port,
+            community=self.community,
+            version=version,
+            timeout=timeout or self.timeout,
+            retries=self.retries if retries is None else retries,
+            usm_user=self.usm_user
+        )
 
     async def get(self, oid: str) -> Optional[str]:
         """Get single SNMP value"""
-        try:
-            iterator = getCmd(
-                SnmpEngine(),
-                CommunityData(self.community),
-                UdpTransportTarget((self.ip_address, 161), timeout=self.timeout, retries=self.retries),
-                ContextData(),
-                ObjectType(ObjectIdentity(oid))
-            )
+        values = await self.get_many([oid])
+        return values.get(oid)
 
-            errorIndication, errorStatus, errorIndex, varBinds = next(iterator)
+    async def get_many(self, oids: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Get many SNMP values in as few round trips as the agent allows.
 
-            if errorIndication:
-                logger.error(f"SNMP error: {errorIndication}")
-                return None
-            elif errorStatus:
-                logger.error(f"SNMP error: {errorStatus.prettyPrint()}")
-                return None
-            else:
-                for varBind in varBinds:
-                    return str(varBind[1])
+        OIDs are packed into GET PDUs of up to the target's max_varbinds. When
+        the agent answers tooBig the PDU is split in half and retried, and the
+        smaller size is remembered for later requests to the same device.
+
+        Returns a dict keyed by the requested OIDs; values the agent does not
+        have (or that could not be fetched) are None.
+        """
+        # Preserve order, drop duplicates
+        oids = list(dict.fromkeys(oids))
+        results: Dict[str, Optional[str]] = {oid: None for oid in oids}
+        if not oids:
+            return results
 
+        try:
+            target = await self._target()
+            for start in range(0, len(oids), target.max_varbinds):
+                await self._get_chunk(target, oids[start:start + target.max_varbinds], results)
+
+        except SnmpCircuitOpen as e:
+            logger.debug(str(e))
+        except SnmpError as e:
+            logger.error(f"SNMP error: {e}")
         except Exception as e:
             logger.error(f"SNMP get error for {self.ip_address}: {e}")
-            return None
+
+        return results
+
+    async def _get_chunk(self, target: SnmpTarget, oids: List[str], results: Dict[str, Optional[str]]):
+        """Fetch one PDU worth of OIDs, splitting on tooBig"""
+        error_status, error_index, var_binds = await snmp_registry.engine.request(
+            target, 'get', [(v2c.ObjectIdentifier(oid), v2c.null) for oid in oids]
+        )
+
+        if error_status == ERROR_TOO_BIG and len(oids) > 1:
+            half = len(oids) // 2
+            target.max_varbinds = min(target.max_varbinds, half)
+            logger.debug(f"{self.ip_address} answered tooBig, lowering PDU size to {half} varbinds")
+            await self._get_chunk(target, oids[:half], results)
+            await self._get_chunk(target, oids[half:], results)
+            return
+
+        if error_status == ERROR_NO_SUCH_NAME and 0 < error_index <= len(oids):
+            # SNMPv1 agents reject the whole PDU for one missing OID
+            remaining = oids[:error_index - 1] + oids[error_index:]
+            if remaining:
+                await self._get_chunk(target, remaining, results)
+            return
+
+        if error_status:
+            logger.error(f"SNMP error: {error_status_name(error_status)}")
+            return
+
+        for oid, (name, value) in zip(oids, var_binds):
+            results[oid] = None if is_exception_value(value) else str(value)
 
     async def get_bulk(self, oid: str, max_repetitions: int = 10) -> Dict[str, Any]:
         """Get multiple SNMP values using GETBULK"""
         results = {}
         try:
-            iterator = bulkCmd(
-                SnmpEngine(),
-                CommunityData(self.community),
-                UdpTransportTarget((self.ip_address, 161), timeout=self.timeout, retries=self.retries),
-                ContextData(),
-                0, max_repetitions,
-                ObjectType(ObjectIdentity(oid)),
-                lexicographicMode=False
-            )
-
-            for errorIndication, errorStatus, errorIndex, varBinds in iterator:
-                if errorIndication:
-                    logger.error(f"SNMP error: {errorIndication}")
-                    break
-                elif errorStatus:
-                    logger.error(f"SNMP error: {errorStatus.prettyPrint()}")
-                    break
-                else:
-                    for varBind in varBinds:
-                        oid_str = str(varBind[0])
-                        value = str(varBind[1])
-                        results[oid_str] = value
+            async for name, value in self.walk(oid, max_repetitions=max_repetitions):
+                results[str(name)] = str(value)
 
+        except SnmpError as e:
+            logger.error(f"SNMP error: {e}")
         except Exception as e:
             logger.error(f"SNMP get_bulk error for {self.ip_address}: {e}")
 
         return results
 
+    async def walk(
+        self,
+        oid: str,
+        max_rows: Optional[int] = None,
+        version: int = SNMP_V2C,
+        timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+        max_repetitions: Optional[int] = None
+    ) -> AsyncIterator[Tuple[Any, Any]]:
+        """
+        Walk a subtree, yielding (oid, value) pairs as each response arrives.
+
+        Uses GETBULK (max_repetitions rows per PDU) on SNMPv2c and SNMPv3
+        targets and GETNEXT on SNMPv1. max_rows optionally caps the number of rows yielded.
+        """
+        target = await self._target(version, timeout, retries)
+        root = v2c.ObjectIdentifier(oid)
+        current = root
+        rows = 0
+        repetitions = max_repetitions or settings.snmp_bulk_max_repetitions
+
+        while max_rows is None or rows < max_rows:
+            if target.version == SNMP_V1:
+                error_status, error_index, var_binds = await snmp_registry.engine.request(
+                    target, 'next', [(current, v2c.null)]
+                )
+            else:
+                error_status, error_index, var_binds = await snmp_registry.engine.request(
+                    target, 'bulk', [(current, v2c.null)], 0, repetitions
+                )
+                if error_status == ERROR_TOO_BIG and repetitions > 1:
+                    repetitions = max(1, repetitions // 2)
+                    continue
+
+            # noSuchName marks the end of the MIB view for SNMPv1 agents
+            if error_status or not var_binds:
+                return
+
+            for name, value in var_binds:
+                if is_exception_value(value) or not root.isPrefixOf(name) or name <= current:
+                    return
+
+                yield name, value
+                current = name
+                rows += 1
+                if max_rows is not None and rows >= max_rows:
+                    return
+
+    async def walk_table(
+        self,
+        table_oid: str,
+        columns: List[int],
+        max_repetitions: Optional[int] = None
+    ) -> Dict[Tuple[int, ...], Dict[int, Any]]:
+        """
+        Walk selected columns of a conceptual table with GETBULK.
+
+        table_oid is the table entry OID (e.g. ifEntry 1.3.6.1.2.1.2.2.1) and
+        columns the column sub-identifiers to fetch. All columns advance
+        together in each PDU, and a column drops out of the request once it
+        reaches the end of its subtree, so the walk stops at the end of the
+        table instead of probing for it. SNMPv1-style agents that reject
+        GETBULK are walked with multi-varbind GETNEXT instead.
+
+        Returns rows keyed by index (the OID suffix after the column, as a
+        tuple) with a dict of column -> raw SNMP value for each row.
+        """
+        rows: Dict[Tuple[int, ...], Dict[int, Any]] = {}
+        target = await self._target()
+        entry = v2c.ObjectIdentifier(table_oid)
+        repetitions = max_repetitions or max(1, settings.snmp_bulk_max_repetitions // max(1, len(columns)))
+
+        # Current position of each column still being walked
+        cursors = {column: entry + (column,) for column in columns}
+        use_bulk = target.version != SNMP_V1
+
+        while cursors:
+            active = list(cursors)
+            var_binds_in = [(cursors[column], v2c.null) for column in active]
+
+            if use_bulk:
+                error_status, error_index, var_binds = await snmp_registry.engine.request(
+                    target, 'bulk', var_binds_in, 0, repetitions
+                )
+                if error_status == ERROR_TOO_BIG and repetitions > 1:
+                    repetitions = max(1, repetitions // 2)
+                    continue
+            else:
+                error_status, error_index, var_binds = await snmp_registry.engine.request(
+                    target, 'next', var_binds_in
+                )
+
+            if error_status == ERROR_NO_SUCH_NAME and not use_bulk and 0 < error_index <= len(active):
+                # End of the MIB view for this column on an SNMPv1 agent
+                cursors.pop(active[error_index - 1])
+                continue
+
+            if error_status or not var_binds:
+                if error_status:
+                    logger.error(f"SNMP error walking {table_oid}: {error_status_name(error_status)}")
+                break
+
+            # Response varbinds are interleaved: one per active column per repetition
+            for position, (name, value) in enumerate(var_binds):
+                column = active[position % len(active)]
+                if column not in cursors:
+                    continue
+
+                column_oid = entry + (column,)
+                if is_exception_value(value) or not column_oid.isPrefixOf(name) or name <= cursors[column]:
+                    cursors.pop(column)
+                    continue
+
+                index = tuple(name[len(column_oid):])
+                rows.setdefault(index, {})[column] = value
+                cursors[column] = name
+
+        return rows
+
     async def set(self, oid: str, value: Any, value_type: str = 'i') -> bool:
         """Set SNMP value"""
         try:
             # Map value types: i=Integer, s=String, a=IpAddress, etc.
             if value_type == 'i':
-                value_obj = Integer(value)
+                value_obj = v2c.Integer(value)
             elif value_type == 's':
-                value_obj = OctetString(value)
+                value_obj = v2c.OctetString(value)
             else:
-                value_obj = OctetString(value)
-
-            iterator = setCmd(
-                SnmpEngine(),
-                CommunityData(self.community),
-                UdpTransportTarget((self.ip_address, 161), timeout=self.timeout, retries=self.retries),
-                ContextData(),
-                ObjectType(ObjectIdentity(oid), value_obj)
-            )
+                value_obj = v2c.OctetString(value)
 
-            errorIndication, errorStatus, errorIndex, varBinds = next(iterator)
+            target = await self._target()
+            error_status, error_index, var_binds = await snmp_registry.engine.request(
+                target, 'set', [(v2c.ObjectIdentifier(oid), value_obj)]
+            )
 
-            if errorIndication:
-                logger.error(f"SNMP set error: {errorIndication}")
-                return False
-            elif errorStatus:
-                logger.error(f"SNMP set error: {errorStatus.prettyPrint()}")
+            if error_status:
+                logger.error(f"SNMP set error: {error_status_name(error_status)}")
                 return False
             else:
                 return True
 
+        except SnmpError as e:
+            logger.error(f"SNMP set error: {e}")
+            return False
         except Exception as e:
             logger.error(f"SNMP set error for {self.ip_address}: {e}")
             return False
 
     async def get_system_info(self) -> Dict[str, Any]:
         """Get system information"""
+        values = await self.get_many([
+            self.OID_SYSTEM_DESC,
+            self.OID_SYSTEM_UPTIME,
+            self.OID_SYSTEM_NAME
+        ])
         return {
-            'description': await self.get(self.OID_SYSTEM_DESC),
-            'uptime': await self.get(self.OID_SYSTEM_UPTIME),
-            'name': await self.get(self.OID_SYSTEM_NAME)
+            'description': values[self.OID_SYSTEM_DESC],
+            'uptime': values[self.OID_SYSTEM_UPTIME],
+            'name': values[self.OID_SYSTEM_NAME]
         }
 
     async def get_interface_count(self) -> int:
@@ -143,39 +363,160 @@ class SNMPClient:
         oper_oid = f"{self.OID_IF_OPER_STATUS}.{interface_index}"
         admin_oid = f"{self.OID_IF_ADMIN_STATUS}.{interface_index}"
 
+        values = await self.get_many([desc_oid, oper_oid, admin_oid])
         return {
-            'description': await self.get(desc_oid),
-            'operational_status': await self.get(oper_oid),
-            'admin_status': await self.get(admin_oid)
+            'description': values[desc_oid],
+            'operational_status': values[oper_oid],
+            'admin_status': values[admin_oid]
         }
 
+    async def get_port_counters(self, if_indexes: List[int]) -> Optional[Dict[str, Any]]:
+        """
+        Sample octet counters for a set of interfaces together with sysUpTime.
+
+        The 64-bit ifHCIn/OutOctets are read in the same GET as sysUpTime so
+        the timestamp matches the counters; interfaces without HC counters
+        fall back to the 32-bit ifIn/OutOctets.
+
+        Returns {'uptime': ticks, 'counters': {ifIndex: (in, out, bits)}},
+        or None if the device did not answer.
+        """
+        oids = [self.OID_SYSTEM_UPTIME]
+        for if_index in if_indexes:
+            oids.append(f"{self.OID_IF_HC_IN_OCTETS}.{if_index}")
+            oids.append(f"{self.OID_IF_HC_OUT_OCTETS}.{if_index}")
+        values = await self.get_many(oids)
+
+        if values[self.OID_SYSTEM_UPTIME] is None:
+            return None
+
+        counters: Dict[int, Tuple[int, int, int]] = {}
+        missing = []
+        for if_index in if_indexes:
+            in_octets = values[f"{self.OID_IF_HC_IN_OCTETS}.{if_index}"]
+            out_octets = values[f"{self.OID_IF_HC_OUT_OCTETS}.{if_index}"]
+            if in_octets is None or out_octets is None:
+                missing.append(if_index)
+            else:
+                counters[if_index] = (int(in_octets), int(out_octets), 64)
+
+        if missing:
+            oids = []
+            for if_index in missing:
+                oids.append(f"{self.OID_IF_IN_OCTETS}.{if_index}")
+                oids.append(f"{self.OID_IF_OUT_OCTETS}.{if_index}")
+            legacy = await self.get_many(oids)
+            for if_index in missing:
+                in_octets = legacy[f"{self.OID_IF_IN_OCTETS}.{if_index}"]
+                out_octets = legacy[f"{self.OID_IF_OUT_OCTETS}.{if_index}"]
+                if in_octets is not None and out_octets is not None:
+                    counters[if_index] = (int(in_octets), int(out_octets), 32)
+
+        return {'uptime': int(values[self.OID_SYSTEM_UPTIME]), 'counters': counters}
+
     async def test_connection(self) -> bool:
-        """Test SNMP connectivity"""
+        """Test SNMP connectivity, even if the device's requests are suspended"""
+        try:
+            (await self._target()).reset_circuit()
+        except SnmpError:
+            return False
         result = await self.get(self.OID_SYSTEM_DESC)
         return result is not None
 
+    async def circuit_open(self) -> bool:
+        """Check whether requests to this device are suspended after repeated failures"""
+        try:
+            return (await self._target()).circuit_open()
+        except SnmpError:
+            return False
+
+    async def get_interface_table(self) -> Dict[int, Dict[str, Any]]:
+        """
+        Walk ifTable and ifXTable in bulk and merge them per interface.
+
+        Fetches ifDescr/ifAdminStatus/ifOperStatus plus ifName, the 64-bit
+        ifHCInOctets/ifHCOutOctets counters and ifHighSpeed. Both tables are
+        walked concurrently, so the cost scales with the number of PDUs rather
+        than the number of interfaces. Agents without ifXTable simply report
+        None for the ifXTable fields.
+
+        Returns a dict keyed by ifIndex.
+        """
+        if_rows, ifx_rows = await asyncio.gather(
+            self.walk_table(
+                self.OID_IF_ENTRY,
+                [self.IF_COL_DESCR, self.IF_COL_ADMIN_STATUS, self.IF_COL_OPER_STATUS]
+            ),
+            self.walk_table(
+                self.OID_IFX_ENTRY,
+                [self.IFX_COL_NAME, self.IFX_COL_HC_IN_OCTETS, self.IFX_COL_HC_OUT_OCTETS,
+                 self.IFX_COL_HIGH_SPEED]
+            ),
+            return_exceptions=True
+        )
+
+        if isinstance(if_rows, BaseException):
+            raise if_rows
+        if isinstance(ifx_rows, BaseException):
+            logger.debug(f"ifXTable walk failed on {self.ip_address}: {ifx_rows}")
+            ifx_rows = {}
+
+        interfaces = {}
+        for index, columns in sorted(if_rows.items()):
+            if len(index) != 1:
+                continue
+            if_index = index[0]
+            ifx = ifx_rows.get(index, {})
+
+            def _str(row, column):
+                return str(row[column]) if column in row else None
+
+            def _int(row, column):
+                return int(row[column]) if column in row else None
+
+            interfaces[if_index] = {
+                'description': _str(columns, self.IF_COL_DESCR),
+                'name': _str(ifx, self.IFX_COL_NAME),
+                'operational_status': _str(columns, self.IF_COL_OPER_STATUS),
+                'admin_status': _str(columns, self.IF_COL_ADMIN_STATUS),
+                'in_octets': _int(ifx, self.IFX_COL_HC_IN_OCTETS),
+                'out_octets': _int(ifx, self.IFX_COL_HC_OUT_OCTETS),
+                'high_speed': _int(ifx, self.IFX_COL_HIGH_SPEED),  # Mbps
+                'interface_index': if_index
+            }
+
+        return interfaces
+
     async def get_all_ports_status(self) -> Dict[int, Dict[str, Any]]:
         """
         Get status of all ports on the GAM device
         Returns a dict with port_number as key and port info as value
-        """
-        ports_info = {}
 
+        Ports are numbered 1..ifNumber as before; the walked interface table
+        can also hold higher ifIndexes (e.g. the G.hn ports at 1000001 and
+        up), which are left out so the keys stay the same.
+        """
         try:
-            # Get interface count first
-            interface_count = await self.get_interface_count()
+            interface_count, interfaces = await asyncio.gather(
+                self.get_interface_count(),
+                self.get_interface_table()
+            )
             logger.info(f"Device {self.ip_address} has {interface_count} interfaces")
 
-            # Query each interface
+            ports_info = {}
             for if_index in range(1, interface_count + 1):
-                port_info = await self.get_interface_status(if_index)
-
-                # Add interface index
-                port_info['interface_index'] = if_index
-
+                port_info = interfaces.get(if_index) or {
+                    'description': None,
+                    'name': None,
+                    'operational_status': None,
+                    'admin_status': None,
+                    'in_octets': None,
+                    'out_octets': None,
+                    'high_speed': None,
+                    'interface_index': if_index
+                }
                 # Determine port number (typically interface index maps to port number for GAM devices)
                 port_info['port_number'] = if_index
-
                 ports_info[if_index] = port_info
 
             return ports_info
@@ -190,23 +531,33 @@ class SNMPClient:
         Returns device info including model, firmware, serial, MAC, etc.
         """
         try:
-            # Get basic system info
-            system_info = await self.get_system_info()
-            if not system_info or not system_info.get('description'):
+            # Fetch everything discovery needs in a single round trip
+            # ifPhysAddress.1 is the MAC of the first interface,
+            # entPhysicalSerialNum.1 the chassis serial number (if supported)
+            mac_oid = f"{self.OID_IF_PHYS_ADDRESS}.1"
+            serial_oid = f"{self.OID_ENT_PHYSICAL_SERIAL}.1"
+            values = await self.get_many([
+                self.OID_SYSTEM_DESC,
+                self.OID_SYSTEM_UPTIME,
+                self.OID_SYSTEM_NAME,
+                self.OID_IF_NUMBER,
+                mac_oid,
+                serial_oid
+            ])
+
+            if not values[self.OID_SYSTEM_DESC]:
                 logger.error(f"Unable to get system description from {self.ip_address}")
                 return None
 
             # Extract model from system description
             # Expected format: "Positron GAM-12-M ..." or similar
-            sys_desc = system_info.get('description', '')
+            sys_desc = values[self.OID_SYSTEM_DESC]
             model = self._extract_model_from_description(sys_desc)
 
             # Get interface count to validate model
-            interface_count = await self.get_interface_count()
+            interface_count = int(values[self.OID_IF_NUMBER]) if values[self.OID_IF_NUMBER] else 0
 
-            # Get MAC address (from first interface)
-            # OID 1.3.6.1.2.1.2.2.1.6.1 is ifPhysAddress for interface 1
-            mac_address = await self.get('1.3.6.1.2.1.2.2.1.6.1')
+            mac_address = values[mac_oid]
             if mac_address:
                 # Convert MAC from hex string to readable format
                 mac_address = self._format_mac_address(mac_address)
@@ -214,9 +565,7 @@ class SNMPClient:
             # Get firmware version (may be in sysDescr or a custom OID)
             firmware = self._extract_firmware_from_description(sys_desc)
 
-            # Get serial number (if available via standard OID)
-            # OID 1.3.6.1.2.1.47.1.1.1.1.11.1 is entPhysicalSerialNum
-            serial_number = await self.get('1.3.6.1.2.1.47.1.1.1.1.11.1')
+            serial_number = values[serial_oid]
 
             device_info = {
                 'ip_address': self.ip_address,
@@ -225,8 +574,8 @@ class SNMPClient:
                 'serial_number': serial_number,
                 'mac_address': mac_address,
                 'system_description': sys_desc,
-                'system_name': system_info.get('name'),
-                'uptime': system_info.get('uptime'),
+                'system_name': values[self.OID_SYSTEM_NAME],
+                'uptime': values[self.OID_SYSTEM_UPTIME],
                 'interface_count': interface_count,
                 'discovered': True
             }
@@ -238,6 +587,18 @@ class SNMPClient:
             logger.error(f"Error discovering GAM device at {self.ip_address}: {e}")
             return None
 
+    @classmethod
+    def port_number_for_if_index(cls, if_index: Optional[int]) -> Optional[int]:
+        """Get the G.hn port number behind an ifIndex, or None for other interfaces"""
+        if if_index is None or if_index <= cls.GHN_IF_INDEX_BASE:
+            return None
+        return if_index - cls.GHN_IF_INDEX_BASE
+
+    @staticmethod
+    def uptime_seconds(time_ticks) -> int:
+        """Convert a sysUpTime value (hundredths of a second) to whole seconds"""
+        return int(time_ticks) // 100
+
     def _extract_model_from_description(self, sys_desc: str) -> Optional[str]:
         """Extract GAM model from system description"""
         import re
@@ -297,69 +658,59 @@ class SNMPClient:
         try:
             ports_info = {}
 
-            # Positron GAM port table base OID
+            # Positron GAM port table entry OID
             base_oid = '1.3.6.1.4.1.20095.2001.11.1.2.1.1'
 
-            # Query all port indices (discovered: 1000001-1000006)
-            # We'll query indices 1000001 through 1000020 to be safe
-            for idx in range(1000001, 1000021):
-                port_data = {}
-
-                # Sub-OIDs discovered (1-11):
-                # .2 = 2 (constant)
-                # .3 = varies (6 for most, 8 and 5 for others - possibly port number?)
-                # .4 = 0 (mostly)
-                # .5 = 0 or 1 (link status? 1 = connected?)
-                # .6 = 0 (unknown)
-                # .7 = 2014 or 2048 (bandwidth/speed?)
-                # .8 = 2 (status?)
-                # .9 = 0 (unknown)
-                # .10 = 2 (unknown)
-                # .11 = 0, 1, or 3 (varies - possibly active subscribers on coax port?)
-
-                # Try to get key values
-                sub_oid_3 = await self.get(f'{base_oid}.3.{idx}')  # Possible port number
-                sub_oid_5 = await self.get(f'{base_oid}.5.{idx}')  # Possible link status
-                sub_oid_7 = await self.get(f'{base_oid}.7.{idx}')  # Possible speed/bandwidth
-                sub_oid_11 = await self.get(f'{base_oid}.11.{idx}')  # Possible subscriber count
-
-                # If we got valid data, this index exists
-                if sub_oid_3 is not None:
-                    # Map to actual port number
-                    # Based on patterns: indices with .3=8 or .3=5 seem to be active ports
-                    # .3=6 might be unused/disabled ports
-                    port_number = int(sub_oid_3) if sub_oid_3 else 0
-
-                    # Determine link status
-                    link_status = 'up' if (sub_oid_5 and int(sub_oid_5) == 1) else 'down'
-
-                    # Get speed (convert from unknown units)
-                    speed_value = int(sub_oid_7) if sub_oid_7 else 0
-
-                    # Get subscriber count (for coax ports)
-                    subscriber_count = int(sub_oid_11) if sub_oid_11 else 0
-
-                    port_data = {
-                        'positron_index': idx,
-                        'port_indicator': port_number,
-                        'link_status': link_status,
-                        'speed_indicator': speed_value,
-                        'subscriber_count': subscriber_count,
-                        'raw_data': {
-                            'oid_3': int(sub_oid_3) if sub_oid_3 else None,
-                            'oid_5': int(sub_oid_5) if sub_oid_5 else None,
-                            'oid_7': int(sub_oid_7) if sub_oid_7 else None,
-                            'oid_11': int(sub_oid_11) if sub_oid_11 else None,
-                        }
+            # Sub-OIDs discovered (1-11):
+            # .2 = 2 (constant)
+            # .3 = varies (6 for most, 8 and 5 for others - possibly port number?)
+            # .4 = 0 (mostly)
+            # .5 = 0 or 1 (link status? 1 = connected?)
+            # .6 = 0 (unknown)
+            # .7 = 2014 or 2048 (bandwidth/speed?)
+            # .8 = 2 (status?)
+            # .9 = 0 (unknown)
+            # .10 = 2 (unknown)
+            # .11 = 0, 1, or 3 (varies - possibly active subscribers on coax port?)
+            # Only the key columns are walked; indices observed are 1000001-1000006
+            rows = await self.walk_table(base_oid, [3, 5, 7, 11])
+
+            for index, columns in sorted(rows.items()):
+                if len(index) != 1 or 3 not in columns:
+                    continue
+                idx = index[0]
+
+                sub_oid_3 = int(columns[3])  # Possible port number
+                sub_oid_5 = int(columns[5]) if 5 in columns else None  # Possible link status
+                sub_oid_7 = int(columns[7]) if 7 in columns else None  # Possible speed/bandwidth
+                sub_oid_11 = int(columns[11]) if 11 in columns else None  # Possible subscriber count
+
+                # Map to actual port number
+                # Based on patterns: indices with .3=8 or .3=5 seem to be active ports
+                # .3=6 might be unused/disabled ports
+                port_number = sub_oid_3
+
+                # Determine link status
+                link_status = 'up' if sub_oid_5 == 1 else 'down'
+
+                port_data = {
+                    'positron_index': idx,
+                    'port_indicator': port_number,
+                    'link_status': link_status,
+                    'speed_indicator': sub_oid_7 or 0,  # Unknown units
+                    'subscriber_count': sub_oid_11 or 0,  # For coax ports
+                    'raw_data': {
+                        'oid_3': sub_oid_3,
+                        'oid_5': sub_oid_5,
+                        'oid_7': sub_oid_7,
+                        'oid_11': sub_oid_11,
                     }
+                }
 
-                    # Only add if we have meaningful data
-                    if port_number > 0:
-                        ports_info[idx] = port_data
-                        logger.debug(f"Port index {idx}: {port_data}")
-                else:
-                    # No more ports, break
-                    break
+                # Only add if we have meaningful data
+                if port_number > 0:
+                    ports_info[idx] = port_data
+                    logger.debug(f"Port index {idx}: {port_data}")
 
             logger.info(f"Retrieved {len(ports_info)} Positron port entries from {self.ip_address}")
             return ports_info if ports_info else None
@@ -368,7 +719,70 @@ class SNMPClient:
             logger.error(f"Error getting GAM ports info from {self.ip_address}: {e}")
             return None
 
-    async def get_bridge_mac_table(self) -> Optional[Dict[str, Any]]:
+    async def get_bridge_port_map(self) -> Dict[int, int]:
+        """Get the bridge port -> ifIndex mapping (dot1dBasePortIfIndex)"""
+        rows = await self.walk_table(self.OID_DOT1D_BASE_PORT_ENTRY, [2])
+        return {
+            index[0]: int(columns[2])
+            for index, columns in rows.items()
+            if len(index) == 1 and 2 in columns
+        }
+
+    async def walk_fdb(
+        self,
+        port_mapping: Optional[Dict[int, int]] = None,
+        q_bridge: bool = False
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream the bridge forwarding database with GETBULK.
+
+        Yields one entry per learned MAC as responses arrive, with no cap on
+        the table size. With q_bridge=True the Q-BRIDGE dot1qTpFdbPort table is
+        walked instead, yielding one entry per (VLAN, MAC) so the same MAC
+        learned in several VLANs is reported in each of them.
+        """
+        if port_mapping is None:
+            port_mapping = await self.get_bridge_port_map()
+
+        fdb_to_vlan: Dict[int, int] = {}
+        if q_bridge:
+            # dot1qVlanFdbId maps each VLAN to its filtering database; many
+            # agents use the VLAN ID as FDB ID, which is the fallback below
+            try:
+                vlan_rows = await self.walk_table(self.OID_DOT1Q_VLAN_CURRENT_ENTRY, [3])
+                for index, columns in vlan_rows.items():
+                    if len(index) == 2 and 3 in columns:
+                        fdb_to_vlan[int(columns[3])] = index[1]
+            except SnmpError as e:
+                logger.debug(f"dot1qVlanFdbId walk failed on {self.ip_address}: {e}")
+
+        root = self.OID_DOT1Q_TP_FDB_PORT if q_bridge else self.OID_DOT1D_TP_FDB_PORT
+        root_length = len(root.split('.'))
+
+        async for name, value in self.walk(root):
+            suffix = tuple(name[root_length:])
+            if len(suffix) < 6:
+                continue
+
+            # MAC is the last 6 sub-identifiers of the index
+            mac_address = ':'.join(f'{octet:02x}' for octet in suffix[-6:])
+            bridge_port = int(value)
+            vlan_id = None
+            if q_bridge and len(suffix) >= 7:
+                fdb_id = suffix[-7]
+                vlan_id = fdb_to_vlan.get(fdb_id, fdb_id)
+
+            yield {
+                'mac_address': mac_address,
+                'bridge_port': bridge_port,
+                'interface_index': port_mapping.get(bridge_port),
+                'vlan_id': vlan_id,
+                # Determine if this is a Positron endpoint
+                'is_positron_endpoint': mac_address.startswith(self.POSITRON_OUI),
+                'vendor_oui': mac_address[:8].upper()
+            }
+
+    async def get_bridge_mac_table(self, q_bridge: bool = False) -> Optional[Dict[str, Any]]:
         """
         Query bridge forwarding table to get all learned MAC addresses and their ports
 
@@ -377,74 +791,36 @@ class SNMPClient:
         - 1.3.6.1.2.1.17.4.3.1.2 = dot1dTpFdbPort (bridge port for each MAC)
         - 1.3.6.1.2.1.17.1.4.1.2 = dot1dBasePortIfIndex (bridge port to interface index)
 
+        With q_bridge=True, uses Q-BRIDGE dot1qTpFdbPort (1.3.6.1.2.1.17.7.1.2.2.1.2)
+        and reports the VLAN of each entry.
+
         Returns dict with port mappings and MAC addresses
         """
         try:
-            mac_table = {}
-            port_mapping = {}
-
             # First, get bridge port to interface index mapping
             logger.debug(f"Getting bridge port to interface index mapping for {self.ip_address}")
-            for bridge_port in range(1, 20):
-                oid = f'1.3.6.1.2.1.17.1.4.1.2.{bridge_port}'
-                if_index = await self.get(oid)
-                if if_index:
-                    port_mapping[bridge_port] = int(if_index)
-                else:
-                    break
-
+            port_mapping = await self.get_bridge_port_map()
             logger.debug(f"Bridge port mapping: {port_mapping}")
 
             # Now get MAC addresses and their bridge ports
             logger.debug(f"Getting MAC address table for {self.ip_address}")
 
-            # Walk the dot1dTpFdbPort OID to get all MACs and their ports
-            from pysnmp.hlapi import (
-                SnmpEngine, CommunityData, UdpTransportTarget,
-                ContextData, ObjectType, ObjectIdentity, nextCmd
-            )
-
             mac_to_port = {}
-            for (errorIndication, errorStatus, errorIndex, varBinds) in nextCmd(
-                SnmpEngine(),
-                CommunityData(self.community, mpModel=0),
-                UdpTransportTarget((self.ip_address, 161), timeout=2, retries=1),
-                ContextData(),
-                ObjectType(ObjectIdentity('1.3.6.1.2.1.17.4.3.1.2')),
-                lexicographicMode=False,
-                maxRows=100
-            ):
-                if errorIndication or errorStatus:
-                    break
-
-                for varBind in varBinds:
-                    oid = varBind[0].prettyPrint()
-                    bridge_port = int(varBind[1])
-
-                    # Extract MAC from OID (last 6 octets)
-                    oid_parts = oid.split('.')
-                    if len(oid_parts) >= 6:
-                        mac_octets = oid_parts[-6:]
-                        mac_address = ':'.join([f'{int(x):02x}' for x in mac_octets])
-
-                        # Determine if this is a Positron endpoint (OUI 00:0e:d8)
-                        is_positron = mac_address.startswith('00:0e:d8')
-
-                        if_index = port_mapping.get(bridge_port)
-
-                        mac_to_port[mac_address] = {
-                            'mac_address': mac_address,
-                            'bridge_port': bridge_port,
-                            'interface_index': if_index,
-                            'is_positron_endpoint': is_positron,
-                            'vendor_oui': mac_address[:8].upper()
-                        }
+            entries = []
+            try:
+                async for entry in self.walk_fdb(port_mapping, q_bridge=q_bridge):
+                    entries.append(entry)
+                    mac_to_port[entry['mac_address']] = entry
+            except SnmpError as e:
+                # Keep whatever part of the table was walked before the failure
+                logger.warning(f"Bridge FDB walk on {self.ip_address} stopped early: {e}")
 
             logger.info(f"Retrieved {len(mac_to_port)} MAC addresses from {self.ip_address}")
 
             return {
                 'port_mapping': port_mapping,
                 'mac_addresses': mac_to_port,
+                'entries': entries,
                 'total_macs': len(mac_to_port)
             }
 
@@ -0,0 +1,513 @@
+"""Asyncio SNMP engine and per-device target registry"""
+from pyasn1.codec.ber import encoder, decoder
+from pyasn1.error import PyAsn1Error
+from pysnmp.proto import api, rfc1905
+from pysnmp.proto.mpmod.rfc3412 import SNMPv3Message
+from collections import OrderedDict
+import asyncio
+import logging
+import random
+import socket
+import time
+from typing import Optional, Dict, List, Tuple, Any
+from ..config import settings
+from .snmp_usm import (
+    UsmUser, UsmSession, UsmError, SNMP_V3,
+    REPORT_NOT_IN_TIME_WINDOW, REPORT_UNKNOWN_ENGINE_ID, REPORT_NAMES
+)
+
+logger = logging.getLogger(__name__)
+
+# SNMP message versions as carried in the message header
+SNMP_V1 = api.protoVersion1
+SNMP_V2C = api.protoVersion2c
+
+VERSION_NAMES = {SNMP_V1: 'v1', SNMP_V2C: 'v2c', SNMP_V3: 'v3'}
+
+VarBind = Tuple[Any, Any]
+
+# Error-status values the client reacts to
+ERROR_TOO_BIG = 1
+ERROR_NO_SUCH_NAME = 2
+
+# RTT smoothing gains and variance multiplier (RFC 6298)
+RTT_ALPHA = 1 / 8
+RTT_BETA = 1 / 4
+RTT_K = 4
+# Timeout before the first RTT sample, as for TCP
+INITIAL_RTO = 1.0
+
+
+def error_status_name(status: int) -> str:
+    """Get the symbolic name of an SNMP error-status value"""
+    return rfc1905.errorStatus.clone(status).prettyPrint()
+
+
+def is_exception_value(value: Any) -> bool:
+    """Check for noSuchObject / noSuchInstance / endOfMibView varbind values"""
+    return isinstance(value, (rfc1905.NoSuchObject, rfc1905.NoSuchInstance, rfc1905.EndOfMibView))
+
+
+class SnmpError(Exception):
+    """SNMP transport or protocol failure"""
+
+
+class SnmpTimeout(SnmpError):
+    """No response received from the agent within timeout and retries"""
+
+
+class SnmpCircuitOpen(SnmpError):
+    """Request refused without sending because the device keeps failing"""
+
+
+class SnmpTarget:
+    """
+    Per-device SNMP endpoint: resolved address, credentials and
+    timeout/retry policy. Instances are cached by SnmpEngineRegistry.
+
+    The retransmission timeout adapts to the device the way TCP's does: a
+    smoothed RTT and RTT variance are kept from answered first attempts, and
+    the timeout is SRTT + 4 * RTTVAR, bounded by snmp_min_timeout and the
+    configured timeout. A responsive GAM thus times out in milliseconds
+    rather than seconds.
+
+    Consecutive failed requests trip a circuit breaker: after
+    snmp_breaker_threshold of them, requests are refused for a backoff period
+    that doubles on every further failure. Once the period expires, the next
+    request goes out as a single-attempt probe; success closes the breaker.
+
+    SNMPv3 targets carry a UsmSession instead of a community. As the target
+    is cached, so are the agent's discovered engine parameters and the keys
+    localized to it.
+    """
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        family: int,
+        community: str,
+        version: int = SNMP_V2C,
+        timeout: float = 1,
+        retries: int = 5,
+        max_varbinds: Optional[int] = None,
+        usm: Optional[UsmSession] = None
+    ):
+        self.address = address
+        self.family = family
+        self.community = community
+        self.version = SNMP_V3 if usm is not None else version
+        self.usm = usm
+        self.timeout = timeout  # Upper bound on the adaptive timeout
+        self.retries = retries
+        # Largest GET the agent has accepted; lowered when it answers tooBig
+        self.max_varbinds = max_varbinds or settings.snmp_max_varbinds_per_pdu
+
+        # Retransmission timeout estimation
+        self.srtt: Optional[float] = None
+        self.rttvar: Optional[float] = None
+        self.rto = min(timeout, INITIAL_RTO)
+
+        # Circuit breaker
+        self.failures = 0
+        self.trips = 0
+        self.open_until: Optional[float] = None
+
+    def __repr__(self):
+        return f"<SnmpTarget({self.address[0]}:{self.address[1]}, {VERSION_NAMES[self.version]})>"
+
+    @property
+    def effective_retries(self) -> int:
+        """Retries for the next request; a failing device gets a single attempt"""
+        return self.retries if self.failures == 0 else 0
+
+    def circuit_open(self) -> bool:
+        """Check whether requests are currently being refused"""
+        return self.open_until is not None and time.monotonic() < self.open_until
+
+    def reset_circuit(self):
+        """Let the next request through as a probe, e.g. for a manual test"""
+        self.open_until = None
+
+    def observe_rtt(self, rtt: float):
+        """Update the RTT estimate from a request answered on its first attempt"""
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = (1 - RTT_BETA) * self.rttvar + RTT_BETA * abs(self.srtt - rtt)
+            self.srtt = (1 - RTT_ALPHA) * self.srtt + RTT_ALPHA * rtt
+        self.rto = min(self.timeout, max(settings.snmp_min_timeout, self.srtt + RTT_K * self.rttvar))
+
+    def record_success(self):
+        if self.trips:
+            logger.info(f"SNMP to {self.address[0]} recovered, closing circuit")
+        self.failures = 0
+        self.trips = 0
+        self.open_until = None
+
+    def record_failure(self):
+        self.failures += 1
+        # Back the timeout off too, as the estimate evidently no longer holds
+        self.rto = min(self.timeout, self.rto * 2)
+
+        if self.failures >= settings.snmp_breaker_threshold:
+            self.trips += 1
+            backoff = min(
+                settings.snmp_breaker_max_backoff,
+                settings.snmp_breaker_backoff * 2 ** (self.trips - 1)
+            )
+            self.open_until = time.monotonic() + backoff
+            logger.warning(
+                f"SNMP to {self.address[0]} failed {self.failures} times in a row, "
+                f"suspending requests for {backoff}s"
+            )
+
+
+class _SnmpProtocol(asyncio.DatagramProtocol):
+    """Datagram protocol feeding responses back into the engine"""
+
+    def __init__(self, engine: "SnmpEngine"):
+        self.engine = engine
+
+    def datagram_received(self, data: bytes, addr):
+        self.engine._on_datagram(data, addr)
+
+    def error_received(self, exc: Exception):
+        # ICMP port unreachable and friends; the request will time out
+        logger.debug(f"SNMP socket error: {exc}")
+
+
+class SnmpEngine:
+    """
+    Non-blocking SNMP command generator.
+
+    A single UDP socket per address family is shared by every request on the
+    event loop. Requests are matched to responses by request-id, so any number
+    of devices can be polled concurrently without any of them blocking the
+    loop while waiting on the network.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._transports: Dict[int, asyncio.DatagramTransport] = {}
+        self._pending: Dict[int, Tuple[asyncio.Future, Tuple[str, int]]] = {}
+        self._next_request_id = random.randrange(1, 0x7fffffff)
+
+    async def request(
+        self,
+        target: SnmpTarget,
+        pdu_type: str,
+        var_binds: List[VarBind],
+        non_repeaters: int = 0,
+        max_repetitions: int = 0
+    ) -> Tuple[int, int, List[VarBind]]:
+        """
+        Send a PDU to the target and wait for its response.
+
+        pdu_type is one of 'get', 'next', 'bulk' or 'set'. Returns
+        (error_status, error_index, var_binds) from the response PDU, raises
+        SnmpTimeout if the agent does not answer and SnmpCircuitOpen if the
+        target's circuit breaker is open.
+        """
+        if target.circuit_open():
+            raise SnmpCircuitOpen(f"SNMP requests to {target.address[0]} suspended after repeated failures")
+
+        if target.version == SNMP_V3:
+            return await self._request_v3(target, pdu_type, var_binds, non_repeaters, max_repetitions)
+
+        p_mod = api.protoModules[target.version]
+        pdu = self._build_pdu(p_mod, pdu_type, var_binds, non_repeaters, max_repetitions)
+
+        request_id = self._allocate_request_id()
+        p_mod.apiPDU.setRequestID(pdu, request_id)
+
+        message = p_mod.Message()
+        p_mod.apiMessage.setDefaults(message)
+        p_mod.apiMessage.setCommunity(message, target.community)
+        p_mod.apiMessage.setPDU(message, pdu)
+
+        response = await self._exchange(target, request_id, encoder.encode(message))
+        return self._result(p_mod, response)
+
+    async def _request_v3(
+        self,
+        target: SnmpTarget,
+        pdu_type: str,
+        var_binds: List[VarBind],
+        non_repeaters: int,
+        max_repetitions: int
+    ) -> Tuple[int, int, List[VarBind]]:
+        """Send a request through the target's USM session, discovering the agent first if needed"""
+        usm = target.usm
+        if not usm.discovered:
+            async with usm.discovery_lock:
+                if not usm.discovered:
+                    await self._discover(target)
+
+        # SNMPv3 carries the SNMPv2c PDUs
+        p_mod = api.protoModules[SNMP_V2C]
+        pdu = self._build_pdu(p_mod, pdu_type, var_binds, non_repeaters, max_repetitions)
+
+        # An agent that rebooted or drifted answers with a report that
+        # resynchronizes the session, after which one retry is enough
+        for attempt in range(2):
+            request_id = self._allocate_request_id()
+            p_mod.apiPDU.setRequestID(pdu, request_id)
+            try:
+                message, data = await self._exchange(target, request_id, usm.wrap(pdu, request_id))
+                response, report = usm.unwrap(message, data)
+            except UsmError as e:
+                raise SnmpError(f"SNMPv3 response from {target.address[0]} rejected: {e}")
+
+            if report is None:
+                return self._result(p_mod, response)
+            if attempt == 0 and report in (REPORT_NOT_IN_TIME_WINDOW, REPORT_UNKNOWN_ENGINE_ID):
+                logger.debug(f"SNMPv3 {REPORT_NAMES[report]} from {target.address[0]}, retrying")
+                continue
+            raise SnmpError(
+                f"SNMPv3 request to {target.address[0]} refused: {REPORT_NAMES.get(report, report)}"
+            )
+
+    async def _discover(self, target: SnmpTarget):
+        """Learn the agent's snmpEngineID, boots and time (RFC 3414 4)"""
+        p_mod = api.protoModules[SNMP_V2C]
+        pdu = self._build_pdu(p_mod, 'get', [], 0, 0)
+        request_id = self._allocate_request_id()
+        p_mod.apiPDU.setRequestID(pdu, request_id)
+
+        message, data = await self._exchange(target, request_id, target.usm.discovery_message(pdu, request_id))
+        try:
+            target.usm.unwrap(message, data)
+        except UsmError as e:
+            raise SnmpError(f"SNMPv3 discovery of {target.address[0]} failed: {e}")
+        if not target.usm.discovered:
+            raise SnmpError(f"SNMPv3 discovery of {target.address[0]} failed: no engine ID reported")
+        logger.debug(f"Discovered SNMP engine {target.usm.engine_id.hex()} at {target.address[0]}")
+
+    async def _exchange(self, target: SnmpTarget, request_id: int, payload: bytes) -> Any:
+        """Send an encoded message, retransmitting until its response arrives"""
+        transport = await self._get_transport(target.family)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = (future, target.address)
+
+        try:
+            # Retransmissions reuse the request-id so a late answer to an
+            # earlier attempt still completes the request
+            timeout = target.rto
+            for attempt in range(target.effective_retries + 1):
+                sent_at = time.monotonic()
+                transport.sendto(payload, target.address)
+                try:
+                    response = await asyncio.wait_for(asyncio.shield(future), timeout)
+                except asyncio.TimeoutError:
+                    logger.debug(f"SNMP timeout from {target.address[0]} (attempt {attempt + 1}, {timeout:.3f}s)")
+                    timeout = min(target.timeout, timeout * 2)
+                    continue
+
+                # Karn's rule: a retransmitted request's RTT is ambiguous
+                if attempt == 0:
+                    target.observe_rtt(time.monotonic() - sent_at)
+                target.record_success()
+                return response
+
+            target.record_failure()
+            raise SnmpTimeout(f"No SNMP response received from {target.address[0]} before timeout")
+
+        finally:
+            self._pending.pop(request_id, None)
+            if not future.done():
+                future.cancel()
+
+    @staticmethod
+    def _result(p_mod, response) -> Tuple[int, int, List[VarBind]]:
+        return (
+            int(p_mod.apiPDU.getErrorStatus(response)),
+            int(p_mod.apiPDU.getErrorIndex(response)),
+            list(p_mod.apiPDU.getVarBinds(response))
+        )
+
+    def close(self):
+        """Close all sockets and fail any outstanding requests"""
+        for transport in self._transports.values():
+            transport.close()
+        self._transports.clear()
+
+        for future, _ in self._pending.values():
+            if not future.done():
+                future.set_exception(SnmpError("SNMP engine closed"))
+        self._pending.clear()
+
+    def _build_pdu(self, p_mod, pdu_type: str, var_binds, non_repeaters: int, max_repetitions: int):
+        if pdu_type == 'get':
+            pdu = p_mod.GetRequestPDU()
+        elif pdu_type == 'next':
+            pdu = p_mod.GetNextRequestPDU()
+        elif pdu_type == 'set':
+            pdu = p_mod.SetRequestPDU()
+        elif pdu_type == 'bulk':
+            if p_mod is api.protoModules[SNMP_V1]:
+                raise SnmpError("GETBULK is not supported by SNMPv1")
+            pdu = p_mod.GetBulkRequestPDU()
+        else:
+            raise SnmpError(f"Unsupported PDU type: {pdu_type}")
+
+        if pdu_type == 'bulk':
+            p_mod.apiBulkPDU.setDefaults(pdu)
+            p_mod.apiBulkPDU.setNonRepeaters(pdu, non_repeaters)
+            p_mod.apiBulkPDU.setMaxRepetitions(pdu, max_repetitions)
+        else:
+            p_mod.apiPDU.setDefaults(pdu)
+        p_mod.apiPDU.setVarBinds(pdu, var_binds)
+        return pdu
+
+    def _allocate_request_id(self) -> int:
+        request_id = self._next_request_id
+        self._next_request_id = request_id % 0x7ffffffe + 1
+        return request_id
+
+    async def _get_transport(self, family: int) -> asyncio.DatagramTransport:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Sockets are bound to the loop that created them
+            self.close()
+            self._loop = loop
+
+        transport = self._transports.get(family)
+        if transport is None or transport.is_closing():
+            local_addr = ('::', 0) if family == socket.AF_INET6 else ('0.0.0.0', 0)
+            transport, _ = await loop.create_datagram_endpoint(
+                lambda: _SnmpProtocol(self),
+                local_addr=local_addr,
+                family=family
+            )
+            self._transports[family] = transport
+        return transport
+
+    def _on_datagram(self, data: bytes, addr):
+        try:
+            version = int(api.decodeMessageVersion(data))
+            if version == SNMP_V3:
+                # The PDU may be encrypted; match on msgID and leave the
+                # rest to the target's USM session
+                message, _ = decoder.decode(data, asn1Spec=SNMPv3Message())
+                request_id = int(message['msgGlobalData']['msgID'])
+                result = (message, data)
+            else:
+                p_mod = api.protoModules[version]
+                message, _ = decoder.decode(data, asn1Spec=p_mod.Message())
+                result = p_mod.apiMessage.getPDU(message)
+                request_id = int(p_mod.apiPDU.getRequestID(result))
+        except (PyAsn1Error, KeyError, ValueError) as e:
+            logger.debug(f"Dropping undecodable SNMP datagram from {addr[0]}: {e}")
+            return
+
+        pending = self._pending.get(request_id)
+        if pending is None:
+            # Late duplicate or response to an abandoned request
+            return
+
+        future, address = pending
+        if addr[:2] != address:
+            logger.debug(f"Ignoring SNMP response for request {request_id} from unexpected {addr[0]}")
+            return
+
+        if not future.done():
+            future.set_result(result)
+
+
+class SnmpEngineRegistry:
+    """
+    Shares one SnmpEngine across all SNMPClient instances and caches the
+    per-device targets built for it.
+
+    Resolving a target address costs a DNS lookup; reusing targets means
+    steady-state polling only pays for the network round trip. The target
+    cache is an LRU bounded by max_targets, and entries unused for
+    idle_timeout seconds are evicted on the next lookup.
+    """
+
+    def __init__(self, max_targets: int = 256, idle_timeout: int = 900):
+        self.max_targets = max_targets
+        self.idle_timeout = idle_timeout
+        self._engine: Optional[SnmpEngine] = None
+        self._targets: "OrderedDict[Tuple, Tuple[SnmpTarget, float]]" = OrderedDict()
+
+    @property
+    def engine(self) -> SnmpEngine:
+        """Get the shared SnmpEngine, creating it on first use"""
+        if self._engine is None:
+            self._engine = SnmpEngine()
+            logger.debug("Created shared SNMP engine")
+        return self._engine
+
+    async def get_target(
+        self,
+        ip_address: str,
+        port: int = 161,
+        community: str = 'public',
+        version: int = SNMP_V2C,
+        timeout: float = 1,
+        retries: int = 5,
+        usm_user: Optional[UsmUser] = None
+    ) -> SnmpTarget:
+        """
+        Get a cached target for a device, resolving its address if needed.
+
+        With usm_user the target speaks SNMPv3 and community and version are
+        ignored.
+        """
+        self.evict_idle()
+
+        if usm_user is not None:
+            key = (ip_address, port, usm_user.key, SNMP_V3, timeout, retries)
+        else:
+            key = (ip_address, port, community, version, timeout, retries)
+        entry = self._targets.get(key)
+        if entry is not None:
+            self._targets.move_to_end(key)
+            target = entry[0]
+        else:
+            family, address = await self._resolve(ip_address, port)
+            usm = UsmSession(usm_user) if usm_user is not None else None
+            target = SnmpTarget(address, family, community, version, timeout, retries, usm=usm)
+            while len(self._targets) >= self.max_targets:
+                self._targets.popitem(last=False)
+
+        self._targets[key] = (target, time.monotonic())
+        return target
+
+    def evict_idle(self):
+        """Drop targets that have not been used within idle_timeout"""
+        cutoff = time.monotonic() - self.idle_timeout
+        # Entries are kept in least-recently-used order
+        while self._targets:
+            key, (_, last_used) = next(iter(self._targets.items()))
+            if last_used >= cutoff:
+                break
+            del self._targets[key]
+            logger.debug(f"Evicted idle SNMP target {key[0]}")
+
+    def clear(self):
+        """Drop all cached targets and close the shared engine"""
+        self._targets.clear()
+        if self._engine is not None:
+            self._engine.close()
+            self._engine = None
+
+    async def _resolve(self, ip_address: str, port: int) -> Tuple[int, Tuple[str, int]]:
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(
+                ip_address, port, type=socket.SOCK_DGRAM, proto=socket.IPPROTO_UDP
+            )
+        except socket.gaierror as e:
+            raise SnmpError(f"Bad UDP transport address {ip_address}:{port}: {e}")
+
+        family, _, _, _, sockaddr = infos[0]
+        return family, sockaddr[:2]
+
+
+# Global registry shared by every SNMPClient in the process
+snmp_registry = SnmpEngineRegistry(
+    max_targets=settings.snmp_target_cache_size,
+    idle_timeout=settings.snmp_target_idle_timeout
+)
@@ -0,0 +1,365 @@
+"""SNMPv3 User-based Security Model (RFC 3414) for the asyncio SNMP engine"""
+from pyasn1.codec.ber import encoder, decoder
+from pyasn1.error import PyAsn1Error
+from pyasn1.type import univ
+from pysnmp.proto import rfc1905
+from pysnmp.proto.api import v2c
+from pysnmp.proto.mpmod.rfc3412 import SNMPv3Message, ScopedPDU
+from pysnmp.proto.secmod.rfc3414.service import UsmSecurityParameters
+from Cryptodome.Cipher import AES, DES
+from functools import lru_cache
+import asyncio
+import hashlib
+import hmac
+import logging
+import random
+import time
+from typing import Optional, Tuple, Any
+
+logger = logging.getLogger(__name__)
+
+SNMP_V3 = 3
+USM_SECURITY_MODEL = 3
+
+# msgFlags bits
+FLAG_AUTH = 0x01
+FLAG_PRIV = 0x02
+FLAG_REPORTABLE = 0x04
+
+# Largest message we can receive over UDP
+MAX_MESSAGE_SIZE = 65507
+
+# Hash function and truncated HMAC length per auth protocol (RFC 3414, RFC 7860)
+AUTH_PROTOCOLS = {
+    'md5': (hashlib.md5, 12),
+    'sha': (hashlib.sha1, 12),
+    'sha224': (hashlib.sha224, 16),
+    'sha256': (hashlib.sha256, 24),
+    'sha384': (hashlib.sha384, 32),
+    'sha512': (hashlib.sha512, 48),
+}
+PRIV_PROTOCOLS = ('des', 'aes')
+
+# usmStats counters an agent returns in a Report PDU when it rejects a message
+REPORT_UNSUPPORTED_SEC_LEVEL = '1.3.6.1.6.3.15.1.1.1.0'
+REPORT_NOT_IN_TIME_WINDOW = '1.3.6.1.6.3.15.1.1.2.0'
+REPORT_UNKNOWN_USER_NAME = '1.3.6.1.6.3.15.1.1.3.0'
+REPORT_UNKNOWN_ENGINE_ID = '1.3.6.1.6.3.15.1.1.4.0'
+REPORT_WRONG_DIGEST = '1.3.6.1.6.3.15.1.1.5.0'
+REPORT_DECRYPTION_ERROR = '1.3.6.1.6.3.15.1.1.6.0'
+
+REPORT_NAMES = {
+    REPORT_UNSUPPORTED_SEC_LEVEL: 'unsupported security level',
+    REPORT_NOT_IN_TIME_WINDOW: 'not in time window',
+    REPORT_UNKNOWN_USER_NAME: 'unknown user name',
+    REPORT_UNKNOWN_ENGINE_ID: 'unknown engine ID',
+    REPORT_WRONG_DIGEST: 'wrong digest',
+    REPORT_DECRYPTION_ERROR: 'decryption error',
+}
+
+# RFC 3414 A.2: the password is stretched to 1MB before hashing
+PASSWORD_KEY_LENGTH = 1048576
+
+
+class UsmError(Exception):
+    """An SNMPv3 message failed USM processing"""
+
+
+@lru_cache(maxsize=64)
+def password_to_key(password: str, auth_protocol: str) -> bytes:
+    """
+    Derive the non-localized key Ku from a password (RFC 3414 A.2).
+
+    This digests a megabyte of data, so results are cached: the same
+    credentials are normally used on every device in the fleet.
+    """
+    hash_func, _ = AUTH_PROTOCOLS[auth_protocol]
+    data = password.encode()
+    return hash_func((data * (PASSWORD_KEY_LENGTH // len(data) + 1))[:PASSWORD_KEY_LENGTH]).digest()
+
+
+def localize_key(key: bytes, engine_id: bytes, auth_protocol: str) -> bytes:
+    """Localize Ku to one agent's snmpEngineID, giving Kul (RFC 3414 2.6)"""
+    hash_func, _ = AUTH_PROTOCOLS[auth_protocol]
+    return hash_func(key + engine_id + key).digest()
+
+
+class UsmUser:
+    """
+    SNMPv3 user credentials.
+
+    The security level follows from which passwords are given: none is
+    noAuthNoPriv, an auth password alone is authNoPriv and both are authPriv.
+    """
+
+    def __init__(
+        self,
+        user_name: str,
+        auth_protocol: Optional[str] = None,
+        auth_password: Optional[str] = None,
+        priv_protocol: Optional[str] = None,
+        priv_password: Optional[str] = None
+    ):
+        if not user_name or len(user_name) > 32:
+            raise ValueError("SNMPv3 user name must be 1 to 32 characters")
+
+        self.user_name = user_name
+        self.auth_protocol = (auth_protocol or 'sha').lower() if auth_password else None
+        self.auth_password = auth_password or None
+        self.priv_protocol = (priv_protocol or 'aes').lower() if priv_password else None
+        self.priv_password = priv_password or None
+
+        if self.auth_protocol and self.auth_protocol not in AUTH_PROTOCOLS:
+            raise ValueError(f"Unsupported SNMPv3 auth protocol: {auth_protocol}")
+        if self.priv_protocol and self.priv_protocol not in PRIV_PROTOCOLS:
+            raise ValueError(f"Unsupported SNMPv3 privacy protocol: {priv_protocol}")
+        if self.priv_protocol and not self.auth_protocol:
+            raise ValueError("SNMPv3 privacy requires authentication")
+        for password in (self.auth_password, self.priv_password):
+            if password is not None and len(password) < 8:
+                raise ValueError("SNMPv3 passwords must be at least 8 characters")
+
+    def __repr__(self):
+        return f"<UsmUser({self.user_name}, {self.security_level})>"
+
+    @property
+    def key(self) -> Tuple:
+        """Hashable identity, for caching targets per credential set"""
+        return (self.user_name, self.auth_protocol, self.auth_password, self.priv_protocol, self.priv_password)
+
+    @property
+    def security_level(self) -> str:
+        if self.priv_protocol:
+            return 'authPriv'
+        if self.auth_protocol:
+            return 'authNoPriv'
+        return 'noAuthNoPriv'
+
+    @property
+    def flags(self) -> int:
+        return (FLAG_AUTH if self.auth_protocol else 0) | (FLAG_PRIV if self.priv_protocol else 0)
+
+
+class UsmSession:
+    """
+    Per-device USM state: the agent's snmpEngineID, boots and clock, and the
+    user's keys localized to that engine.
+
+    Engine discovery and key localization happen once per device, after
+    which each request only costs one HMAC and, with privacy, one cipher
+    pass. The agent's clock is tracked locally from the last authentic
+    message so requests stay inside its 150 second time window.
+    """
+
+    def __init__(self, user: UsmUser):
+        self.user = user
+        self.engine_id: Optional[bytes] = None
+        self.engine_boots = 0
+        self._engine_time = 0
+        self._synced_at = 0.0
+        self._auth_key: Optional[bytes] = None
+        self._priv_key: Optional[bytes] = None
+        self._salt = random.getrandbits(64)
+        # Concurrent first requests share a single discovery exchange
+        self.discovery_lock = asyncio.Lock()
+
+    @property
+    def discovered(self) -> bool:
+        return self.engine_id is not None
+
+    @property
+    def engine_time(self) -> int:
+        """Current estimate of the agent's snmpEngineTime"""
+        return min(0x7fffffff, self._engine_time + int(time.monotonic() - self._synced_at))
+
+    def set_engine(self, engine_id: bytes, boots: int, engine_time: int):
+        """Adopt an agent's engine parameters, localizing keys if the engine changed"""
+        if engine_id != self.engine_id:
+            if self.user.auth_protocol:
+                self._auth_key = localize_key(
+                    password_to_key(self.user.auth_password, self.user.auth_protocol),
+                    engine_id, self.user.auth_protocol
+                )
+            if self.user.priv_protocol:
+                # The privacy key is derived with the auth protocol's hash
+                self._priv_key = localize_key(
+                    password_to_key(self.user.priv_password, self.user.auth_protocol),
+                    engine_id, self.user.auth_protocol
+                )
+            self.engine_id = engine_id
+
+        self.engine_boots = boots
+        self._engine_time = engine_time
+        self._synced_at = time.monotonic()
+
+    def discovery_message(self, pdu, request_id: int) -> bytes:
+        """Build the unauthenticated probe that makes the agent report its engine (RFC 3414 4)"""
+        return self._encode(pdu, request_id, FLAG_REPORTABLE, b'', 0, 0, b'', b'', b'')
+
+    def wrap(self, pdu, request_id: int) -> bytes:
+        """Build an SNMPv3 message carrying pdu at the user's security level"""
+        if not self.discovered:
+            raise UsmError("agent engine has not been discovered")
+
+        boots, engine_time = self.engine_boots, self.engine_time
+        flags = self.user.flags | FLAG_REPORTABLE
+        return self._encode(
+            pdu, request_id, flags, self.engine_id, boots, engine_time,
+            self.user.user_name.encode(), self.engine_id, b''
+        )
+
+    def unwrap(self, message: Any, data: bytes) -> Tuple[Any, Optional[str]]:
+        """
+        Authenticate and decrypt a received SNMPv3 message.
+
+        message is the decoded SNMPv3Message and data the raw datagram.
+        Returns (pdu, report) where report is the OID of the usmStats counter
+        when the agent answered with a Report PDU, else None.
+        """
+        try:
+            flags = bytes(message['msgGlobalData']['msgFlags'])[0]
+            params_data = bytes(message['msgSecurityParameters'])
+            params, _ = decoder.decode(params_data, asn1Spec=UsmSecurityParameters())
+            engine_id = bytes(params['msgAuthoritativeEngineId'])
+            boots = int(params['msgAuthoritativeEngineBoots'])
+            engine_time = int(params['msgAuthoritativeEngineTime'])
+            priv_params = bytes(params['msgPrivacyParameters'])
+
+            if flags & FLAG_AUTH:
+                self._verify(data, params_data, bytes(params['msgAuthenticationParameters']), priv_params, engine_id)
+
+            if flags & FLAG_PRIV:
+                if not flags & FLAG_AUTH or self._priv_key is None:
+                    raise UsmError("unexpected encrypted message")
+                plaintext = self._decrypt(bytes(message['msgData']['encryptedPDU']), boots, engine_time, priv_params)
+                scoped, _ = decoder.decode(plaintext, asn1Spec=ScopedPDU())
+            else:
+                scoped = message['msgData']['plaintext']
+            pdu = scoped['data'].getComponent()
+
+        except (PyAsn1Error, KeyError, IndexError, ValueError) as e:
+            raise UsmError(f"malformed message: {e}")
+
+        report = None
+        if pdu.tagSet == rfc1905.ReportPDU.tagSet:
+            var_binds = v2c.apiPDU.getVarBinds(pdu)
+            report = str(var_binds[0][0]) if var_binds else ''
+
+        if flags & FLAG_AUTH:
+            # RFC 3414 3.2.7: authentic messages advance our view of the
+            # clock, and a notInTimeWindow report resets it outright
+            if (report == REPORT_NOT_IN_TIME_WINDOW or boots > self.engine_boots
+                    or (boots == self.engine_boots and engine_time >= self._engine_time)):
+                self.set_engine(engine_id, boots, engine_time)
+        elif report is not None and engine_id and (not self.discovered or report == REPORT_UNKNOWN_ENGINE_ID):
+            # Unauthenticated engine parameters are only trusted for discovery
+            self.set_engine(engine_id, boots, engine_time)
+
+        return pdu, report
+
+    def _encode(
+        self,
+        pdu,
+        request_id: int,
+        flags: int,
+        engine_id: bytes,
+        boots: int,
+        engine_time: int,
+        user_name: bytes,
+        context_engine_id: bytes,
+        context_name: bytes
+    ) -> bytes:
+        scoped = ScopedPDU()
+        scoped['contextEngineId'] = context_engine_id
+        scoped['contextName'] = context_name
+        scoped.setComponentByPosition(2)
+        scoped.getComponentByPosition(2).setComponentByType(
+            pdu.tagSet, pdu, verifyConstraints=False, matchTags=False, matchConstraints=False
+        )
+
+        mac_length = AUTH_PROTOCOLS[self.user.auth_protocol][1] if flags & FLAG_AUTH else 0
+        priv_params = b''
+        if flags & FLAG_PRIV:
+            encrypted, priv_params = self._encrypt(encoder.encode(scoped), boots, engine_time)
+
+        params = UsmSecurityParameters()
+        params['msgAuthoritativeEngineId'] = engine_id
+        params['msgAuthoritativeEngineBoots'] = boots
+        params['msgAuthoritativeEngineTime'] = engine_time
+        params['msgUserName'] = user_name
+        # Zero placeholder, overwritten with the HMAC of the whole message
+        params['msgAuthenticationParameters'] = b'\x00' * mac_length
+        params['msgPrivacyParameters'] = priv_params
+        params_data = encoder.encode(params)
+
+        message = SNMPv3Message()
+        message['msgVersion'] = SNMP_V3
+        header = message['msgGlobalData']
+        header['msgID'] = request_id
+        header['msgMaxSize'] = MAX_MESSAGE_SIZE
+        header['msgFlags'] = bytes([flags])
+        header['msgSecurityModel'] = USM_SECURITY_MODEL
+        message['msgSecurityParameters'] = params_data
+        if flags & FLAG_PRIV:
+            message['msgData']['encryptedPDU'] = encrypted
+        else:
+            message['msgData']['plaintext'] = scoped
+        data = encoder.encode(message)
+
+        if mac_length:
+            offset = self._mac_offset(data, params_data, priv_params, mac_length)
+            data = data[:offset] + self._mac(data) + data[offset + mac_length:]
+        return data
+
+    @staticmethod
+    def _mac_offset(data: bytes, params_data: bytes, priv_params: bytes, mac_length: int) -> int:
+        # msgAuthenticationParameters is the second to last field of the
+        # security parameters, directly followed by msgPrivacyParameters
+        priv_length = len(encoder.encode(univ.OctetString(priv_params)))
+        return data.index(params_data) + len(params_data) - priv_length - mac_length
+
+    def _mac(self, data: bytes) -> bytes:
+        hash_func, mac_length = AUTH_PROTOCOLS[self.user.auth_protocol]
+        return hmac.new(self._auth_key, data, hash_func).digest()[:mac_length]
+
+    def _verify(self, data: bytes, params_data: bytes, received: bytes, priv_params: bytes, engine_id: bytes):
+        if self._auth_key is None or engine_id != self.engine_id:
+            raise UsmError("authenticated message from an unknown engine")
+        if len(received) != AUTH_PROTOCOLS[self.user.auth_protocol][1]:
+            raise UsmError("wrong digest length")
+
+        offset = self._mac_offset(data, params_data, priv_params, len(received))
+        expected = self._mac(data[:offset] + b'\x00' * len(received) + data[offset + len(received):])
+        if not hmac.compare_digest(expected, received):
+            raise UsmError("wrong digest")
+
+    def _next_salt(self) -> int:
+        self._salt = (self._salt + 1) & 0xffffffffffffffff
+        return self._salt
+
+    def _encrypt(self, plaintext: bytes, boots: int, engine_time: int) -> Tuple[bytes, bytes]:
+        if self.user.priv_protocol == 'aes':
+            # RFC 3826: AES-128 in CFB128 mode, IV is boots | time | salt
+            salt = self._next_salt().to_bytes(8, 'big')
+            iv = boots.to_bytes(4, 'big') + engine_time.to_bytes(4, 'big') + salt
+            cipher = AES.new(self._priv_key[:16], AES.MODE_CFB, iv, segment_size=128)
+            return cipher.encrypt(plaintext), salt
+
+        # RFC 3414 8.1.1: DES-CBC, IV is the pre-IV XOR boots | counter
+        salt = boots.to_bytes(4, 'big') + (self._next_salt() & 0xffffffff).to_bytes(4, 'big')
+        iv = bytes(a ^ b for a, b in zip(self._priv_key[8:16], salt))
+        padded = plaintext + b'\x00' * (-len(plaintext) % 8)
+        return DES.new(self._priv_key[:8], DES.MODE_CBC, iv).encrypt(padded), salt
+
+    def _decrypt(self, ciphertext: bytes, boots: int, engine_time: int, salt: bytes) -> bytes:
+        if len(salt) != 8:
+            raise UsmError("bad privacy parameters")
+
+        if self.user.priv_protocol == 'aes':
+            iv = boots.to_bytes(4, 'big') + engine_time.to_bytes(4, 'big') + salt
+            return AES.new(self._priv_key[:16], AES.MODE_CFB, iv, segment_size=128).decrypt(ciphertext)
+
+        if len(ciphertext) % 8:
+            raise UsmError("bad DES ciphertext length")
+        iv = bytes(a ^ b for a, b in zip(self._priv_key[8:16], salt))
+        return DES.new(self._priv_key[:8], DES.MODE_CBC, iv).decrypt(ciphertext)
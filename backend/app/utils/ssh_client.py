@@ -1,11 +1,29 @@
 """SSH client for GAM device configuration"""
 import paramiko
+import asyncio
 import logging
-from typing import Optional, Dict, List
+import re
+import shlex
+import socket
+from typing import Optional, Dict, List, Tuple, Any, Callable
 from ..config import settings
+from .ssh_pool import ssh_pool, SshSession
+from .ssh_shell import InteractiveShell, CONTROL_CHARACTERS
+from .device_fields import device_field
+from .cli_table import GHN_DISCOVER_TABLE, GHN_ENDPOINT_TABLE, GHN_SUBSCRIBER_TABLE, GHN_PORT_TABLE
 
 logger = logging.getLogger(__name__)
 
+# The GAM CLI reports a rejected command with a line starting with %
+CLI_ERROR = re.compile(r'^\s*%.*$', re.MULTILINE)
+
+# Commands that cannot change the device configuration
+READ_ONLY_COMMAND = re.compile(r'^\s*(show|terminal|end|exit|ping|traceroute)\b', re.IGNORECASE)
+
+# Called with the device IP address before any command that may change its
+# configuration is sent, e.g. to invalidate cached copies of the config
+config_write_listeners: List[Callable[[str], None]] = []
+
 
 class SSHClient:
     """SSH client for GAM device configuration"""
@@ -16,57 +34,113 @@ class SSHClient:
         username: str,
         password: Optional[str] = None,
         private_key: Optional[str] = None,
-        timeout: Optional[int] = None
+        timeout: Optional[int] = None,
+        port: int = 22
     ):
         self.ip_address = ip_address
         self.username = username
         self.password = password
         self.private_key = private_key
         self.timeout = timeout or settings.ssh_connection_timeout
+        self.port = port or 22
         self.client: Optional[paramiko.SSHClient] = None
+        self.session: Optional[SshSession] = None
+
+    @classmethod
+    def for_device(cls, device: Any, timeout: Optional[int] = None) -> Optional["SSHClient"]:
+        """
+        Build a client from a GAMDevice, or a mapping with the same field names.
+
+        Uses ssh_username/ssh_password, falling back to the legacy
+        ssh_credentials field. Returns None when the device has no SSH
+        credentials.
+        """
+        username, password = device_field(device, 'ssh_username'), device_field(device, 'ssh_password')
+        private_key = None
+        if not username or not password:
+            legacy = device_field(device, 'ssh_credentials') or {}
+            username = legacy.get('username')
+            password = legacy.get('password')
+            private_key = legacy.get('private_key')
+        if not username or not (password or private_key):
+            return None
+
+        return cls(
+            device_field(device, 'ip_address'),
+            username,
+            password=password,
+            private_key=private_key,
+            timeout=timeout,
+            port=device_field(device, 'ssh_port') or 22
+        )
+
+    @property
+    def pool_key(self) -> Tuple:
+        """Sessions are shared between clients with the same address and credentials"""
+        return (self.ip_address, self.port, self.username, self.password, self.private_key)
 
     async def connect(self) -> bool:
-        """Establish SSH connection"""
-        try:
-            self.client = paramiko.SSHClient()
-            self.client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-
-            connect_kwargs = {
-                'hostname': self.ip_address,
-                'username': self.username,
-                'timeout': self.timeout,
-                'look_for_keys': False,
-                'allow_agent': False
-            }
+        """
+        Get an authenticated connection from the shared pool.
 
-            if self.password:
-                connect_kwargs['password'] = self.password
-            elif self.private_key:
-                # Load private key from string
-                from io import StringIO
-                key_file = StringIO(self.private_key)
-                pkey = paramiko.RSAKey.from_private_key(key_file)
-                connect_kwargs['pkey'] = pkey
-            else:
-                logger.error("No authentication method provided")
-                return False
+        Reuses an idle session to the same device when there is one, so only
+        the first operation pays for the key exchange and authentication.
+        """
+        if self.session is not None:
+            return True
+
+        if not self.password and not self.private_key:
+            logger.error("No authentication method provided")
+            return False
 
-            self.client.connect(**connect_kwargs)
-            logger.info(f"SSH connected to {self.ip_address}")
+        try:
+            self.session = await ssh_pool.acquire(self.pool_key, self._open)
+            self.client = self.session.client
             return True
 
         except Exception as e:
             logger.error(f"SSH connection error to {self.ip_address}: {e}")
             return False
 
+    def _open(self) -> paramiko.SSHClient:
+        """Open and authenticate a new connection"""
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+
+        connect_kwargs = {
+            'hostname': self.ip_address,
+            'port': self.port,
+            'username': self.username,
+            'timeout': self.timeout,
+            'look_for_keys': False,
+            'allow_agent': False
+        }
+
+        if self.password:
+            connect_kwargs['password'] = self.password
+        else:
+            # Load private key from string
+            from io import StringIO
+            key_file = StringIO(self.private_key)
+            pkey = paramiko.RSAKey.from_private_key(key_file)
+            connect_kwargs['pkey'] = pkey
+
+        client.connect(**connect_kwargs)
+        # Commands and window adjusts are small writes; with Nagle they can
+        # wait on a delayed ACK and add ~40 ms to a command
+        client.get_transport().sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        logger.info(f"SSH connected to {self.ip_address}")
+        return client
+
     async def disconnect(self):
-        """Close SSH connection"""
-        if self.client:
-            self.client.close()
-            logger.info(f"SSH disconnected from {self.ip_address}")
+        """Return the connection to the pool"""
+        if self.session is not None:
+            await ssh_pool.release(self.session)
+            self.session = None
+            self.client = None
 
     async def execute(self, command: str) -> Dict[str, any]:
-        """Execute command and return output using interactive shell"""
+        """Execute command in the session's interactive shell and return its output"""
         if not self.client:
             logger.error("SSH client not connected")
             return {
@@ -76,73 +150,38 @@ class SSHClient:
                 'exit_code': -1
             }
 
+        if CONTROL_CHARACTERS.search(command):
+            logger.error(f"Refusing CLI command with control characters: {command!r}")
+            return {
+                'success': False,
+                'stdout': '',
+                'stderr': 'Command contains control characters',
+                'exit_code': -1
+            }
+
+        if not READ_ONLY_COMMAND.match(command):
+            for listener in config_write_listeners:
+                listener(self.ip_address)
+
         try:
-            import time
-
-            # Invoke an interactive shell
-            channel = self.client.invoke_shell()
-            channel.settimeout(settings.ssh_timeout)
-
-            # Wait for initial prompt (# or >)
-            time.sleep(1)
-            if channel.recv_ready():
-                channel.recv(65535)  # Clear any initial output
-
-            # Disable paging first
-            channel.send('terminal length 0\n')
-            time.sleep(0.5)
-            if channel.recv_ready():
-                channel.recv(65535)  # Clear the response
-
-            # Send actual command with newline
-            channel.send(command + '\n')
-            time.sleep(1)  # Initial wait for command to start
-
-            # Collect output
-            output = ""
-            max_wait = settings.ssh_timeout
-            start_time = time.time()
-            no_data_count = 0
-
-            while time.time() - start_time < max_wait:
-                if channel.recv_ready():
-                    chunk = channel.recv(65535).decode('utf-8', errors='ignore')
-                    output += chunk
-                    no_data_count = 0  # Reset counter when we get data
-
-                    # Check if we got a prompt back (command finished)
-                    # Look for prompt at start of line after the command output
-                    lines = output.split('\n')
-                    last_line = lines[-1].strip() if lines else ""
-                    # Check if last line is just a prompt
-                    if last_line and (last_line == '#' or last_line == '>' or last_line.endswith('# ') or last_line.endswith('> ')):
-                        break
-                else:
-                    time.sleep(0.5)
-                    no_data_count += 1
-                    # If no data for 5 consecutive checks (2.5 seconds), assume command done
-                    if no_data_count >= 5:
-                        break
-
-            channel.close()
-
-            # Remove the command echo and prompt from output
-            lines = output.split('\n')
-            # Skip first line (command echo) and last line (prompt)
-            clean_output = '\n'.join(lines[1:-1]) if len(lines) > 2 else output
-
-            # Log the raw and cleaned output for debugging
-            logger.info(f"Raw output from '{command}': {repr(output[:500])}")  # First 500 chars
-            logger.info(f"Cleaned output: {repr(clean_output.strip()[:500])}")
+            output = await ssh_pool.run(self._run_in_shell, command)
+            logger.debug("Output from %r: %r", command, output[:500])  # First 500 chars
 
             return {
                 'success': True,
-                'stdout': clean_output.strip(),
+                'stdout': output,
                 'stderr': '',
                 'exit_code': 0
             }
 
+        except asyncio.CancelledError:
+            # The worker thread may still be mid-command; closing the shell
+            # makes it fail fast and the next command opens a new one
+            self._discard_shell()
+            raise
         except Exception as e:
+            # The shell is in an unknown state; the next command opens a new one
+            self._discard_shell()
             logger.error(f"SSH command execution error: {e}")
             return {
                 'success': False,
@@ -151,17 +190,61 @@ class SSHClient:
                 'exit_code': -1
             }
 
+    def _run_in_shell(self, command: str) -> str:
+        """Run a command in the session's shell; blocks, so runs on the SSH worker pool"""
+        return self._shell().run(command)
+
+    def _shell(self) -> InteractiveShell:
+        """Get the session's shell, opening it on first use"""
+        shell = self.session.shell
+        if shell is None or not shell.is_open:
+            if shell is not None:
+                shell.close()
+            shell = self.session.shell = InteractiveShell.open(self.client, settings.ssh_timeout)
+        return shell
+
+    def _discard_shell(self):
+        if self.session is not None and self.session.shell is not None:
+            self.session.shell.close()
+            self.session.shell = None
+
     async def execute_commands(self, commands: List[str]) -> List[Dict[str, any]]:
-        """Execute multiple commands"""
+        """
+        Run a command script line by line through one shell session.
+
+        The shell keeps its mode between lines, so a script can enter
+        configuration and interface mode and rely on it. A line the device
+        rejects with a % error fails the script: nothing after it is sent,
+        and the shell is taken back to exec mode so the pooled session is
+        left clean. Returns one result per line sent.
+
+        The script is not transactional. The GAM CLI applies each line as it
+        is entered and has no candidate config to discard, so the lines
+        before a failed one stay applied in the running-config (but are not
+        saved unless the script already ran 'write memory'). Callers that
+        need to know what was left applied use applied_commands().
+        """
         results = []
         for command in commands:
             result = await self.execute(command)
+            if result['success']:
+                error = CLI_ERROR.search(result['stdout'])
+                if error:
+                    result.update(success=False, stderr=error.group(0).strip(), exit_code=1)
             results.append(result)
+
             if not result['success']:
-                logger.warning(f"Command failed: {command}")
+                logger.warning(f"Command failed on {self.ip_address}: {command}: {result['stderr']}")
+                if self.session is not None and self.session.shell is not None:
+                    await self.execute('end')
                 break
         return results
 
+    @staticmethod
+    def applied_commands(commands: List[str], results: List[Dict[str, any]]) -> List[str]:
+        """The lines of a script that execute_commands() ran successfully"""
+        return [command for command, result in zip(commands, results) if result['success']]
+
     async def configure_port(
         self,
         port_number: int,
@@ -169,36 +252,56 @@ class SSHClient:
         bandwidth_down: int,
         bandwidth_up: int,
         mimo_enabled: bool = False
-    ) -> bool:
-        """Configure GAM port for subscriber"""
-        try:
-            commands = [
-                f"configure terminal",
-                f"interface ghn0/{port_number}",
-                f"vlan {vlan_id}",
-                f"bandwidth downstream {bandwidth_down}",
-                f"bandwidth upstream {bandwidth_up}",
-            ]
-
-            if mimo_enabled:
-                commands.append("mimo enable")
-            else:
-                commands.append("mimo disable")
+    ) -> Dict[str, any]:
+        """
+        Configure GAM port for subscriber.
 
-            commands.extend([
-                "no shutdown",
-                "exit",
-                "write memory"
-            ])
+        Not transactional (see execute_commands()): when a line is rejected,
+        the lines before it stay applied on the device. Returns a report with
+        success, the applied lines, and the failed line and its error.
+        """
+        commands = [
+            f"configure terminal",
+            f"interface ghn0/{port_number}",
+            f"vlan {vlan_id}",
+            f"bandwidth downstream {bandwidth_down}",
+            f"bandwidth upstream {bandwidth_up}",
+        ]
+
+        if mimo_enabled:
+            commands.append("mimo enable")
+        else:
+            commands.append("mimo disable")
+
+        commands.extend([
+            "no shutdown",
+            "end",
+            "write memory"
+        ])
 
+        try:
             results = await self.execute_commands(commands)
-
-            # Check if all commands succeeded
-            return all(r['success'] for r in results)
-
         except Exception as e:
             logger.error(f"Port configuration error: {e}")
-            return False
+            results = []
+
+        applied = self.applied_commands(commands, results)
+        report = {
+            'success': len(applied) == len(commands),
+            'applied': applied,
+            'failed': None,
+            'error': None
+        }
+        if not report['success']:
+            if len(results) > len(applied):
+                report['failed'] = commands[len(applied)]
+                report['error'] = results[len(applied)]['stderr']
+            if applied:
+                logger.error(
+                    f"Port {port_number} on {self.ip_address} left partly configured; "
+                    f"applied {applied}, failed at {report['failed']!r}: {report['error']}"
+                )
+        return report
 
     async def disable_port(self, port_number: int) -> bool:
         """Disable GAM port"""
@@ -207,7 +310,7 @@ class SSHClient:
                 "configure terminal",
                 f"interface ghn0/{port_number}",
                 "shutdown",
-                "exit",
+                "end",
                 "write memory"
             ]
 
@@ -225,7 +328,7 @@ class SSHClient:
                 "configure terminal",
                 f"interface ghn0/{port_number}",
                 "no shutdown",
-                "exit",
+                "end",
                 "write memory"
             ]
 
@@ -258,8 +361,10 @@ class SSHClient:
         """Test SSH connectivity"""
         connected = await self.connect()
         if connected:
-            result = await self.execute("show version")
-            await self.disconnect()
+            try:
+                result = await self.execute("show version")
+            finally:
+                await self.disconnect()
             return result['success']
         return False
 
@@ -279,8 +384,10 @@ class SSHClient:
                 logger.error("Failed to connect for endpoint query")
                 return None
 
-            result = await self.execute("show ghn discover all")
-            await self.disconnect()
+            try:
+                result = await self.execute("show ghn discover all")
+            finally:
+                await self.disconnect()
 
             if not result['success']:
                 logger.error(f"show ghn discover all failed: {result['stderr']}")
@@ -288,17 +395,18 @@ class SSHClient:
 
             # Parse the output
             endpoints = self._parse_ghn_discover_output(result['stdout'])
-            logger.info(f"Retrieved {len(endpoints)} G.hn endpoints from {self.ip_address}")
+            logger.debug(f"Retrieved {len(endpoints)} G.hn endpoints from {self.ip_address}")
             return endpoints
 
         except Exception as e:
             logger.error(f"Error getting G.hn endpoints: {e}")
             return None
 
-    async def get_ghn_subscribers(self) -> Optional[List[Dict[str, any]]]:
+    async def get_ghn_subscribers(self, running_config: Optional[str] = None) -> Optional[List[Dict[str, any]]]:
         """
         Get all configured subscribers from the device running-config.
-        Executes 'show running-config' and parses subscriber lines.
+        Parses running_config when given (e.g. a cached copy, see
+        services/config_cache.py), otherwise executes 'show running-config'.
 
         Returns list of subscribers with:
         - id: subscriber ID
@@ -307,27 +415,14 @@ class SSHClient:
         - endpoint_id: associated endpoint ID
         - bw_profile: bandwidth profile
         """
-        try:
-            connected = await self.connect()
-            if not connected:
-                logger.error("Failed to connect for subscriber query")
+        if running_config is None:
+            running_config = await self.get_running_config()
+            if running_config is None:
                 return None
 
-            result = await self.execute("show running-config")
-            await self.disconnect()
-
-            if not result['success']:
-                logger.error(f"show running-config failed: {result['stderr']}")
-                return None
-
-            # Parse the output
-            subscribers = self._parse_ghn_subscriber_from_config(result['stdout'])
-            logger.info(f"Retrieved {len(subscribers)} G.hn subscribers from {self.ip_address}")
-            return subscribers
-
-        except Exception as e:
-            logger.error(f"Error getting G.hn subscribers: {e}")
-            return None
+        subscribers = self._parse_ghn_subscriber_from_config(running_config)
+        logger.debug(f"Retrieved {len(subscribers)} G.hn subscribers from {self.ip_address}")
+        return subscribers
 
     async def get_ghn_port_status(self) -> Optional[List[Dict[str, any]]]:
         """
@@ -345,8 +440,10 @@ class SSHClient:
                 logger.error("Failed to connect for port status query")
                 return None
 
-            result = await self.execute("show ghn port")
-            await self.disconnect()
+            try:
+                result = await self.execute("show ghn port")
+            finally:
+                await self.disconnect()
 
             if not result['success']:
                 logger.error(f"show ghn port failed: {result['stderr']}")
@@ -354,7 +451,7 @@ class SSHClient:
 
             # Parse the output
             ports = self._parse_ghn_port_output(result['stdout'])
-            logger.info(f"Retrieved status for {len(ports)} G.hn ports from {self.ip_address}")
+            logger.debug(f"Retrieved status for {len(ports)} G.hn ports from {self.ip_address}")
             return ports
 
         except Exception as e:
@@ -372,8 +469,10 @@ class SSHClient:
                 logger.error("Failed to connect for config retrieval")
                 return None
 
-            result = await self.execute("show running-config")
-            await self.disconnect()
+            try:
+                result = await self.execute("show running-config")
+            finally:
+                await self.disconnect()
 
             if result['success']:
                 return result['stdout']
@@ -394,45 +493,7 @@ class SSHClient:
         -----------------------------------------
          4    00:0E:D8:1C:95:08  yes         no
         """
-        endpoints = []
-
-        try:
-            lines = output.strip().split('\n')
-
-            # Skip header lines (first 2 lines: header + separator)
-            data_start = 0
-            for i, line in enumerate(lines):
-                if '---' in line or '---------' in line:
-                    data_start = i + 1
-                    break
-
-            # Parse data lines
-            for line in lines[data_start:]:
-                line = line.strip()
-                if not line or line.startswith('#') or line.startswith('!') or line.startswith('%'):
-                    continue
-
-                # Try to parse tabular format: Port MAC Configured IsUP
-                parts = line.split()
-                if len(parts) >= 2:
-                    try:
-                        # Format: Port MACAddress Configured IsUP
-                        endpoint = {
-                            'port': int(parts[0]),
-                            'mac_address': parts[1],
-                            'configured': parts[2] if len(parts) > 2 else 'unknown',
-                            'is_up': parts[3] if len(parts) > 3 else 'unknown'
-                        }
-                        endpoints.append(endpoint)
-                        logger.info(f"Parsed endpoint: port={endpoint['port']}, mac={endpoint['mac_address']}, configured={endpoint['configured']}, is_up={endpoint['is_up']}")
-                    except (ValueError, IndexError) as e:
-                        logger.warning(f"Failed to parse discover line: {line} - {e}")
-                        continue
-
-        except Exception as e:
-            logger.error(f"Error parsing discover output: {e}")
-
-        return endpoints
+        return GHN_DISCOVER_TABLE.parse(output)
 
     def _parse_ghn_endpoint_output(self, output: str) -> List[Dict[str, any]]:
         """
@@ -446,44 +507,7 @@ class SSHClient:
         -----------   ----              -----------        ----
         1             Positron_1C9508   00:0e:d8:1c:95:08  4
         """
-        endpoints = []
-
-        try:
-            lines = output.strip().split('\n')
-
-            # Skip header lines (first 2-3 lines typically)
-            data_start = 0
-            for i, line in enumerate(lines):
-                if '---' in line or 'Endpoint ID' in line:
-                    data_start = i + 1
-                    if i > 0 and '---' in line:
-                        break
-
-            # Parse data lines
-            for line in lines[data_start:]:
-                line = line.strip()
-                if not line or line.startswith('#') or line.startswith('!'):
-                    continue
-
-                # Try to parse tabular format
-                parts = line.split()
-                if len(parts) >= 4:
-                    try:
-                        endpoint = {
-                            'id': int(parts[0]),
-                            'name': parts[1].strip('"'),
-                            'mac_address': parts[2],
-                            'port': int(parts[3])
-                        }
-                        endpoints.append(endpoint)
-                    except (ValueError, IndexError) as e:
-                        logger.warning(f"Failed to parse endpoint line: {line} - {e}")
-                        continue
-
-        except Exception as e:
-            logger.error(f"Error parsing endpoint output: {e}")
-
-        return endpoints
+        return GHN_ENDPOINT_TABLE.parse(output)
 
     def _parse_ghn_subscriber_from_config(self, output: str) -> List[Dict[str, any]]:
         """
@@ -494,53 +518,137 @@ class SSHClient:
         """
         subscribers = []
 
-        try:
-            lines = output.strip().split('\n')
-
-            for line in lines:
-                line = line.strip()
-                if not line.startswith('ghn subscriber'):
-                    continue
-
-                # Parse: ghn subscriber <id> name "<name>" vid <vlan> endpoint <ep_id> bw-profile <profile> ...
-                parts = line.split()
-                try:
-                    subscriber_id_idx = 2  # Position after "ghn subscriber"
-                    subscriber = {
-                        'id': int(parts[subscriber_id_idx])
-                    }
-
-                    # Extract name (quoted string)
-                    if 'name' in parts:
-                        name_idx = parts.index('name') + 1
-                        name = parts[name_idx].strip('"')
-                        subscriber['name'] = name
-
-                    # Extract vid (VLAN ID)
-                    if 'vid' in parts:
-                        vid_idx = parts.index('vid') + 1
-                        subscriber['vlan_id'] = int(parts[vid_idx])
-
-                    # Extract endpoint
-                    if 'endpoint' in parts:
-                        ep_idx = parts.index('endpoint') + 1
-                        subscriber['endpoint_id'] = int(parts[ep_idx])
-
-                    # Extract bw-profile
-                    if 'bw-profile' in parts:
-                        bw_idx = parts.index('bw-profile') + 1
-                        subscriber['bw_profile'] = parts[bw_idx]
-
-                    subscribers.append(subscriber)
-                except (ValueError, IndexError) as e:
-                    logger.warning(f"Failed to parse subscriber config line: {line} - {e}")
-                    continue
-
-        except Exception as e:
-            logger.error(f"Error parsing subscriber config: {e}")
+        for line in output.split('\n'):
+            line = line.strip()
+            if not line.startswith('ghn subscriber '):
+                continue
+
+            parts = self._split_config_line(line)
+            try:
+                subscriber = {'id': int(parts[2])}
+                options = self._config_options(parts[3:])
+                if 'name' in options:
+                    subscriber['name'] = options['name']
+                if 'vid' in options:
+                    subscriber['vlan_id'] = int(options['vid'])
+                if 'endpoint' in options:
+                    subscriber['endpoint_id'] = int(options['endpoint'])
+                if 'bw-profile' in options:
+                    subscriber['bw_profile'] = options['bw-profile']
+                subscribers.append(subscriber)
+            except (ValueError, IndexError) as e:
+                logger.warning(f"Failed to parse subscriber config line: {line} - {e}")
 
         return subscribers
 
+    def _parse_ghn_endpoint_from_config(self, output: str) -> List[Dict[str, any]]:
+        """
+        Parse endpoint configuration from running-config.
+
+        Expected format:
+        ghn endpoint 1 name "Positron_1C9508" mac-address 00:0e:d8:1c:95:08 port 4
+        """
+        endpoints = []
+
+        for line in output.split('\n'):
+            line = line.strip()
+            if not line.startswith('ghn endpoint '):
+                continue
+
+            parts = self._split_config_line(line)
+            try:
+                endpoint = {'id': int(parts[2])}
+                options = self._config_options(parts[3:])
+                if 'name' in options:
+                    endpoint['name'] = options['name']
+                if 'mac-address' in options:
+                    endpoint['mac_address'] = options['mac-address']
+                if 'port' in options:
+                    endpoint['port'] = int(options['port'])
+                endpoints.append(endpoint)
+            except (ValueError, IndexError) as e:
+                logger.warning(f"Failed to parse endpoint config line: {line} - {e}")
+
+        return endpoints
+
+    def _parse_ghn_bw_profile_from_config(self, output: str) -> List[Dict[str, any]]:
+        """
+        Parse bandwidth profiles from running-config.
+
+        Expected format (the name keyword may be omitted):
+        ghn bw-profile 2 name "Class 2" rate-downstream 17000 rate-upstream 11000 service-limit-level 4
+        """
+        profiles = []
+
+        for line in output.split('\n'):
+            line = line.strip()
+            if not line.startswith('ghn bw-profile '):
+                continue
+
+            parts = self._split_config_line(line)
+            try:
+                profile = {'id': int(parts[2])}
+                rest = parts[3:]
+                if rest and rest[0] not in ('name', 'description') and not rest[0].startswith(('rate-', 'service-')):
+                    profile['name'] = rest.pop(0)
+                options = self._config_options(rest)
+                for key, field in (('name', 'name'), ('description', 'description')):
+                    if key in options:
+                        profile[field] = options[key]
+                for key, field in (
+                    ('rate-downstream', 'rate_downstream'),
+                    ('rate-upstream', 'rate_upstream'),
+                    ('service-limit-level', 'service_limit_level')
+                ):
+                    if key in options:
+                        profile[field] = int(options[key])
+                profiles.append(profile)
+            except (ValueError, IndexError) as e:
+                logger.warning(f"Failed to parse bw-profile config line: {line} - {e}")
+
+        return profiles
+
+    def _parse_vlans_from_config(self, output: str) -> List[int]:
+        """
+        Parse the VLANs created in running-config.
+
+        Expected format:
+        vlan 1,53,100-110
+        """
+        vlans = set()
+
+        for line in output.split('\n'):
+            parts = line.split()
+            if len(parts) != 2 or parts[0] != 'vlan':
+                continue
+            try:
+                for item in parts[1].split(','):
+                    if '-' in item:
+                        start, end = item.split('-', 1)
+                        vlans.update(range(int(start), int(end) + 1))
+                    else:
+                        vlans.add(int(item))
+            except ValueError as e:
+                logger.warning(f"Failed to parse vlan config line: {line.strip()} - {e}")
+
+        return sorted(vlans)
+
+    @staticmethod
+    def _split_config_line(line: str) -> List[str]:
+        """Split a config line into words, keeping quoted strings together"""
+        try:
+            return shlex.split(line)
+        except ValueError:
+            return line.split()
+
+    @staticmethod
+    def _config_options(parts: List[str]) -> Dict[str, str]:
+        """Map each word of a split config line to the word after it; first occurrence wins"""
+        options = {}
+        for i in range(len(parts) - 1):
+            options.setdefault(parts[i], parts[i + 1])
+        return options
+
     def _parse_ghn_subscriber_output(self, output: str) -> List[Dict[str, any]]:
         """
         Parse output from 'show ghn subscriber' command.
@@ -553,45 +661,7 @@ class SSHClient:
         -------------  ----    ----  --------  ----------
         1              test    100   1         unthrottled
         """
-        subscribers = []
-
-        try:
-            lines = output.strip().split('\n')
-
-            # Skip header lines
-            data_start = 0
-            for i, line in enumerate(lines):
-                if '---' in line or 'Subscriber ID' in line:
-                    data_start = i + 1
-                    if i > 0 and '---' in line:
-                        break
-
-            # Parse data lines
-            for line in lines[data_start:]:
-                line = line.strip()
-                if not line or line.startswith('#') or line.startswith('!'):
-                    continue
-
-                # Try to parse tabular format
-                parts = line.split()
-                if len(parts) >= 4:
-                    try:
-                        subscriber = {
-                            'id': int(parts[0]),
-                            'name': parts[1].strip('"'),
-                            'vlan_id': int(parts[2]),
-                            'endpoint_id': int(parts[3]),
-                            'bw_profile': parts[4] if len(parts) > 4 else None
-                        }
-                        subscribers.append(subscriber)
-                    except (ValueError, IndexError) as e:
-                        logger.warning(f"Failed to parse subscriber line: {line} - {e}")
-                        continue
-
-        except Exception as e:
-            logger.error(f"Error parsing subscriber output: {e}")
-
-        return subscribers
+        return GHN_SUBSCRIBER_TABLE.parse(output)
 
     def _parse_ghn_port_output(self, output: str) -> List[Dict[str, any]]:
         """
@@ -605,40 +675,4 @@ class SSHClient:
         3     enabled     down
         4     enabled     up
         """
-        ports = []
-
-        try:
-            lines = output.strip().split('\n')
-
-            # Skip header lines
-            data_start = 0
-            for i, line in enumerate(lines):
-                if '---' in line or 'Port' in line:
-                    data_start = i + 1
-                    if i > 0 and '---' in line:
-                        break
-
-            # Parse data lines
-            for line in lines[data_start:]:
-                line = line.strip()
-                if not line or line.startswith('#') or line.startswith('!'):
-                    continue
-
-                # Try to parse tabular format
-                parts = line.split()
-                if len(parts) >= 2:
-                    try:
-                        port = {
-                            'port_number': int(parts[0]),
-                            'status': parts[1] if len(parts) > 1 else 'unknown',
-                            'link_state': parts[2] if len(parts) > 2 else 'unknown'
-                        }
-                        ports.append(port)
-                    except (ValueError, IndexError) as e:
-                        logger.warning(f"Failed to parse port line: {line} - {e}")
-                        continue
-
-        except Exception as e:
-            logger.error(f"Error parsing port output: {e}")
-
-        return ports
+        return GHN_PORT_TABLE.parse(output)
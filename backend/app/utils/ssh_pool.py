@@ -0,0 +1,200 @@
+"""Pool of authenticated SSH connections shared by SSHClient instances"""
+import paramiko
+import asyncio
+import functools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, List, Tuple, Callable, Any
+from ..config import settings
+from .ssh_shell import InteractiveShell
+
+logger = logging.getLogger(__name__)
+
+
+class SshSession:
+    """One authenticated SSH connection to a device"""
+
+    def __init__(self, key: Tuple, client: paramiko.SSHClient):
+        self.key = key
+        self.client = client
+        self.shell: Optional[InteractiveShell] = None  # Opened on first command
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+    def __repr__(self):
+        return f"<SshSession({self.key[0]}:{self.key[1]}, {self.key[2]})>"
+
+    @property
+    def transport(self) -> Optional[paramiko.Transport]:
+        return self.client.get_transport()
+
+    def is_alive(self, probe: bool = False) -> bool:
+        """
+        Check the connection is still usable.
+
+        With probe, an SSH_MSG_IGNORE is sent so a peer that silently went
+        away is noticed before a command is sent into the void.
+        """
+        transport = self.transport
+        if transport is None or not transport.is_active() or not transport.is_authenticated():
+            return False
+        if probe:
+            try:
+                transport.send_ignore()
+            except Exception:
+                return False
+        return True
+
+    def close(self):
+        if self.shell is not None:
+            self.shell.close()
+            self.shell = None
+        try:
+            self.client.close()
+        except Exception as e:
+            logger.debug(f"Error closing SSH session to {self.key[0]}: {e}")
+
+
+def _close_abandoned(future: "asyncio.Future"):
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+class SshSessionPool:
+    """
+    Keeps authenticated SSH connections open between operations.
+
+    Sessions are keyed by device address, port and credentials. Key exchange
+    and password authentication cost several round trips and a good deal of
+    CPU on the GAM, so a released session goes back to the pool and the next
+    operation against the same device picks it up. The transport sends
+    keepalives every keepalive_interval seconds so NAT and firewall state
+    survives between polls.
+
+    At most max_sessions_per_device sessions per key are open or in use at
+    once; further acquirers wait. A session is held exclusively from
+    acquire to release, so with the default of one, CLI operations against
+    a device are serialized. Idle sessions are closed after idle_timeout
+    seconds, and a session idle longer than health_check_interval is probed
+    before it is handed out again.
+
+    paramiko is blocking, so connecting, probing, shell I/O and closing run
+    on a dedicated thread pool of worker_threads threads (see run()) and the
+    event loop keeps serving requests while CLI sessions are busy.
+    """
+
+    def __init__(
+        self,
+        max_sessions_per_device: int = 1,
+        idle_timeout: int = 300,
+        keepalive_interval: int = 30,
+        health_check_interval: int = 30,
+        worker_threads: int = 16
+    ):
+        self.max_sessions_per_device = max_sessions_per_device
+        self.idle_timeout = idle_timeout
+        self.keepalive_interval = keepalive_interval
+        self.health_check_interval = health_check_interval
+        self._idle: Dict[Tuple, List[SshSession]] = {}
+        self._limits: Dict[Tuple, asyncio.Semaphore] = {}
+        self._executor = ThreadPoolExecutor(max_workers=worker_threads, thread_name_prefix='ssh')
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking SSH call on the worker pool"""
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs)
+        )
+
+    async def acquire(self, key: Tuple, connect: Callable[[], paramiko.SSHClient]) -> SshSession:
+        """
+        Get a session for key, reusing an idle one when possible.
+
+        connect is called to open a new authenticated client when no idle
+        session is usable; its exceptions propagate to the caller.
+        """
+        await self.evict_idle()
+
+        limit = self._limits.get(key)
+        if limit is None:
+            limit = self._limits[key] = asyncio.Semaphore(self.max_sessions_per_device)
+        await limit.acquire()
+
+        try:
+            idle = self._idle.get(key, [])
+            while idle:
+                session = idle.pop()
+                probe = time.monotonic() - session.last_used >= self.health_check_interval
+                if await self.run(session.is_alive, probe):
+                    session.last_used = time.monotonic()
+                    logger.debug(f"Reusing SSH session to {key[0]}")
+                    return session
+                logger.debug(f"Discarding dead SSH session to {key[0]}")
+                await self.run(session.close)
+
+            pending = asyncio.ensure_future(self.run(connect))
+            try:
+                client = await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # The worker thread finishes regardless; close what it opens
+                pending.add_done_callback(_close_abandoned)
+                raise
+            transport = client.get_transport()
+            if transport is not None and self.keepalive_interval:
+                transport.set_keepalive(self.keepalive_interval)
+            return SshSession(key, client)
+
+        except BaseException:
+            limit.release()
+            raise
+
+    async def release(self, session: SshSession, reusable: bool = True):
+        """Return a session to the pool, or close it if it is broken or unwanted"""
+        session.last_used = time.monotonic()
+        keep = reusable and session.is_alive()
+        if keep:
+            self._idle.setdefault(session.key, []).append(session)
+
+        # Free the slot first, so a cancelled close cannot leak it
+        limit = self._limits.get(session.key)
+        if limit is not None:
+            limit.release()
+
+        if not keep:
+            await self.run(session.close)
+
+    async def evict_idle(self):
+        """Close sessions that have not been used within idle_timeout"""
+        cutoff = time.monotonic() - self.idle_timeout
+        expired = []
+        for key in list(self._idle):
+            keep = []
+            for session in self._idle[key]:
+                if session.last_used >= cutoff:
+                    keep.append(session)
+                else:
+                    expired.append(session)
+            if keep:
+                self._idle[key] = keep
+            else:
+                del self._idle[key]
+
+        if expired:
+            await asyncio.gather(*(self.run(session.close) for session in expired))
+            logger.debug(f"Closed {len(expired)} idle SSH sessions")
+
+    async def clear(self):
+        """Close all idle sessions"""
+        sessions = [session for idle in self._idle.values() for session in idle]
+        self._idle.clear()
+        await asyncio.gather(*(self.run(session.close) for session in sessions))
+
+
+# Global pool shared by every SSHClient in the process
+ssh_pool = SshSessionPool(
+    max_sessions_per_device=settings.ssh_pool_max_sessions_per_device,
+    idle_timeout=settings.ssh_pool_idle_timeout,
+    keepalive_interval=settings.ssh_keepalive_interval,
+    health_check_interval=settings.ssh_keepalive_interval,
+    worker_threads=settings.ssh_worker_threads
+)
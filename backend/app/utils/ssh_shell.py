@@ -0,0 +1,148 @@
+"""Prompt-driven reader for an interactive GAM CLI shell"""
+import paramiko
+import logging
+import re
+import select
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Any line ending in a CLI prompt character, used until the real prompt is known
+GENERIC_PROMPT = re.compile(r'[\w.\-@:/~\[\]()]+ ?[#>$] ?$')
+
+# Pager prompts to answer when paging could not be disabled
+MORE_PROMPT = re.compile(r'-+ ?more ?-+|--more--', re.IGNORECASE)
+
+ANSI_ESCAPE = re.compile(r'\x1b\[[0-9;?]*[A-Za-z]')
+
+# How a pager wipes its prompt before the next page: back to the start of
+# the line, blank it, back again
+PAGER_ERASE = re.compile(r'\r[ \t]*\r(?!\n)')
+
+# A line break (or any other control character) in a command would make the
+# shell run whatever follows it as further commands
+CONTROL_CHARACTERS = re.compile(r'[\x00-\x1f\x7f]')
+
+
+class ShellTimeout(Exception):
+    """The prompt did not come back before the deadline"""
+
+
+class InteractiveShell:
+    """
+    A long-lived interactive shell channel on an SSH connection.
+
+    The GAM CLI only runs commands in an interactive shell, so one is opened
+    per connection and kept for its lifetime. Paging is disabled once, when
+    the shell is opened, and the device's prompt is learned from its first
+    output. Each command then returns as soon as the prompt reappears,
+    waiting on the channel with select() instead of sleeping, so it costs
+    about one round trip plus the time the device takes to run it.
+    """
+
+    def __init__(self, channel: paramiko.Channel, timeout: float):
+        self.channel = channel
+        self.timeout = timeout
+        self.prompt: Optional[re.Pattern] = None
+        self.hostname: Optional[str] = None
+
+    @classmethod
+    def open(cls, client: paramiko.SSHClient, timeout: float) -> "InteractiveShell":
+        """Open a shell on client, learn its prompt and disable paging"""
+        channel = client.invoke_shell(width=511, height=0)
+        shell = cls(channel, timeout)
+        try:
+            shell._learn_prompt()
+            shell.run('terminal length 0')
+        except Exception:
+            shell.close()
+            raise
+        return shell
+
+    @property
+    def is_open(self) -> bool:
+        transport = self.channel.get_transport()
+        return not self.channel.closed and transport is not None and transport.is_active()
+
+    def run(self, command: str, timeout: Optional[float] = None) -> str:
+        """Send one command and return its output, without the echo and prompt"""
+        if CONTROL_CHARACTERS.search(command):
+            raise ValueError(f"Control characters in CLI command {command!r}")
+        self._drain()
+        self.channel.sendall(command + '\n')
+        output = self._read_until(self.prompt, timeout or self.timeout, echo=command.strip())
+
+        # First line echoes the command, last line is the prompt
+        lines = output.split('\n')[1:]
+        if lines and self.prompt.search(lines[-1]):
+            lines = lines[:-1]
+        return '\n'.join(lines).strip()
+
+    def close(self):
+        try:
+            self.channel.close()
+        except Exception:
+            pass
+
+    def _learn_prompt(self):
+        """
+        Wait for the login banner to end in a prompt and remember it.
+
+        The prompt is matched on the hostname so configuration modes
+        (host(config-if)#) still count as the prompt, while output lines
+        that merely end in # or > do not.
+        """
+        self.channel.sendall('\n')
+        output = self._read_until(GENERIC_PROMPT, self.timeout)
+        last_line = output.rstrip('\n').split('\n')[-1].strip()
+        match = re.match(r'([\w.\-@:/~\[\]]+)', last_line)
+        self.hostname = match.group(1) if match else last_line[:-1]
+        self.prompt = re.compile(re.escape(self.hostname) + r'(\([\w.\-/ ]*\))? ?[#>$] ?$')
+        logger.debug(f"Learned CLI prompt {self.hostname!r}")
+
+    def _read_until(self, prompt: re.Pattern, timeout: float, echo: Optional[str] = None) -> str:
+        """
+        Read until a line matching prompt is the last thing received.
+
+        With echo, only a prompt after the echoed command counts, so a stray
+        prompt still in flight from earlier (e.g. after the login banner)
+        cannot end the read early. The result then starts at the echo.
+        """
+        deadline = time.monotonic() + timeout
+        buffer = ''
+
+        while True:
+            if echo and not buffer.startswith(echo):
+                start = buffer.find(echo)
+                if start >= 0:
+                    # Keep the whole echo line; the prompt precedes it
+                    buffer = buffer[start:]
+            tail = buffer.rsplit('\n', 1)[-1]
+            if prompt.search(tail) and (not echo or (buffer.startswith(echo) and '\n' in buffer)):
+                return buffer
+            if MORE_PROMPT.search(tail):
+                buffer = buffer[:len(buffer) - len(tail)]
+                self.channel.sendall(' ')
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise ShellTimeout(f"CLI prompt not seen within {timeout}s")
+
+            readable, _, _ = select.select([self.channel], [], [], remaining)
+            if not readable:
+                continue
+            chunk = self.channel.recv(65535)
+            if not chunk:
+                raise EOFError("CLI shell closed by device")
+            buffer += self._clean(chunk.decode('utf-8', errors='ignore'))
+
+    def _drain(self):
+        """Discard anything the device sent unprompted (e.g. log messages)"""
+        while self.channel.recv_ready():
+            self.channel.recv(65535)
+
+    @staticmethod
+    def _clean(text: str) -> str:
+        text = PAGER_ERASE.sub('', ANSI_ESCAPE.sub('', text))
+        return text.replace('\r\n', '\n').replace('\r', '')
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for the GAM CLI table parsers.
+
+Builds show output the size of a fully loaded coax GAM (24 ports with 16
+endpoints each by default) and times each parser over it.
+
+Usage:
+    python scripts/bench_cli_parsers.py [--ports 24] [--endpoints 16] [--repeat 200]
+"""
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.utils.cli_table import GHN_DISCOVER_TABLE, GHN_ENDPOINT_TABLE, GHN_SUBSCRIBER_TABLE, GHN_PORT_TABLE
+
+
+def mac(n: int) -> str:
+    return f"00:0E:D8:{(n >> 16) & 0xff:02X}:{(n >> 8) & 0xff:02X}:{n & 0xff:02X}"
+
+
+def captures(ports: int, endpoints: int) -> dict:
+    """Show output as the GAM prints it, for every parsed table"""
+    rows = [(port, port_endpoint) for port in range(1, ports + 1) for port_endpoint in range(endpoints)]
+
+    discover = ["Port  MACAddress         Configured  IsUP", "-" * 41]
+    discover += [
+        f" {port:<4} {mac(i)}  {'yes' if i % 3 else 'no':<10}  {'yes' if i % 5 else 'no'}"
+        for i, (port, _) in enumerate(rows)
+    ]
+
+    endpoint = ["Endpoint ID   Name                  MAC Address        Port", "-----------   ----   -----------   ----"]
+    endpoint += [
+        f"{i + 1:<13} \"Positron {mac(i)[-8:]}\"  {mac(i)}  {port}"
+        for i, (port, _) in enumerate(rows)
+    ]
+
+    subscriber = ["Subscriber ID  Name              VLAN  Endpoint  BW Profile", "-------------  ----  ----  --------  ----------"]
+    subscriber += [
+        f"{i + 1:<14} sub-{i + 1:<13} {100 + i:<5} {i + 1:<9} {'unthrottled' if i % 2 else '500M-50M'}"
+        for i in range(len(rows))
+    ]
+
+    port = ["Port  Status      Link", "----  ------      ----"]
+    port += [f"{n:<5} {'enabled':<11} {'up' if n % 2 else 'down'}" for n in range(1, ports + 1)]
+
+    prompt = "GAM-24-C#"
+    return {
+        'show ghn discover all': (GHN_DISCOVER_TABLE, '\n'.join(discover + [prompt])),
+        'show ghn endpoint': (GHN_ENDPOINT_TABLE, '\n'.join(endpoint + [prompt])),
+        'show ghn subscriber': (GHN_SUBSCRIBER_TABLE, '\n'.join(subscriber + [prompt])),
+        'show ghn port': (GHN_PORT_TABLE, '\n'.join(port + [prompt])),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the GAM CLI table parsers")
+    parser.add_argument('--ports', type=int, default=24)
+    parser.add_argument('--endpoints', type=int, default=16, help='Endpoints per port')
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'command':<24}{'rows':>8}{'bytes':>10}{'us/parse':>12}{'rows/s':>14}")
+    for command, (table, output) in captures(args.ports, args.endpoints).items():
+        rows = len(table.parse(output))
+        seconds = min(timeit.repeat(lambda: table.parse(output), number=args.repeat, repeat=5)) / args.repeat
+        print(f"{command:<24}{rows:>8}{len(output):>10}{seconds * 1e6:>12.1f}{rows / seconds:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
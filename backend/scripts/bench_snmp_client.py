@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Benchmark SNMPClient and the fleet poller against simulated GAM agents.
+
+Starts a snmp_agent_simulator fleet and reports:
+- per-operation latency (mean, p50, p95, max) of the SNMPClient calls the
+  poller and the API make, on one device
+- fleet poll throughput as the fleet grows: FleetPoller.poll_once over the
+  first N devices for each size given, several cycles each (the first one
+  resolves targets and seeds the counter baselines), with results
+  discarded instead of written to the database
+
+The agents are served from a separate worker process by default, so that
+their encoding and decoding is not counted as the client's. Poll
+concurrency, deadline, FDB walking and counter sampling come from the usual
+settings (FLEET_POLL_CONCURRENCY, FLEET_POLL_FDB, ...); the poll jitter
+defaults to 0 here so it does not hide the polling time.
+
+Usage:
+    python scripts/bench_snmp_client.py --devices 50,200,1000 --endpoints 4 --loss 0.01 --latency 0.005
+"""
+import argparse
+import asyncio
+import math
+import resource
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.config import settings
+from app.utils.snmp_client import SNMPClient
+from app.utils.snmp_engine import snmp_registry
+from app.services.fleet_poller import FleetPoller
+from snmp_agent_simulator import SnmpSimulator, load_walk
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return (
+        f"mean {statistics.mean(samples) * 1000:8.2f} ms  "
+        f"p50 {samples[len(samples) // 2] * 1000:8.2f} ms  "
+        f"p95 {samples[math.ceil(len(samples) * 0.95) - 1] * 1000:8.2f} ms  "
+        f"max {samples[-1] * 1000:8.2f} ms"
+    )
+
+
+class SimulatedFleetPoller(FleetPoller):
+    """FleetPoller over a fixed list of devices, discarding the results"""
+
+    def __init__(self, devices, **kwargs):
+        super().__init__(session_factory=None, **kwargs)
+        self.devices = devices
+
+    async def _load_devices(self, full=True):
+        return self.devices
+
+    async def _store_results(self, results):
+        pass
+
+
+async def bench_operations(device, iterations: int):
+    print(f"\nPer-operation latency on {device['name']} ({iterations} runs each)")
+    snmp_client = SNMPClient.for_device(device)
+    if_indexes = [SNMPClient.GHN_IF_INDEX_BASE + port for port in device['ports']]
+
+    async def walk_fdb():
+        return [entry async for entry in snmp_client.walk_fdb()]
+
+    operations = {
+        'get_system_info': snmp_client.get_system_info,
+        f'get_port_counters ({len(if_indexes)})': lambda: snmp_client.get_port_counters(if_indexes),
+        'get_interface_table': snmp_client.get_interface_table,
+        'get_gam_ports_info': snmp_client.get_gam_ports_info,
+        'walk_fdb': walk_fdb,
+    }
+    for label, operation in operations.items():
+        samples = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            result = await operation()
+            samples.append(time.perf_counter() - started)
+        size = f"{len(result)} rows" if isinstance(result, (list, dict)) else ''
+        print(f"  {label:<26} {summarize(samples)}  {size}")
+
+
+async def bench_fleet(simulator: SnmpSimulator, sizes, cycles: int, concurrency, jitter: float):
+    devices = simulator.devices()
+    print(
+        f"\nFleet poll, {cycles} cycles per size "
+        f"(FDB walk {'on' if settings.fleet_poll_fdb else 'off'}, "
+        f"counter sampling {'on' if settings.counter_sampling_enabled else 'off'})"
+    )
+    for size in sizes:
+        # Each size starts cold: no cached targets, RTT estimates or breakers
+        snmp_registry.clear()
+        poller = SimulatedFleetPoller(devices[:size], concurrency=concurrency, jitter=jitter)
+        if size > snmp_registry.max_targets:
+            print(f"  note: {size} devices exceed the {snmp_registry.max_targets}-entry SNMP target cache")
+
+        for cycle in range(1, cycles + 1):
+            before = simulator.stats()
+            summary = await poller.poll_once()
+            after = simulator.stats()
+            requests = after['requests'] - before['requests']
+            dropped = after['dropped'] - before['dropped']
+            print(
+                f"  {size:>5} devices  cycle {cycle}  {summary['duration']:7.2f} s  "
+                f"{size / summary['duration']:8.1f} devices/s  "
+                f"{requests / summary['duration']:9.0f} requests/s ({dropped} dropped)  "
+                f"online {summary['online']}  unconfirmed {summary['unconfirmed']}  "
+                f"offline {summary['offline']}  timed out {summary['timed_out']}"
+            )
+
+
+async def main(simulator: SnmpSimulator, args, sizes):
+    if not args.simulator_processes:
+        await simulator.start()
+    try:
+        await bench_operations(simulator.devices()[0], args.iterations)
+        await bench_fleet(simulator, sizes, args.cycles, args.concurrency, args.poll_jitter)
+    finally:
+        snmp_registry.clear()
+        await simulator.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark SNMPClient and the fleet poller against simulated GAMs")
+    parser.add_argument('--devices', default='10,50,200', help='Comma-separated fleet sizes')
+    parser.add_argument('--base-port', type=int, default=16100)
+    parser.add_argument('--addressing', choices=['port', 'loopback'], default='port')
+    parser.add_argument('--walks', help='snmpwalk capture(s) replayed by every agent (default: generated)')
+    parser.add_argument('--ports', type=int, default=24)
+    parser.add_argument('--endpoints', type=int, default=1, help='Endpoints per port on generated devices')
+    parser.add_argument('--loss', type=float, default=0.0)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--flap-interval', type=float, default=0.0)
+    parser.add_argument('--max-response-size', type=int, default=65507)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--cycles', type=int, default=3)
+    parser.add_argument('--concurrency', type=int, default=None)
+    parser.add_argument('--poll-jitter', type=float, default=0.0, help='Max random delay before each device poll')
+    parser.add_argument('--simulator-processes', type=int, default=1,
+                        help='Worker processes serving the agents (0: share the benchmark event loop)')
+    args = parser.parse_args()
+    sizes = sorted(int(size) for size in args.devices.split(','))
+
+    # One UDP socket per simulated agent
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    simulator = SnmpSimulator.fleet(
+        sizes[-1],
+        ports=args.ports,
+        endpoints=args.endpoints,
+        mib=load_walk(Path(args.walks)) if args.walks else None,
+        loss=args.loss,
+        latency=args.latency,
+        jitter=args.jitter,
+        flap_interval=args.flap_interval,
+        max_response_size=args.max_response_size,
+        base_port=args.base_port,
+        addressing=args.addressing
+    )
+    if args.simulator_processes:
+        # Forked before the event loop starts, so the agents do not share its CPU
+        simulator.fork(args.simulator_processes)
+    asyncio.run(main(simulator, args, sizes))
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark SSHClient and the CLI fan-out against a simulated GAM fleet.
+
+Starts gam_cli_simulator in-process and reports:
+- connection setup and per-command latency (mean, p50, p95, max) on one device
+- fleet fan-out throughput for each parsed query, cold (new SSH sessions)
+  and warm (sessions reused from the pool)
+
+SSH pool size, worker threads and fan-out concurrency come from the usual
+settings (SSH_WORKER_THREADS, CLI_FANOUT_CONCURRENCY, ...).
+
+Usage:
+    python scripts/bench_ssh_client.py --devices 200 --latency 0.02 --jitter 0.01
+"""
+import argparse
+import asyncio
+import math
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.utils.ssh_client import SSHClient
+from app.utils.ssh_pool import ssh_pool
+from app.services.cli_fanout import CliFanout, QUERIES
+from gam_cli_simulator import CliSimulator, PROMPT_STYLES, load_transcripts
+
+COMMANDS = ['show ghn discover all', 'show ghn port', 'show running-config']
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return (
+        f"mean {statistics.mean(samples) * 1000:8.1f} ms  "
+        f"p50 {samples[len(samples) // 2] * 1000:8.1f} ms  "
+        f"p95 {samples[math.ceil(len(samples) * 0.95) - 1] * 1000:8.1f} ms  "
+        f"max {samples[-1] * 1000:8.1f} ms"
+    )
+
+
+async def bench_commands(device, iterations: int):
+    print(f"\nPer-command latency on {device['name']} ({iterations} runs each)")
+    ssh_client = SSHClient.for_device(device)
+
+    started = time.perf_counter()
+    if not await ssh_client.connect():
+        raise SystemExit("Could not connect to the simulator")
+    await ssh_client.execute('show version')  # Opens the shell and disables paging
+    print(f"  {'connect + shell':<24} {(time.perf_counter() - started) * 1000:8.1f} ms")
+
+    try:
+        for command in COMMANDS:
+            samples = []
+            for _ in range(iterations):
+                started = time.perf_counter()
+                result = await ssh_client.execute(command)
+                samples.append(time.perf_counter() - started)
+                if not result['success']:
+                    raise SystemExit(f"{command} failed: {result['stderr']}")
+            print(f"  {command:<24} {summarize(samples)}")
+    finally:
+        await ssh_client.disconnect()
+
+
+async def bench_fanout(devices, concurrency: int):
+    fanout = CliFanout(session_factory=None, concurrency=concurrency)
+    print(f"\nFan-out over {len(devices)} devices, concurrency {fanout.concurrency}")
+
+    await ssh_pool.clear()
+    for label in ('cold', 'warm'):
+        for query in QUERIES:
+            started = time.perf_counter()
+            results = [result async for result in fanout.run(devices, query=query)]
+            elapsed = time.perf_counter() - started
+            succeeded = sum(result['success'] for result in results)
+            durations = [result['duration'] for result in results if result['success']]
+            print(
+                f"  {label:<5} {query:<12} {succeeded:>5}/{len(results)} ok  "
+                f"{elapsed:7.2f} s  {len(results) / elapsed:8.1f} devices/s  "
+                f"per device {summarize(durations) if durations else '-'}"
+            )
+
+
+async def main(args):
+    transcripts = load_transcripts(Path(args.transcripts)) if args.transcripts else None
+    simulator = CliSimulator.fleet(
+        args.devices,
+        ports=args.ports,
+        endpoints=args.endpoints,
+        transcripts=transcripts,
+        latency=args.latency,
+        jitter=args.jitter,
+        prompt_style=args.prompt_style,
+        base_port=args.base_port
+    )
+    await simulator.start()
+    try:
+        devices = simulator.devices()
+        await bench_commands(devices[0], args.iterations)
+        await bench_fanout(devices, args.concurrency)
+    finally:
+        await ssh_pool.clear()
+        await simulator.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark SSHClient against simulated GAMs")
+    parser.add_argument('--devices', type=int, default=50)
+    parser.add_argument('--base-port', type=int, default=22000)
+    parser.add_argument('--transcripts', help='Directory of recorded show output (default: generated)')
+    parser.add_argument('--ports', type=int, default=24)
+    parser.add_argument('--endpoints', type=int, default=16, help='Endpoints per port on generated devices')
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--prompt-style', choices=sorted(PROMPT_STYLES), default='standard')
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--concurrency', type=int, default=None)
+    asyncio.run(main(parser.parse_args()))
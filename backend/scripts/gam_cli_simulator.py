@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+GAM CLI simulator for measuring SSHClient without a real GAM.
+
+Runs a fleet of virtual GAMs on one host, one SSH port each. Every device
+answers show commands from transcripts (either recorded from a real GAM,
+one file per command, or generated to a given port and endpoint count),
+follows configure / interface mode like the GAM CLI, pages output until
+'terminal length 0', rejects unknown commands with a % error, and adds a
+configurable latency and jitter to every command.
+
+Connections are accepted on an asyncio event loop; each SSH connection
+is then served by paramiko's server-mode transport, which runs on its
+own threads.
+
+Usage:
+    python scripts/gam_cli_simulator.py --devices 200 --base-port 22000 --latency 0.05 --jitter 0.02
+    python scripts/gam_cli_simulator.py --transcripts scripts/transcripts/gam-4-c
+"""
+import argparse
+import asyncio
+import logging
+import random
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import paramiko
+
+# Prompt formats by style; mode is '', '(config)' or '(config-if)'
+PROMPT_STYLES = {
+    'standard': '{host}{mode}# ',
+    'compact': '{host}{mode}#',
+    'spaced': '{host}{mode} # ',
+    'ansi': '\x1b[1m{host}{mode}#\x1b[0m ',
+}
+
+PAGE_LINES = 24
+MORE = '-- more --, next page: Space, continue: g, quit: ^C'
+INVALID = "% Invalid word detected at '^' marker."
+
+# Clients dropping their connections is routine here, not worth a traceback
+logging.getLogger('gam_cli_simulator.transport').setLevel(logging.CRITICAL)
+
+# Configuration lines kept in the running-config when entered in config mode
+CONFIG_KEYWORDS = ('ghn ', 'vlan ', 'no ghn ', 'hostname ', 'ip ')
+
+# Commands accepted in interface mode
+INTERFACE_KEYWORDS = ('vlan ', 'bandwidth ', 'mimo ', 'shutdown', 'no shutdown', 'description ', 'switchport ')
+
+
+def load_transcripts(directory: Path) -> Dict[str, str]:
+    """Recorded show output, one file per command: show_ghn_discover_all.txt is 'show ghn discover all'"""
+    return {
+        path.stem.replace('_', ' '): path.read_text().replace('\r\n', '\n').rstrip('\n')
+        for path in sorted(directory.glob('*.txt'))
+    }
+
+
+def mac(n: int) -> str:
+    return f"00:0e:d8:{(n >> 16) & 0xff:02x}:{(n >> 8) & 0xff:02x}:{n & 0xff:02x}"
+
+
+def synthetic_transcripts(hostname: str, ports: int = 24, endpoints: int = 1, seed: int = 0) -> Dict[str, str]:
+    """Show output for a GAM with endpoints (per port) G.hn endpoints on each of its ports"""
+    rng = random.Random(seed)
+    first = seed * ports * endpoints
+    rows = [(first + i, port) for i, port in enumerate(
+        port for port in range(1, ports + 1) for _ in range(endpoints)
+    )]
+
+    discover = ["Port  MACAddress         Configured  IsUP", "-" * 41]
+    discover += [f" {port:<4} {mac(n).upper()}  {'yes':<10}  {'yes' if rng.random() < 0.9 else 'no'}" for n, port in rows]
+
+    port_status = ["Port  Status      Link", "----  ------      ----"]
+    port_status += [f"{port:<5} {'enabled':<11} {'up' if rng.random() < 0.8 else 'down'}" for port in range(1, ports + 1)]
+
+    config = [f"hostname {hostname}", "vlan 1,100-4000", "!"]
+    config += [
+        'ghn bw-profile 1 name "unthrottled"',
+        'ghn bw-profile 2 name "500M-50M" rate-downstream 500000 rate-upstream 50000 service-limit-level 4',
+        "!"
+    ]
+    for i, (n, port) in enumerate(rows, 1):
+        config.append(f'ghn endpoint {i} name "Positron_{mac(n)[-8:].replace(":", "").upper()}" mac-address {mac(n)} port {port}')
+    for i, (n, port) in enumerate(rows, 1):
+        config.append(f'ghn subscriber {i} name "sub-{n}" vid {100 + i % 3900} endpoint {i} bw-profile {1 + i % 2} poe disable')
+    config += ["!"]
+    for port in range(1, ports + 1):
+        config += [f"interface G.hn 1/{port}", " no shutdown", "!"]
+    config += ["end"]
+
+    return {
+        'show version': f"MAC Address      : 00:0e:d8:00:00:01\nSystem Name      : {hostname}\nSoftware Version : GAM v1.8.2",
+        'show ghn discover all': '\n'.join(discover),
+        'show ghn port': '\n'.join(port_status),
+        'show running-config': '\n'.join(config),
+    }
+
+
+class SimulatedGam:
+    """One virtual GAM: its transcripts, running-config changes and CLI timing"""
+
+    def __init__(
+        self,
+        hostname: str,
+        transcripts: Dict[str, str],
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        prompt_style: str = 'standard',
+        paging: bool = True
+    ):
+        self.hostname = hostname
+        self.transcripts = transcripts
+        self.latency = latency
+        self.jitter = jitter
+        self.prompt_format = PROMPT_STYLES[prompt_style]
+        self.paging = paging
+        self.config_lines: List[str] = []
+        self.commands = 0
+        self.lock = threading.Lock()
+
+    def prompt(self, mode: str) -> str:
+        return self.prompt_format.format(host=self.hostname, mode=mode)
+
+    def delay(self):
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def show(self, command: str) -> Optional[str]:
+        """Output of a show command; None when there is no transcript for it"""
+        if command == 'show running-config':
+            config = self.transcripts.get(command, 'end')
+            with self.lock:
+                added = list(self.config_lines)
+            if added:
+                lines = config.split('\n')
+                # New config goes before the closing 'end'
+                at = len(lines) - 1 if lines and lines[-1] == 'end' else len(lines)
+                config = '\n'.join(lines[:at] + added + lines[at:])
+            return config
+        return self.transcripts.get(command)
+
+    def configure(self, line: str):
+        with self.lock:
+            self.config_lines.append(line)
+
+
+class CliSession:
+    """The CLI of one interactive shell on a SimulatedGam"""
+
+    def __init__(self, gam: SimulatedGam, channel: paramiko.Channel):
+        self.gam = gam
+        self.channel = channel
+        self.mode = ''
+        self.paging = gam.paging
+
+    def serve(self):
+        self.channel.sendall(f"\r\n{self.gam.hostname} login banner\r\n\r\n{self.gam.prompt(self.mode)}")
+        pending = ''
+        while True:
+            data = self.channel.recv(4096)
+            if not data:
+                return
+            text = data.decode('utf-8', errors='ignore')
+            pending += text
+            # Echo what was typed, as a terminal would
+            self.channel.sendall(text.replace('\r', '').replace('\n', '\r\n'))
+
+            while '\n' in pending or '\r' in pending:
+                line, pending = self._split_line(pending)
+                output = self.run(' '.join(line.split()))
+                if output is None:
+                    self.channel.close()
+                    return
+                if output:
+                    self._send_output(output)
+                self.channel.sendall(self.gam.prompt(self.mode))
+
+    def run(self, command: str) -> Optional[str]:
+        """Run one command line; None closes the session"""
+        if not command:
+            return ''
+        self.gam.commands += 1
+        self.gam.delay()
+
+        if command.startswith('do ') and self.mode:
+            command = command[3:]
+        elif self.mode:
+            return self._run_config(command)
+
+        if command in ('exit', 'logout', 'quit'):
+            return None
+        if command == 'terminal length 0':
+            self.paging = False
+            return ''
+        if command.startswith('show '):
+            output = self.gam.show(command)
+            return output if output is not None else self._invalid()
+        if command == 'configure terminal':
+            self.mode = '(config)'
+            return ''
+        if command in ('write memory', 'copy running-config startup-config'):
+            return 'Building configuration...'
+        return self._invalid()
+
+    def _run_config(self, command: str) -> str:
+        if command == 'end':
+            self.mode = ''
+            return ''
+        if command == 'exit':
+            self.mode = '(config)' if self.mode == '(config-if)' else ''
+            return ''
+        if command.startswith('interface '):
+            self.mode = '(config-if)'
+            return ''
+        if self.mode == '(config-if)' and command.startswith(INTERFACE_KEYWORDS):
+            return ''
+        if self.mode == '(config)' and command.startswith(CONFIG_KEYWORDS):
+            self.gam.configure(command)
+            return ''
+        return self._invalid()
+
+    def _invalid(self) -> str:
+        return f"{' ' * len(self.gam.prompt(self.mode))}^\n{INVALID}"
+
+    def _send_output(self, output: str):
+        lines = output.split('\n')
+        while lines:
+            page, lines = (lines[:PAGE_LINES], lines[PAGE_LINES:]) if self.paging else (lines, [])
+            self.channel.sendall('\r\n'.join(page) + '\r\n')
+            if lines:
+                self.channel.sendall(MORE)
+                key = self.channel.recv(16)
+                self.channel.sendall('\r' + ' ' * len(MORE) + '\r')
+                if not key or key in (b'q', b'\x03'):
+                    return
+                if key == b'g':
+                    self.paging = False
+
+    @staticmethod
+    def _split_line(pending: str):
+        for index, char in enumerate(pending):
+            if char in '\r\n':
+                rest = pending[index + 1:]
+                if char == '\r' and rest.startswith('\n'):
+                    rest = rest[1:]
+                return pending[:index], rest
+        return pending, ''
+
+
+class _SshServer(paramiko.ServerInterface):
+    def __init__(self, username: str, password: str):
+        self.username = username
+        self.password = password
+        self.shell_requested = threading.Event()
+
+    def check_auth_password(self, username, password):
+        if username == self.username and password == self.password:
+            return paramiko.AUTH_SUCCESSFUL
+        return paramiko.AUTH_FAILED
+
+    def get_allowed_auths(self, username):
+        return 'password'
+
+    def check_channel_request(self, kind, chanid):
+        if kind == 'session':
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_pty_request(self, channel, term, width, height, pixelwidth, pixelheight, modes):
+        return True
+
+    def check_channel_shell_request(self, channel):
+        return True
+
+
+class CliSimulator:
+    """A fleet of SimulatedGams, device i listening on base_port + i"""
+
+    def __init__(
+        self,
+        gams: List[SimulatedGam],
+        host: str = '127.0.0.1',
+        base_port: int = 22000,
+        username: str = 'admin',
+        password: str = 'admin'
+    ):
+        self.gams = gams
+        self.host = host
+        self.base_port = base_port
+        self.username = username
+        self.password = password
+        self.host_key = paramiko.RSAKey.generate(2048)
+        self._sockets: List[socket.socket] = []
+        self._tasks: List[asyncio.Task] = []
+        self._transports: List[paramiko.Transport] = []
+
+    @classmethod
+    def fleet(
+        cls,
+        devices: int,
+        ports: int = 24,
+        endpoints: int = 1,
+        transcripts: Optional[Dict[str, str]] = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        prompt_style: str = 'standard',
+        **kwargs
+    ) -> "CliSimulator":
+        """Build devices alike apart from hostname; generated transcripts differ per device"""
+        gams = [
+            SimulatedGam(
+                f"GAM-{i + 1:04d}",
+                transcripts or synthetic_transcripts(f"GAM-{i + 1:04d}", ports, endpoints, seed=i),
+                latency=latency,
+                jitter=jitter,
+                prompt_style=prompt_style
+            )
+            for i in range(devices)
+        ]
+        return cls(gams, **kwargs)
+
+    def devices(self) -> List[Dict]:
+        """Connection fields of each virtual device, as SSHClient.for_device and CliFanout expect them"""
+        return [
+            {
+                'id': i + 1,
+                'name': gam.hostname,
+                'ip_address': self.host,
+                'ssh_port': self.base_port + i,
+                'ssh_username': self.username,
+                'ssh_password': self.password,
+                'ssh_credentials': None
+            }
+            for i, gam in enumerate(self.gams)
+        ]
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        for i, gam in enumerate(self.gams):
+            listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            listener.bind((self.host, self.base_port + i))
+            listener.listen(64)
+            listener.setblocking(False)
+            self._sockets.append(listener)
+            self._tasks.append(loop.create_task(self._accept(listener, gam)))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for listener in self._sockets:
+            listener.close()
+        for transport in self._transports:
+            transport.close()
+        self._tasks, self._sockets, self._transports = [], [], []
+
+    async def _accept(self, listener: socket.socket, gam: SimulatedGam):
+        loop = asyncio.get_running_loop()
+        while True:
+            connection, _ = await loop.sock_accept(listener)
+            connection.setblocking(True)
+            # Echo, output and prompt go out as separate writes, like on a real device
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self._serve, args=(connection, gam), daemon=True).start()
+
+    def _serve(self, connection: socket.socket, gam: SimulatedGam):
+        transport = paramiko.Transport(connection)
+        transport.set_log_channel('gam_cli_simulator.transport')
+        transport.add_server_key(self.host_key)
+        self._transports.append(transport)
+        try:
+            transport.start_server(server=_SshServer(self.username, self.password))
+        except (paramiko.SSHException, EOFError):
+            return
+        while transport.is_active():
+            channel = transport.accept(timeout=1)
+            if channel is not None:
+                threading.Thread(target=self._serve_channel, args=(channel, gam), daemon=True).start()
+
+    @staticmethod
+    def _serve_channel(channel: paramiko.Channel, gam: SimulatedGam):
+        try:
+            CliSession(gam, channel).serve()
+        except (OSError, EOFError, paramiko.SSHException):
+            pass
+        finally:
+            channel.close()
+
+
+async def _main(args):
+    transcripts = load_transcripts(Path(args.transcripts)) if args.transcripts else None
+    simulator = CliSimulator.fleet(
+        args.devices,
+        ports=args.ports,
+        endpoints=args.endpoints,
+        transcripts=transcripts,
+        latency=args.latency,
+        jitter=args.jitter,
+        prompt_style=args.prompt_style,
+        host=args.host,
+        base_port=args.base_port,
+        username=args.username,
+        password=args.password
+    )
+    await simulator.start()
+    last = args.base_port + args.devices - 1
+    print(f"{args.devices} simulated GAMs on {args.host}:{args.base_port}-{last} ({args.username}/{args.password})")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await simulator.stop()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Simulated GAM CLI fleet over SSH")
+    parser.add_argument('--devices', type=int, default=1)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--base-port', type=int, default=22000)
+    parser.add_argument('--username', default='admin')
+    parser.add_argument('--password', default='admin')
+    parser.add_argument('--transcripts', help='Directory of recorded show output, one <command>.txt per command')
+    parser.add_argument('--ports', type=int, default=24, help='G.hn ports per generated device')
+    parser.add_argument('--endpoints', type=int, default=1, help='Endpoints per port on generated devices')
+    parser.add_argument('--latency', type=float, default=0.0, help='Added to every command (seconds)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Random +/- variation of the latency (seconds)')
+    parser.add_argument('--prompt-style', choices=sorted(PROMPT_STYLES), default='standard')
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(_main(parse_args()))
+    except KeyboardInterrupt:
+        sys.exit(0)
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Stand-in GAM JSON-RPC server for development without a device.
+
+Implements the ghnAgent configuration methods used by GamJsonRpcClient
+(bandwidth profiles, subscribers, endpoints, ports, global config, status
+and config save), plus interface shutdown and link status, on in-memory
+state, with HTTP basic auth and keep-alive
+connections like the GAM web server.
+
+Usage:
+    python scripts/gam_jsonrpc_standin.py --port 8080 --ports 24 --endpoints 16
+"""
+import argparse
+import base64
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class RpcError(Exception):
+    def __init__(self, code: int, message: str, vtss_error_code: Optional[int] = None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.vtss_error_code = vtss_error_code
+
+    def to_json(self) -> Dict[str, Any]:
+        error = {'code': self.code, 'message': self.message}
+        if self.vtss_error_code is not None:
+            error['data'] = {'vtss-error-code': self.vtss_error_code, 'vtss-module-code': -22}
+        return error
+
+
+class StandInGam:
+    """In-memory state of one GAM, keyed the way the JSON-RPC API keys it"""
+
+    def __init__(self, ports: int = 24, endpoints: int = 0):
+        self.lock = threading.Lock()
+        self.global_config: Dict[str, Any] = {'SubscriberModel': 'portAware', 'DefaultNNIIfIndex': '10G 1/1'}
+        self.tables: Dict[str, Dict[str, Dict[str, Any]]] = {
+            'bwProfileByName': {'Default BW Profile': {'Description': '', 'DsBw': 0, 'UsBw': 0}},
+            'userByName': {},
+            'endpointByName': {},
+        }
+        self.ports: Dict[str, Dict[str, Any]] = {
+            f"G.hn 1/{n}": {'IfIndex': f"G.hn 1/{n}", 'Name': '', 'PortMode': 'mimo', 'AllowedVlans': ''}
+            for n in range(1, ports + 1)
+        }
+        self.interfaces: Dict[str, Dict[str, Any]] = {
+            ifindex: {'Shutdown': False, 'Description': ''} for ifindex in self.ports
+        }
+        # Endpoints seen on the wire: MAC -> detected port
+        self.detected: Dict[str, str] = {
+            f"00:0e:d8:{(n >> 16) & 0xff:02x}:{(n >> 8) & 0xff:02x}:{n & 0xff:02x}": f"G.hn 1/{(n % ports) + 1}"
+            for n in range(endpoints)
+        }
+        self.saves = 0
+
+    def call(self, method: str, params: List[Any]) -> Any:
+        with self.lock:
+            return self._call(method, params)
+
+    def _call(self, method: str, params: List[Any]) -> Any:
+        parts = method.split('.')
+
+        if method == 'ghnAgent.config.global.get':
+            return dict(self.global_config)
+        if method == 'ghnAgent.config.global.set':
+            self.global_config.update(self._param(params, 0, dict))
+            return None
+
+        if len(parts) == 4 and parts[:2] == ['ghnAgent', 'config'] and parts[2] in self.tables:
+            return self._table_call(self.tables[parts[2]], parts[3], params)
+
+        if method == 'ghnAgent.config.port.get':
+            if params:
+                return dict(self._lookup(self.ports, self._param(params, 0, str)))
+            return [{'key': key, 'val': dict(val)} for key, val in self.ports.items()]
+        if method == 'ghnAgent.config.port.set':
+            config = self._param(params, 1, dict)
+            if config.get('PortMode', 'mimo') not in ('mimo', 'siso'):
+                raise RpcError(-32602, 'Invalid params')
+            self._lookup(self.ports, self._param(params, 0, str)).update(config)
+            return None
+
+        if method == 'port.config.get':
+            return dict(self._lookup(self.interfaces, self._param(params, 0, str)))
+        if method == 'port.config.set':
+            self._lookup(self.interfaces, self._param(params, 0, str)).update(self._param(params, 1, dict))
+            return None
+        if method == 'port.status.get':
+            ifindex = self._param(params, 0, str)
+            shutdown = self._lookup(self.interfaces, ifindex)['Shutdown']
+            return {'Link': not shutdown and ifindex in self.detected.values()}
+
+        if method == 'ghnAgent.status.endpointByMac.brief.get':
+            return [{'key': mac, 'val': status} for mac, status in self._endpoint_status().items()]
+
+        if method == 'icfg.control.copy.set':
+            self.saves += 1
+            return None
+
+        raise RpcError(-32601, 'Method not found')
+
+    def _table_call(self, table: Dict[str, Dict[str, Any]], action: str, params: List[Any]) -> Any:
+        if action == 'get':
+            if params:
+                return dict(self._lookup(table, self._param(params, 0, str)))
+            return [{'key': key, 'val': dict(val)} for key, val in table.items()]
+
+        name = self._param(params, 0, str)
+        if action == 'add':
+            if name in table:
+                raise RpcError(-32603, 'Entry already exists', -9437163)
+            table[name] = dict(self._param(params, 1, dict))
+            return None
+        if action == 'set':
+            self._lookup(table, name).update(self._param(params, 1, dict))
+            return None
+        if action == 'del':
+            self._lookup(table, name)
+            del table[name]
+            return None
+        raise RpcError(-32601, 'Method not found')
+
+    def _endpoint_status(self) -> Dict[str, Dict[str, Any]]:
+        status: Dict[str, Dict[str, Any]] = {
+            mac: {'ConfEndpointId': 0, 'ConfEndpointName': '', 'ConfPortIfIndex': 0, 'DetectedPortIfIndex': port}
+            for mac, port in self.detected.items()
+        }
+        for index, (name, endpoint) in enumerate(self.tables['endpointByName'].items(), 1):
+            mac = endpoint.get('MacAddress', '').lower()
+            entry = status.setdefault(mac, {'DetectedPortIfIndex': 0})
+            entry.update({
+                'ConfEndpointId': index,
+                'ConfEndpointName': name,
+                'ConfPortIfIndex': endpoint.get('PortIfIndex', 0)
+            })
+        return status
+
+    @staticmethod
+    def _param(params: List[Any], index: int, kind: type) -> Any:
+        if len(params) <= index or not isinstance(params[index], kind):
+            raise RpcError(-32602, 'Invalid params')
+        return params[index]
+
+    @staticmethod
+    def _lookup(table: Dict[str, Dict[str, Any]], key: str) -> Dict[str, Any]:
+        if key not in table:
+            raise RpcError(-32603, 'Entry not found', -9437162)
+        return table[key]
+
+
+def make_handler(gam: StandInGam, credentials: Tuple[str, str], latency: float):
+    expected_auth = 'Basic ' + base64.b64encode(':'.join(credentials).encode()).decode()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # Keep connections alive between calls
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            if self.path != '/json_rpc':
+                return self._reply(404, {})
+            if self.headers.get('Authorization') != expected_auth:
+                return self._reply(401, {})
+
+            try:
+                request = json.loads(body)
+                method, params, request_id = request['method'], request.get('params', []), request.get('id')
+            except (ValueError, KeyError, TypeError):
+                return self._reply(200, {'id': None, 'result': None, 'error': {'code': -32700, 'message': 'Parse error'}})
+
+            if latency:
+                time.sleep(latency)
+            try:
+                response = {'id': request_id, 'result': gam.call(method, params), 'error': None}
+            except RpcError as e:
+                response = {'id': request_id, 'result': None, 'error': e.to_json()}
+            self._reply(200, response)
+
+        def _reply(self, status: int, payload: Dict[str, Any]):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            if status == 401:
+                self.send_header('WWW-Authenticate', 'Basic realm="GAM"')
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(
+    host: str = '127.0.0.1',
+    port: int = 8080,
+    gam: Optional[StandInGam] = None,
+    username: str = 'admin',
+    password: str = 'admin',
+    latency: float = 0.0
+) -> ThreadingHTTPServer:
+    """Start a stand-in server on a background thread; call shutdown() to stop it"""
+    server = ThreadingHTTPServer((host, port), make_handler(gam or StandInGam(), (username, password), latency))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stand-in GAM JSON-RPC server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--username', default='admin')
+    parser.add_argument('--password', default='admin')
+    parser.add_argument('--ports', type=int, default=24, help='G.hn ports on the stand-in GAM')
+    parser.add_argument('--endpoints', type=int, default=0, help='Detected but unconfigured endpoints')
+    parser.add_argument('--latency', type=float, default=0.0, help='Delay added to every call (seconds)')
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port, StandInGam(args.ports, args.endpoints), args.username, args.password, args.latency)
+    print(f"Stand-in GAM JSON-RPC server on http://{args.host}:{args.port}/json_rpc")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
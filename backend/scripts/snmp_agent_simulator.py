@@ -0,0 +1,772 @@
+#!/usr/bin/env python3
+"""
+SNMP agent simulator for measuring SNMPClient and the fleet poller without
+real GAMs.
+
+Runs a fleet of virtual SNMP agents on one host, each on its own UDP port
+(or its own loopback address). Every agent answers GET, GETNEXT and GETBULK
+(SNMPv1 and v2c) from a MIB that is either replayed from snmpwalk captures
+(see scripts/walks) or generated to a given port and endpoint count, and
+keeps it moving while it runs:
+
+- sysUpTime advances, and the octet counters of interfaces that are up grow
+  at a per-interface rate (32-bit counters wrap)
+- G.hn ports flap: now and then one goes down for a while, which shows in
+  ifOperStatus, ifLastChange and the Positron port table, and stops its
+  counters
+
+Requests can be dropped (loss) and answers delayed (latency and jitter) to
+model a lossy or distant network. SNMPv3 and SET are not simulated; SETs are
+refused as not writable.
+
+With --addressing loopback, device i listens on the i-th address after
+--host (127.0.0.1, 127.0.0.2, ...) at --base-port, which needs the whole of
+127.0.0.0/8 routed to the loopback interface as on Linux, and root for port 161.
+
+Usage:
+    python scripts/snmp_agent_simulator.py --devices 200 --base-port 16100 --loss 0.01 --latency 0.02
+    python scripts/snmp_agent_simulator.py --walks scripts/walks/gam-4-c --flap-interval 30
+"""
+import argparse
+import asyncio
+import bisect
+import ipaddress
+import multiprocessing
+import random
+import re
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pyasn1.codec.ber import encoder, decoder
+from pyasn1.error import PyAsn1Error
+from pysnmp.proto import api, rfc1905
+from pysnmp.proto.api import v2c
+
+Oid = Tuple[int, ...]
+
+SNMP_V1 = api.protoVersion1
+
+# Largest response sent; SNMP over UDP/IPv4 cannot exceed this anyway
+MAX_RESPONSE_SIZE = 65507
+
+ERROR_TOO_BIG = 1
+ERROR_NO_SUCH_NAME = 2
+ERROR_NOT_WRITABLE = 17
+
+GHN_IF_INDEX_BASE = 1000000
+
+SYS_UPTIME = (1, 3, 6, 1, 2, 1, 1, 3, 0)
+SYS_NAME = (1, 3, 6, 1, 2, 1, 1, 5, 0)
+IF_ENTRY = (1, 3, 6, 1, 2, 1, 2, 2, 1)
+IFX_ENTRY = (1, 3, 6, 1, 2, 1, 31, 1, 1, 1)
+POSITRON_PORT_ENTRY = (1, 3, 6, 1, 4, 1, 20095, 2001, 11, 1, 2, 1, 1)
+
+# Columns kept live: ifOperStatus, ifLastChange, octet counters, link status
+IF_OPER_STATUS = IF_ENTRY + (8,)
+IF_LAST_CHANGE = IF_ENTRY + (9,)
+IF_IN_OCTETS = IF_ENTRY + (10,)
+IF_OUT_OCTETS = IF_ENTRY + (16,)
+IF_HC_IN_OCTETS = IFX_ENTRY + (6,)
+IF_HC_OUT_OCTETS = IFX_ENTRY + (10,)
+POSITRON_LINK = POSITRON_PORT_ENTRY + (5,)
+
+# snmpwalk -On output: ".1.3.6.1.2.1.1.5.0 = STRING: "GAM-4-C""
+WALK_LINE = re.compile(r'^\.?((?:\d+\.)*\d+) = (?:([\w -]+): )?(.*)$')
+
+
+def parse_oid(text: str) -> Oid:
+    return tuple(int(part) for part in text.strip().lstrip('.').split('.'))
+
+
+def _walk_value(kind: Optional[str], text: str) -> Any:
+    """A pysnmp value from the type and value text of one snmpwalk line"""
+    text = text.strip()
+    if kind is None:
+        # '""' is how snmpwalk prints an empty string
+        return v2c.OctetString(text.strip('"'))
+    if kind == 'STRING':
+        if len(text) > 1 and text[0] == text[-1] == '"':
+            text = text[1:-1].replace('\\"', '"')
+        return v2c.OctetString(text)
+    if kind in ('Hex-STRING', 'BITS'):
+        return v2c.OctetString(bytes.fromhex(re.sub(r'[^0-9A-Fa-f]', '', text.split('  ')[0])))
+    if kind == 'OID':
+        return v2c.ObjectIdentifier(parse_oid(text))
+    if kind == 'IpAddress':
+        return v2c.IpAddress(text)
+    if kind == 'Timeticks':
+        return v2c.TimeTicks(int(re.match(r'\((\d+)\)', text).group(1)))
+
+    # Numbers, possibly printed with their enumeration label: "up(1)"
+    number = re.search(r'\((-?\d+)\)$', text)
+    value = int(number.group(1) if number else text.split()[0])
+    return {
+        'INTEGER': v2c.Integer,
+        'Counter32': v2c.Counter32,
+        'Counter64': v2c.Counter64,
+        'Gauge32': v2c.Gauge32,
+        'Unsigned32': v2c.Unsigned32,
+    }[kind](value)
+
+
+def load_walk(path: Path) -> Dict[Oid, Any]:
+    """
+    A MIB from snmpwalk -On output.
+
+    path is one capture file or a directory of them (one per subtree, e.g.
+    system.walk, if-mib.walk, bridge-mib.walk, positron.walk), which are
+    merged. Values continued on the following lines (long strings and
+    Hex-STRINGs) are joined back up.
+    """
+    files = sorted(path.glob('*.walk')) if path.is_dir() else [path]
+    mib: Dict[Oid, Any] = {}
+    for file in files:
+        entries: List[List[str]] = []
+        for line in file.read_text().splitlines():
+            match = WALK_LINE.match(line)
+            if match:
+                entries.append(list(match.groups()))
+            elif entries and line.strip():
+                entries[-1][2] += ('\n' if entries[-1][1] == 'STRING' else ' ') + line.strip()
+
+        for oid, kind, text in entries:
+            if text.startswith('No Such') or text.startswith('No more variables'):
+                continue
+            mib[parse_oid(oid)] = _walk_value(kind, text)
+    return mib
+
+
+def mac(n: int) -> bytes:
+    return bytes([0x00, 0x0e, 0xd8, (n >> 16) & 0xff, (n >> 8) & 0xff, n & 0xff])
+
+
+def synthetic_walk(hostname: str, ports: int = 24, endpoints: int = 1, seed: int = 0) -> Dict[Oid, Any]:
+    """
+    The MIB of a GAM with endpoints (per port) G.hn endpoints on each of its ports.
+
+    Covers what SNMPClient reads: the system group, ifTable and ifXTable for
+    the uplink and G.hn ports, the Positron port table, and BRIDGE-MIB and
+    Q-BRIDGE forwarding tables with each endpoint and one CPE behind it.
+    """
+    rng = random.Random(seed)
+    mib: Dict[Oid, Any] = {
+        (1, 3, 6, 1, 2, 1, 1, 1, 0): v2c.OctetString(f"Positron GAM-{ports}-C G.hn Access Multiplexer, GAM v1.8.2"),
+        (1, 3, 6, 1, 2, 1, 1, 2, 0): v2c.ObjectIdentifier((1, 3, 6, 1, 4, 1, 20095, 1, 4)),
+        SYS_UPTIME: v2c.TimeTicks(rng.randrange(100, 100 * 86400 * 60)),
+        SYS_NAME: v2c.OctetString(hostname),
+        (1, 3, 6, 1, 2, 1, 2, 1, 0): v2c.Integer(ports + 1),
+        (1, 3, 6, 1, 2, 1, 47, 1, 1, 1, 1, 11, 1): v2c.OctetString(f"PG21{seed:08d}"),
+    }
+
+    interfaces = [(1, 'GigabitEthernet 1/1', 'Gi 1/1', 1000)]
+    interfaces += [(GHN_IF_INDEX_BASE + n, f"G.hn 1/{n}", f"G.hn 1/{n}", 1000) for n in range(1, ports + 1)]
+    for if_index, descr, name, speed in interfaces:
+        up = if_index == 1 or rng.random() < 0.9
+        in_octets, out_octets = rng.randrange(10 ** 12), rng.randrange(10 ** 13)
+        mib.update({
+            IF_ENTRY + (1, if_index): v2c.Integer(if_index),
+            IF_ENTRY + (2, if_index): v2c.OctetString(descr),
+            IF_ENTRY + (3, if_index): v2c.Integer(6),
+            IF_ENTRY + (6, if_index): v2c.OctetString(mac(seed * 1000 + if_index % 1000)),
+            IF_ENTRY + (7, if_index): v2c.Integer(1),
+            IF_OPER_STATUS + (if_index,): v2c.Integer(1 if up else 2),
+            IF_LAST_CHANGE + (if_index,): v2c.TimeTicks(0),
+            IF_IN_OCTETS + (if_index,): v2c.Counter32(in_octets % 2 ** 32),
+            IF_OUT_OCTETS + (if_index,): v2c.Counter32(out_octets % 2 ** 32),
+            IFX_ENTRY + (1, if_index): v2c.OctetString(name),
+            IF_HC_IN_OCTETS + (if_index,): v2c.Counter64(in_octets),
+            IF_HC_OUT_OCTETS + (if_index,): v2c.Counter64(out_octets),
+            IFX_ENTRY + (15, if_index): v2c.Gauge32(speed),
+        })
+        if if_index > GHN_IF_INDEX_BASE:
+            mib.update({
+                POSITRON_PORT_ENTRY + (3, if_index): v2c.Integer(8 if up else 6),
+                POSITRON_LINK + (if_index,): v2c.Integer(1 if up else 0),
+                POSITRON_PORT_ENTRY + (7, if_index): v2c.Integer(2048 if up else 0),
+                POSITRON_PORT_ENTRY + (11, if_index): v2c.Integer(endpoints if up else 0),
+            })
+
+    # Bridge port n is interface n in the list above
+    for bridge_port, (if_index, *_) in enumerate(interfaces, 1):
+        mib[(1, 3, 6, 1, 2, 1, 17, 1, 4, 1, 2, bridge_port)] = v2c.Integer(if_index)
+
+    vlan = 100
+    first = seed * ports * endpoints
+    for i in range(ports * endpoints):
+        bridge_port = 2 + i // endpoints
+        for address in (mac(first + i), bytes([0xa4, 0x2b, 0xb0]) + (first + i).to_bytes(3, 'big')):
+            mib[(1, 3, 6, 1, 2, 1, 17, 4, 3, 1, 2) + tuple(address)] = v2c.Integer(bridge_port)
+            mib[(1, 3, 6, 1, 2, 1, 17, 7, 1, 2, 2, 1, 2, vlan) + tuple(address)] = v2c.Integer(bridge_port)
+    mib[(1, 3, 6, 1, 2, 1, 17, 7, 1, 4, 2, 1, 3, 0, vlan)] = v2c.Gauge32(vlan)
+    return mib
+
+
+class _Interface:
+    """Live state of one interface: link, last change and octet counts"""
+
+    def __init__(self, if_index: int, up: bool, in_octets: int, out_octets: int, rate: float, last_change: int):
+        self.if_index = if_index
+        self.up = up
+        self.in_octets = float(in_octets)
+        self.out_octets = float(out_octets)
+        # Bytes/s while up; out of the GAM port (towards the subscriber) is the bigger direction
+        self.out_rate = rate
+        self.in_rate = rate / 4
+        self.last_change = last_change
+        self.down_until: Optional[float] = None
+
+
+class SimulatedAgent:
+    """
+    One virtual SNMP agent: its MIB, the live values layered over it, and
+    the loss and delay applied to its traffic.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        mib: Dict[Oid, Any],
+        community: str = 'public',
+        loss: float = 0.0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        traffic: float = 1_000_000,
+        flap_interval: float = 0.0,
+        flap_duration: float = 5.0,
+        max_response_size: int = MAX_RESPONSE_SIZE,
+        seed: int = 0
+    ):
+        self.name = name
+        self.community = community
+        self.loss = loss
+        self.latency = latency
+        self.jitter = jitter
+        self.traffic = traffic
+        self.flap_interval = flap_interval
+        self.flap_duration = flap_duration
+        self.max_response_size = max_response_size
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.dropped = 0
+
+        self.values = dict(mib)
+        self.values[SYS_NAME] = v2c.OctetString(name)
+        self.oids: List[Oid] = sorted(self.values)
+        self._encoded: Dict[Oid, bytes] = {}
+
+        self.started = time.monotonic()
+        self.clock = self.started
+        self.base_uptime = int(self.values.get(SYS_UPTIME, 0))
+        self.next_flap = self._schedule_flap(self.started)
+
+        # Values computed on each read, by OID
+        self.live: Dict[Oid, Callable[[], Any]] = {SYS_UPTIME: lambda: v2c.TimeTicks(self.uptime())}
+        self.interfaces: Dict[int, _Interface] = {}
+        for oid in self.oids[bisect.bisect_left(self.oids, IF_OPER_STATUS):]:
+            if oid[:len(IF_OPER_STATUS)] != IF_OPER_STATUS:
+                break
+            self._add_interface(oid[-1])
+
+    def _add_interface(self, if_index: int):
+        def stored(column: Oid) -> int:
+            value = self.values.get(column + (if_index,))
+            return int(value) if value is not None else 0
+
+        up = stored(IF_OPER_STATUS) == 1
+        interface = _Interface(
+            if_index,
+            up,
+            stored(IF_HC_IN_OCTETS) or stored(IF_IN_OCTETS),
+            stored(IF_HC_OUT_OCTETS) or stored(IF_OUT_OCTETS),
+            rate=self.rng.uniform(0.2, 1.8) * self.traffic,
+            last_change=stored(IF_LAST_CHANGE)
+        )
+        self.interfaces[if_index] = interface
+
+        live = {
+            IF_OPER_STATUS: lambda: v2c.Integer(1 if interface.up else 2),
+            IF_LAST_CHANGE: lambda: v2c.TimeTicks(interface.last_change),
+            IF_IN_OCTETS: lambda: v2c.Counter32(int(interface.in_octets) % 2 ** 32),
+            IF_OUT_OCTETS: lambda: v2c.Counter32(int(interface.out_octets) % 2 ** 32),
+            IF_HC_IN_OCTETS: lambda: v2c.Counter64(int(interface.in_octets) % 2 ** 64),
+            IF_HC_OUT_OCTETS: lambda: v2c.Counter64(int(interface.out_octets) % 2 ** 64),
+            POSITRON_LINK: lambda: v2c.Integer(1 if interface.up else 0),
+        }
+        for column, value in live.items():
+            # Only what the capture has; the simulator adds no objects
+            if column + (if_index,) in self.values:
+                self.live[column + (if_index,)] = value
+
+    def uptime(self) -> int:
+        """sysUpTime in hundredths of a second"""
+        return self.base_uptime + int((self.clock - self.started) * 100)
+
+    # -- Time passing
+
+    def _schedule_flap(self, now: float) -> Optional[float]:
+        if not self.flap_interval:
+            return None
+        return now + self.rng.expovariate(1 / self.flap_interval)
+
+    def advance(self, now: Optional[float] = None):
+        """Bring counters and link state up to now, flap by flap"""
+        now = time.monotonic() if now is None else now
+        while True:
+            recoveries = [i for i in self.interfaces.values() if i.down_until is not None]
+            event = min([i.down_until for i in recoveries] + ([self.next_flap] if self.next_flap is not None else []), default=None)
+            if event is None or event > now:
+                break
+            self._accumulate(event)
+
+            for interface in recoveries:
+                if interface.down_until <= event:
+                    interface.up, interface.down_until = True, None
+                    interface.last_change = self.uptime()
+            if self.next_flap is not None and self.next_flap <= event:
+                self._flap(event)
+                self.next_flap = self._schedule_flap(event)
+        self._accumulate(now)
+
+    def _accumulate(self, until: float):
+        elapsed = until - self.clock
+        if elapsed > 0:
+            for interface in self.interfaces.values():
+                if interface.up:
+                    interface.in_octets += interface.in_rate * elapsed
+                    interface.out_octets += interface.out_rate * elapsed
+            self.clock = until
+
+    def _flap(self, now: float):
+        """Take a random G.hn port that is up down for flap_duration"""
+        candidates = [
+            interface for interface in self.interfaces.values()
+            if interface.up and interface.if_index > GHN_IF_INDEX_BASE
+        ]
+        if candidates:
+            interface = self.rng.choice(candidates)
+            interface.up = False
+            interface.down_until = now + self.flap_duration
+            interface.last_change = self.uptime()
+
+    # -- MIB access
+
+    def value(self, oid: Oid) -> Optional[Any]:
+        live = self.live.get(oid)
+        return live() if live is not None else self.values.get(oid)
+
+    def next_oid(self, oid: Oid, v1: bool = False) -> Optional[Oid]:
+        """The first OID after oid; SNMPv1 managers cannot see Counter64 objects"""
+        position = bisect.bisect_right(self.oids, oid)
+        while position < len(self.oids):
+            candidate = self.oids[position]
+            if not (v1 and isinstance(self.values[candidate], v2c.Counter64)):
+                return candidate
+            position += 1
+        return None
+
+    # -- Protocol
+
+    def delay(self) -> float:
+        return max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+
+    def drop(self) -> bool:
+        self.requests += 1
+        if self.loss and self.rng.random() < self.loss:
+            self.dropped += 1
+            return True
+        return False
+
+    def respond(self, data: bytes) -> Optional[bytes]:
+        """The encoded response to one request, or None if it gets no answer"""
+        try:
+            version = int(api.decodeMessageVersion(data))
+            p_mod = api.protoModules[version]
+            request, _ = decoder.decode(data, asn1Spec=p_mod.Message())
+        except (PyAsn1Error, KeyError, ValueError):
+            # Garbage and SNMPv3: silently ignored, like an agent not configured for it
+            return None
+        if str(p_mod.apiMessage.getCommunity(request)) != self.community:
+            return None
+
+        self.advance()
+        v1 = version == SNMP_V1
+        pdu = p_mod.apiMessage.getPDU(request)
+        var_binds = [(tuple(oid), value) for oid, value in p_mod.apiPDU.getVarBinds(pdu)]
+        error_status, error_index = 0, 0
+
+        if pdu.tagSet == p_mod.GetRequestPDU.tagSet:
+            results = []
+            for position, (oid, _) in enumerate(var_binds, 1):
+                value = self.value(oid)
+                if value is None or (v1 and isinstance(value, v2c.Counter64)):
+                    if v1:
+                        error_status, error_index = ERROR_NO_SUCH_NAME, position
+                        break
+                    value = rfc1905.noSuchInstance
+                results.append((oid, value))
+        elif pdu.tagSet == p_mod.GetNextRequestPDU.tagSet:
+            results = []
+            for position, (oid, _) in enumerate(var_binds, 1):
+                following = self.next_oid(oid, v1)
+                if following is None:
+                    if v1:
+                        error_status, error_index = ERROR_NO_SUCH_NAME, position
+                        break
+                    results.append((oid, rfc1905.endOfMibView))
+                else:
+                    results.append((following, self.value(following)))
+        elif not v1 and pdu.tagSet == p_mod.GetBulkRequestPDU.tagSet:
+            results = self._bulk(
+                var_binds,
+                int(p_mod.apiBulkPDU.getNonRepeaters(pdu)),
+                int(p_mod.apiBulkPDU.getMaxRepetitions(pdu))
+            )
+        elif pdu.tagSet == p_mod.SetRequestPDU.tagSet:
+            error_status, error_index = (ERROR_NO_SUCH_NAME if v1 else ERROR_NOT_WRITABLE), 1
+        else:
+            return None
+
+        if error_status:
+            # Error responses carry the request's varbinds back
+            results = var_binds
+        community = bytes(p_mod.apiMessage.getCommunity(request))
+        request_id = int(p_mod.apiPDU.getRequestID(pdu))
+        encoded = [self._var_bind(oid, value) for oid, value in results]
+        response = _message(version, community, request_id, encoded, error_status, error_index)
+
+        if len(response) > self.max_response_size:
+            if not v1 and pdu.tagSet == p_mod.GetBulkRequestPDU.tagSet:
+                # GETBULK answers are cut short rather than refused
+                while len(response) > self.max_response_size and len(encoded) > 1:
+                    encoded = encoded[:len(encoded) // 2]
+                    response = _message(version, community, request_id, encoded, 0, 0)
+            else:
+                encoded = [self._var_bind(oid, value) for oid, value in var_binds] if v1 else []
+                response = _message(version, community, request_id, encoded, ERROR_TOO_BIG, 0)
+        return response
+
+    def _bulk(self, var_binds: List[Tuple[Oid, Any]], non_repeaters: int, max_repetitions: int) -> List[Tuple[Oid, Any]]:
+        """GETBULK: one GETNEXT per non-repeater, then max_repetitions rows of the rest"""
+        results = []
+        for oid, _ in var_binds[:non_repeaters]:
+            following = self.next_oid(oid)
+            results.append((oid, rfc1905.endOfMibView) if following is None else (following, self.value(following)))
+
+        cursors = [oid for oid, _ in var_binds[non_repeaters:]]
+        for _ in range(max_repetitions if cursors else 0):
+            ended = 0
+            for column, oid in enumerate(cursors):
+                following = self.next_oid(oid)
+                if following is None:
+                    results.append((oid, rfc1905.endOfMibView))
+                    ended += 1
+                else:
+                    results.append((following, self.value(following)))
+                    cursors[column] = following
+            if ended == len(cursors):
+                break
+        return results
+
+    def _var_bind(self, oid: Oid, value: Any) -> bytes:
+        """
+        One encoded varbind. Stored values are encoded once and kept, which
+        saves most of the cost of answering a walk.
+        """
+        cacheable = oid not in self.live and value is self.values.get(oid)
+        if cacheable and oid in self._encoded:
+            return self._encoded[oid]
+        encoded = _ber(0x30, encoder.encode(v2c.ObjectIdentifier(oid)) + encoder.encode(value))
+        if cacheable:
+            self._encoded[oid] = encoded
+        return encoded
+
+
+def _ber(tag: int, body: bytes) -> bytes:
+    """One BER TLV with a definite length"""
+    length = len(body)
+    if length < 0x80:
+        return bytes((tag, length)) + body
+    octets = length.to_bytes((length.bit_length() + 7) // 8, 'big')
+    return bytes((tag, 0x80 | len(octets))) + octets + body
+
+
+def _ber_integer(value: int) -> bytes:
+    return _ber(0x02, value.to_bytes(value.bit_length() // 8 + 1, 'big', signed=True))
+
+
+def _message(version: int, community: bytes, request_id: int, var_binds: List[bytes],
+             error_status: int, error_index: int) -> bytes:
+    """
+    A Response message around already encoded varbinds, assembled directly
+    rather than through pysnmp's message objects
+    """
+    pdu = _ber(
+        0xa2,
+        _ber_integer(request_id) + _ber_integer(error_status) + _ber_integer(error_index)
+        + _ber(0x30, b''.join(var_binds))
+    )
+    return _ber(0x30, _ber_integer(version) + _ber(0x04, community) + pdu)
+
+
+class _AgentProtocol(asyncio.DatagramProtocol):
+    def __init__(self, agent: SimulatedAgent):
+        self.agent = agent
+        self.transport: Optional[asyncio.DatagramTransport] = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr):
+        if self.agent.drop():
+            return
+        response = self.agent.respond(data)
+        if response is None:
+            return
+        delay = self.agent.delay()
+        if delay:
+            asyncio.get_running_loop().call_later(delay, self._send, response, addr)
+        else:
+            self._send(response, addr)
+
+    def _send(self, response: bytes, addr):
+        if not self.transport.is_closing():
+            self.transport.sendto(response, addr)
+
+
+class SnmpSimulator:
+    """
+    A fleet of SimulatedAgents on one event loop.
+
+    With addressing 'port' agent i listens on host:base_port + i, with
+    'loopback' on the i-th address from host at base_port.
+    """
+
+    def __init__(
+        self,
+        agents: List[SimulatedAgent],
+        host: str = '127.0.0.1',
+        base_port: int = 16100,
+        addressing: str = 'port'
+    ):
+        if addressing not in ('port', 'loopback'):
+            raise ValueError(f"Unknown addressing: {addressing}")
+        self.agents = agents
+        self.host = host
+        self.base_port = base_port
+        self.addressing = addressing
+        self._transports: List[asyncio.DatagramTransport] = []
+        self._workers: List[Tuple[multiprocessing.Process, Any]] = []
+
+    @classmethod
+    def fleet(
+        cls,
+        devices: int,
+        ports: int = 24,
+        endpoints: int = 1,
+        mib: Optional[Dict[Oid, Any]] = None,
+        community: str = 'public',
+        loss: float = 0.0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        traffic: float = 1_000_000,
+        flap_interval: float = 0.0,
+        flap_duration: float = 5.0,
+        max_response_size: int = MAX_RESPONSE_SIZE,
+        **kwargs
+    ) -> "SnmpSimulator":
+        """Build agents alike apart from sysName; generated MIBs differ per device"""
+        agents = [
+            SimulatedAgent(
+                f"GAM-{i + 1:04d}",
+                mib or synthetic_walk(f"GAM-{i + 1:04d}", ports, endpoints, seed=i),
+                community=community,
+                loss=loss,
+                latency=latency,
+                jitter=jitter,
+                traffic=traffic,
+                flap_interval=flap_interval,
+                flap_duration=flap_duration,
+                max_response_size=max_response_size,
+                seed=i
+            )
+            for i in range(devices)
+        ]
+        return cls(agents, **kwargs)
+
+    def address(self, index: int) -> Tuple[str, int]:
+        if self.addressing == 'loopback':
+            return str(ipaddress.ip_address(self.host) + index), self.base_port
+        return self.host, self.base_port + index
+
+    def devices(self) -> List[Dict[str, Any]]:
+        """
+        Polling fields of each virtual device, as SNMPClient.for_device and
+        FleetPoller.poll_device expect them, with one subscriber on each G.hn port
+        """
+        devices = []
+        for i, agent in enumerate(self.agents):
+            host, port = self.address(i)
+            ghn_ports = [
+                if_index - GHN_IF_INDEX_BASE for if_index in agent.interfaces if if_index > GHN_IF_INDEX_BASE
+            ]
+            devices.append({
+                'id': i + 1,
+                'name': agent.name,
+                'ip_address': host,
+                'snmp_port': port,
+                'snmp_community': agent.community,
+                'snmp_version': 'v2c',
+                'status': None,
+                'ports': {port_number: [f"{agent.name}/{port_number}"] for port_number in ghn_ports}
+            })
+        return devices
+
+    def stats(self) -> Dict[str, int]:
+        """Requests received and dropped, over all agents"""
+        if self._workers:
+            totals = {'requests': 0, 'dropped': 0}
+            for _, connection in self._workers:
+                connection.send('stats')
+                for key, value in connection.recv().items():
+                    totals[key] += value
+            return totals
+        return self._stats(self.agents)
+
+    @staticmethod
+    def _stats(agents: List[SimulatedAgent]) -> Dict[str, int]:
+        return {
+            'requests': sum(agent.requests for agent in agents),
+            'dropped': sum(agent.dropped for agent in agents),
+        }
+
+    async def start(self):
+        """Serve every agent from the running event loop"""
+        await self._listen(range(len(self.agents)))
+
+    def fork(self, processes: int):
+        """
+        Serve the agents from worker processes instead, agent i in worker
+        i % processes, so that they do not compete for CPU with what is being
+        measured. Call before this process starts its event loop; stop() ends
+        the workers.
+        """
+        context = multiprocessing.get_context('fork')
+        for shard in range(processes):
+            connection, worker_connection = context.Pipe()
+            process = context.Process(target=self._worker, args=(shard, processes, worker_connection), daemon=True)
+            process.start()
+            self._workers.append((process, connection))
+        for _, connection in self._workers:
+            connection.recv()  # Listening
+
+    async def stop(self):
+        for transport in self._transports:
+            transport.close()
+        self._transports = []
+
+        for process, connection in self._workers:
+            connection.send('stop')
+            process.join()
+        self._workers = []
+
+    async def _listen(self, indexes):
+        loop = asyncio.get_running_loop()
+        for i in indexes:
+            transport, _ = await loop.create_datagram_endpoint(
+                lambda agent=self.agents[i]: _AgentProtocol(agent),
+                local_addr=self.address(i)
+            )
+            self._transports.append(transport)
+
+    def _worker(self, shard: int, shards: int, connection):
+        indexes = range(shard, len(self.agents), shards)
+        agents = [self.agents[i] for i in indexes]
+
+        async def serve():
+            stopped = asyncio.Event()
+
+            def on_message():
+                message = connection.recv()
+                if message == 'stats':
+                    connection.send(self._stats(agents))
+                elif message == 'stop':
+                    stopped.set()
+
+            await self._listen(indexes)
+            asyncio.get_running_loop().add_reader(connection.fileno(), on_message)
+            connection.send('ready')
+            await stopped.wait()
+            for transport in self._transports:
+                transport.close()
+
+        try:
+            asyncio.run(serve())
+        except KeyboardInterrupt:
+            pass
+
+
+def build_simulator(args) -> SnmpSimulator:
+    mib = load_walk(Path(args.walks)) if args.walks else None
+    return SnmpSimulator.fleet(
+        args.devices,
+        ports=args.ports,
+        endpoints=args.endpoints,
+        mib=mib,
+        community=args.community,
+        loss=args.loss,
+        latency=args.latency,
+        jitter=args.jitter,
+        traffic=args.traffic,
+        flap_interval=args.flap_interval,
+        flap_duration=args.flap_duration,
+        max_response_size=args.max_response_size,
+        host=args.host,
+        base_port=args.base_port,
+        addressing=args.addressing
+    )
+
+
+async def _main(simulator: SnmpSimulator, args):
+    if not args.processes:
+        await simulator.start()
+    first, last = simulator.address(0), simulator.address(args.devices - 1)
+    print(f"{args.devices} simulated SNMP agents on {first[0]}:{first[1]} - {last[0]}:{last[1]} ({args.community})")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await simulator.stop()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Simulated GAM SNMP agents")
+    parser.add_argument('--devices', type=int, default=1)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--base-port', type=int, default=16100)
+    parser.add_argument('--addressing', choices=['port', 'loopback'], default='port',
+                        help='One port per device, or one loopback address per device')
+    parser.add_argument('--community', default='public')
+    parser.add_argument('--walks', help='snmpwalk -On capture, or a directory of *.walk captures (default: generated)')
+    parser.add_argument('--ports', type=int, default=24, help='G.hn ports per generated device')
+    parser.add_argument('--endpoints', type=int, default=1, help='Endpoints per port on generated devices')
+    parser.add_argument('--loss', type=float, default=0.0, help='Fraction of requests dropped')
+    parser.add_argument('--latency', type=float, default=0.0, help='Added to every response (seconds)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Random +/- variation of the latency (seconds)')
+    parser.add_argument('--traffic', type=float, default=1_000_000, help='Mean bytes/s out of each interface that is up')
+    parser.add_argument('--flap-interval', type=float, default=0.0, help='Mean seconds between G.hn link flaps (0: none)')
+    parser.add_argument('--flap-duration', type=float, default=5.0, help='Seconds a flapped link stays down')
+    parser.add_argument('--max-response-size', type=int, default=MAX_RESPONSE_SIZE,
+                        help='Larger responses become tooBig (GETBULK: truncated)')
+    parser.add_argument('--processes', type=int, default=0, help='Worker processes serving the agents (0: this one)')
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    simulator = build_simulator(args)
+    if args.processes:
+        simulator.fork(args.processes)
+    try:
+        asyncio.run(_main(simulator, args))
+    except KeyboardInterrupt:
+        pass
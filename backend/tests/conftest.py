@@ -0,0 +1,132 @@
+import socket
+import sys
+from pathlib import Path
+
+import pytest_asyncio
+from sqlalchemy.orm import Session
+
+# Import app modules and the development stand-ins in scripts/
+BACKEND = Path(__file__).parent.parent
+sys.path.insert(0, str(BACKEND))
+sys.path.insert(0, str(BACKEND / 'scripts'))
+
+from app.utils.snmp_engine import snmp_registry  # noqa: E402
+from app.utils.ssh_pool import ssh_pool  # noqa: E402
+from gam_cli_simulator import CliSimulator  # noqa: E402
+from snmp_agent_simulator import SnmpSimulator  # noqa: E402
+
+
+class ScriptedResult:
+    """The rows of one scripted statement, with the Result accessors the services use"""
+
+    def __init__(self, rows):
+        self.rows = list(rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def all(self):
+        return self.rows
+
+    def scalars(self):
+        return self
+
+    def scalar_one_or_none(self):
+        return self.rows[0] if self.rows else None
+
+
+class ScriptedSession:
+    """
+    AsyncSession stand-in for services tested without PostgreSQL.
+
+    Each execute() is recorded with its parameters and answered with the
+    next scripted list of rows (no rows once the script runs out); get()
+    looks objects up in objects by (entity, primary key). Commit and
+    rollback end the transaction execute() began on a real, unbound Session,
+    so transaction events fire.
+    """
+
+    def __init__(self, *results, objects=None):
+        self.results = list(results)
+        self.objects = objects or {}
+        self.executed = []
+        self.sync_session = Session()
+        self.commits = 0
+
+    @property
+    def info(self):
+        return self.sync_session.info
+
+    async def execute(self, statement, params=None):
+        if not self.sync_session.in_transaction():
+            self.sync_session.begin()
+        self.executed.append((statement, params))
+        return ScriptedResult(self.results.pop(0) if self.results else [])
+
+    async def get(self, entity, ident):
+        return self.objects.get((entity, ident))
+
+    async def commit(self):
+        self.sync_session.commit()
+        self.commits += 1
+
+    async def rollback(self):
+        self.sync_session.rollback()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+def free_ports(count: int, kind: int = socket.SOCK_STREAM) -> int:
+    """First of count consecutive ports that are free on 127.0.0.1"""
+    while True:
+        probe = socket.socket(socket.AF_INET, kind)
+        probe.bind(('127.0.0.1', 0))
+        base = probe.getsockname()[1]
+        probe.close()
+        if base + count > 65535:
+            continue
+        try:
+            for port in range(base, base + count):
+                with socket.socket(socket.AF_INET, kind) as check:
+                    check.bind(('127.0.0.1', port))
+        except OSError:
+            continue
+        return base
+
+
+@pytest_asyncio.fixture
+async def cli_fleet():
+    """Build and start a CLI simulator fleet; pooled sessions are closed afterwards"""
+    simulators = []
+
+    async def start(devices: int = 1, **kwargs) -> CliSimulator:
+        simulator = CliSimulator.fleet(devices, base_port=free_ports(devices), **kwargs)
+        await simulator.start()
+        simulators.append(simulator)
+        return simulator
+
+    yield start
+    await ssh_pool.clear()
+    for simulator in simulators:
+        await simulator.stop()
+
+
+@pytest_asyncio.fixture
+async def snmp_fleet():
+    """Build and start an SNMP agent simulator fleet; cached targets are dropped afterwards"""
+    simulators = []
+
+    async def start(devices: int = 1, **kwargs) -> SnmpSimulator:
+        simulator = SnmpSimulator.fleet(devices, base_port=free_ports(devices, socket.SOCK_DGRAM), **kwargs)
+        await simulator.start()
+        simulators.append(simulator)
+        return simulator
+
+    yield start
+    snmp_registry.clear()
+    for simulator in simulators:
+        await simulator.stop()
@@ -0,0 +1,66 @@
+"""CliFanout against the GAM CLI simulator"""
+import time
+
+import pytest
+
+from app.services.cli_fanout import CliFanout
+
+
+async def collect(fanout: CliFanout, devices, **kwargs):
+    return [result async for result in fanout.run(devices, **kwargs)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('command', ['configure terminal', 'write memory', 'reload', 'showrun', ''])
+async def test_only_show_commands_are_run(command):
+    with pytest.raises(ValueError):
+        await collect(CliFanout(session_factory=None), [], command=command)
+
+
+@pytest.mark.asyncio
+async def test_slow_device_times_out_without_holding_back_the_rest(cli_fleet):
+    simulator = await cli_fleet(devices=3)
+    devices = simulator.devices()
+    fanout = CliFanout(session_factory=None, concurrency=3, timeout=0.5)
+    # Connect once so the slow device is only slow at running the command
+    assert all(result['success'] for result in await collect(fanout, devices, command='show version'))
+    simulator.gams[1].latency = 2.0
+
+    started = time.monotonic()
+    results = await collect(fanout, devices, command='show version')
+
+    assert time.monotonic() - started < 2.0
+    assert [result['device_name'] for result in results][-1] == 'GAM-0002'
+    by_name = {result['device_name']: result for result in results}
+    assert by_name['GAM-0002'] == {**by_name['GAM-0002'], 'success': False, 'error': 'Timed out after 0.5s'}
+    for name in ('GAM-0001', 'GAM-0003'):
+        assert by_name[name]['success']
+        assert by_name[name]['output'] == simulator.gams[int(name[-1]) - 1].show('show version')
+
+
+@pytest.mark.asyncio
+async def test_query_results_are_parsed(cli_fleet):
+    simulator = await cli_fleet(devices=2, ports=4)
+
+    results = await collect(CliFanout(session_factory=None), simulator.devices(), query='ports')
+
+    assert len(results) == 2
+    for result in results:
+        assert result['success']
+        assert [port['port_number'] for port in result['data']] == [1, 2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_device_without_credentials_reports_its_own_failure(cli_fleet):
+    simulator = await cli_fleet()
+    device = dict(simulator.devices()[0], ssh_username=None, ssh_password=None)
+
+    results = await collect(CliFanout(session_factory=None), [device], command='show version')
+
+    assert results == [{
+        'device_id': '1',
+        'device_name': 'GAM-0001',
+        'ip_address': '127.0.0.1',
+        'success': False,
+        'error': 'SSH credentials not configured'
+    }]
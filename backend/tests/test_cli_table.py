@@ -0,0 +1,94 @@
+"""CliTable on captured GAM-4-C transcripts and odd output"""
+from pathlib import Path
+
+import pytest
+
+from app.utils.cli_table import (
+    CliTable, GHN_DISCOVER_TABLE, GHN_ENDPOINT_TABLE, GHN_PORT_TABLE, GHN_SUBSCRIBER_TABLE, INT, NAME, TOKEN
+)
+
+TRANSCRIPTS = Path(__file__).parent.parent / 'scripts' / 'transcripts' / 'gam-4-c'
+
+
+def transcript(name: str) -> str:
+    return (TRANSCRIPTS / name).read_text()
+
+
+def test_ghn_discover_all_transcript():
+    assert GHN_DISCOVER_TABLE.parse(transcript('show_ghn_discover_all.txt')) == [
+        {'port': 1, 'mac_address': '00:0E:D8:1E:58:01', 'configured': 'no', 'is_up': 'yes'},
+        {'port': 2, 'mac_address': '00:0E:D8:1E:58:02', 'configured': 'no', 'is_up': 'yes'},
+        {'port': 3, 'mac_address': '00:0E:D8:1E:58:03', 'configured': 'no', 'is_up': 'yes'},
+        {'port': 4, 'mac_address': '00:0E:D8:1C:95:08', 'configured': 'yes', 'is_up': 'yes'},
+    ]
+
+
+def test_ghn_port_transcript():
+    assert GHN_PORT_TABLE.parse(transcript('show_ghn_port.txt')) == [
+        {'port_number': n, 'status': 'enabled', 'link_state': 'up'} for n in (1, 2, 3, 4)
+    ]
+
+
+def test_prompt_and_error_lines_are_not_rows():
+    output = (
+        "Port  Status      Link\n"
+        "----  ------      ----\n"
+        "1     enabled     down\n"
+        "\n"
+        "% Port 9 does not exist\n"
+        "GAM-4-C# \n"
+        "2     disabled    down\n"
+    )
+
+    assert [row['port_number'] for row in GHN_PORT_TABLE.parse(output)] == [1, 2]
+
+
+def test_header_without_separator_is_skipped():
+    assert GHN_PORT_TABLE.parse("Port  Status  Link\n4     enabled up\n") == [
+        {'port_number': 4, 'status': 'enabled', 'link_state': 'up'}
+    ]
+
+
+def test_missing_optional_cells_take_their_defaults():
+    output = "Port  MACAddress\n----  ----------\n 4    00:0E:D8:1C:95:08\n"
+
+    assert GHN_DISCOVER_TABLE.parse(output) == [
+        {'port': 4, 'mac_address': '00:0E:D8:1C:95:08', 'configured': 'unknown', 'is_up': 'unknown'}
+    ]
+
+
+def test_quoted_names_may_contain_spaces():
+    endpoints = (
+        "Endpoint ID   Name              MAC Address        Port\n"
+        "-----------   ----              -----------        ----\n"
+        '1             "Unit 4B modem"   00:0e:d8:1c:95:08  4\n'
+        "2             Positron_1E5801   00:0e:d8:1e:58:01  1\n"
+    )
+    subscribers = (
+        "Subscriber ID  Name    VLAN  Endpoint  BW Profile\n"
+        "-------------  ----    ----  --------  ----------\n"
+        '1              "Jane Doe"  100   1\n'
+    )
+
+    assert GHN_ENDPOINT_TABLE.parse(endpoints) == [
+        {'id': 1, 'name': 'Unit 4B modem', 'mac_address': '00:0e:d8:1c:95:08', 'port': 4},
+        {'id': 2, 'name': 'Positron_1E5801', 'mac_address': '00:0e:d8:1e:58:01', 'port': 1},
+    ]
+    assert GHN_SUBSCRIBER_TABLE.parse(subscribers) == [
+        {'id': 1, 'name': 'Jane Doe', 'vlan_id': 100, 'endpoint_id': 1, 'bw_profile': None}
+    ]
+
+
+def test_rows_with_a_bad_required_cell_are_skipped():
+    table = CliTable(('id', INT), ('name', NAME), ('state', TOKEN, 'unknown'))
+
+    assert table.parse("ID Name State\n-- ---- -----\nx  a    up\n7  b\n") == [
+        {'id': 7, 'name': 'b', 'state': 'unknown'}
+    ]
+
+
+@pytest.mark.parametrize('trailing', ['', ' extra columns ignored'])
+def test_extra_trailing_text_is_ignored(trailing):
+    output = f"Port  Status      Link\n----  ------      ----\n3     enabled     up{trailing}\n"
+
+    assert GHN_PORT_TABLE.parse(output) == [{'port_number': 3, 'status': 'enabled', 'link_state': 'up'}]
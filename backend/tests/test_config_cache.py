@@ -0,0 +1,109 @@
+"""RunningConfigCache against the GAM CLI simulator"""
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.models.device_config import DeviceConfig
+from app.services.config_cache import PARSE_VERSION, RunningConfigCache
+from app.utils import ssh_client as ssh_client_module
+from app.utils.ssh_client import SSHClient
+from conftest import ScriptedSession
+
+PORTS = 4
+
+
+def device_for(simulator):
+    return SimpleNamespace(**simulator.devices()[0])
+
+
+def stored_entry(session: ScriptedSession) -> DeviceConfig:
+    """The row the last upsert wrote"""
+    statement, _ = session.executed[-1]
+    return DeviceConfig(**statement.compile(dialect=postgresql.dialect()).params)
+
+
+async def first_fetch(cache, device):
+    session = ScriptedSession()
+    result = await cache.get(session, device)
+    return result, stored_entry(session)
+
+
+@pytest.mark.asyncio
+async def test_config_is_fetched_parsed_and_then_served_from_cache(cli_fleet):
+    simulator = await cli_fleet(ports=PORTS)
+    gam = simulator.gams[0]
+    device = device_for(simulator)
+    cache = RunningConfigCache(session_factory=None)
+
+    result, entry = await first_fetch(cache, device)
+    assert not result['cached']
+    assert result['running_config'] == gam.show('show running-config')
+    assert result['parsed']['version'] == PARSE_VERSION
+    assert len(result['parsed']['subscribers']) == PORTS
+
+    commands = gam.commands
+    session = ScriptedSession(objects={(DeviceConfig, device.id): entry})
+    result = await cache.get(session, device)
+    assert result['cached']
+    assert result['config_hash'] == entry.config_hash
+    assert gam.commands == commands and session.executed == []
+
+
+@pytest.mark.asyncio
+async def test_configuration_command_invalidates_the_entry(cli_fleet, monkeypatch):
+    simulator = await cli_fleet(ports=PORTS)
+    device = device_for(simulator)
+    cache = RunningConfigCache(session_factory=None)
+    monkeypatch.setattr(ssh_client_module, 'config_write_listeners', [cache.invalidate])
+    _, entry = await first_fetch(cache, device)
+
+    client = SSHClient.for_device(simulator.devices()[0])
+    assert await client.connect()
+    try:
+        results = await client.execute_commands(['configure terminal', 'vlan 4001', 'end'])
+        assert all(result['success'] for result in results)
+    finally:
+        await client.disconnect()
+
+    session = ScriptedSession(objects={(DeviceConfig, device.id): entry})
+    result = await cache.get(session, device)
+    assert not result['cached']
+    assert result['config_hash'] != entry.config_hash
+    assert 'vlan 4001' in result['running_config']
+    assert len(session.executed) == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_unchanged_config_only_moves_fetched_at(cli_fleet):
+    simulator = await cli_fleet(ports=PORTS)
+    device = device_for(simulator)
+    cache = RunningConfigCache(session_factory=None)
+    _, entry = await first_fetch(cache, device)
+    entry.fetched_at -= timedelta(hours=2)
+    fetched_at = entry.fetched_at
+
+    session = ScriptedSession(objects={(DeviceConfig, device.id): entry})
+    result = await cache.get(session, device)
+
+    assert not result['cached']
+    assert entry.fetched_at > fetched_at
+    assert result['parsed'] is entry.parsed
+    assert session.executed == []
+
+
+@pytest.mark.asyncio
+async def test_parse_from_an_older_parser_is_redone(cli_fleet):
+    simulator = await cli_fleet(ports=PORTS)
+    device = device_for(simulator)
+    cache = RunningConfigCache(session_factory=None)
+    _, entry = await first_fetch(cache, device)
+    entry.parsed = {**entry.parsed, 'version': PARSE_VERSION - 1}
+
+    session = ScriptedSession(objects={(DeviceConfig, device.id): entry})
+    result = await cache.get(session, device)
+
+    assert result['parsed']['version'] == PARSE_VERSION
+    assert result['config_hash'] == entry.config_hash
+    assert len(session.executed) == 1
@@ -0,0 +1,98 @@
+"""CounterSampler deltas across counter wraps and agent restarts"""
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import counter_sampler as counter_sampler_module
+from app.services.counter_sampler import CounterSampler, TICKS_MODULUS
+
+IF_INDEX = 1000001
+
+
+class Clock:
+    """Stands in for time.monotonic() in the sampler"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(counter_sampler_module, 'time', SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+def sample(sampler, clock, seconds, uptime, in_octets, out_octets, bits=64):
+    """Take a sample seconds after the previous one"""
+    clock.now += seconds
+    return sampler.update('gam', uptime, {IF_INDEX: (in_octets, out_octets, bits)})
+
+
+def test_first_sample_only_sets_the_baseline(clock):
+    sampler = CounterSampler()
+
+    assert sample(sampler, clock, 0, 1000, 5000, 7000) == {}
+    assert sampler.get_rates('gam')[IF_INDEX]['in_bps'] is None
+
+
+def test_rate_is_measured_in_agent_time(clock):
+    sampler = CounterSampler()
+    sample(sampler, clock, 0, 1000, 5000, 7000)
+
+    # 10 s of agent time arriving 12 s later (network delay)
+    assert sample(sampler, clock, 12, 2000, 15000, 9000) == {IF_INDEX: (10000, 2000)}
+    rates = sampler.get_rates('gam')[IF_INDEX]
+    assert rates['in_bps'] == 8000 and rates['out_bps'] == 1600
+
+
+@pytest.mark.parametrize('bits', [32, 64])
+def test_counter_wrap(clock, bits):
+    sampler = CounterSampler()
+    top = 2 ** bits
+    sample(sampler, clock, 0, 1000, top - 1000, top - 10, bits=bits)
+
+    assert sample(sampler, clock, 10, 2000, 500, 90, bits=bits) == {IF_INDEX: (1500, 100)}
+
+
+def test_counter_width_change_reseeds(clock):
+    sampler = CounterSampler()
+    sample(sampler, clock, 0, 1000, 5000, 7000, bits=32)
+
+    # The agent started answering ifHC counters
+    assert sample(sampler, clock, 10, 2000, 2 ** 40, 2 ** 41, bits=64) == {}
+    assert sample(sampler, clock, 10, 3000, 2 ** 40 + 800, 2 ** 41, bits=64) == {IF_INDEX: (800, 0)}
+
+
+def test_uptime_going_backwards_is_a_restart(clock):
+    sampler = CounterSampler()
+    sample(sampler, clock, 0, 500000, 10 ** 9, 10 ** 9)
+
+    # Counters restarted from zero along with sysUpTime
+    assert sample(sampler, clock, 30, 2000, 4000, 4000) == {}
+    assert sample(sampler, clock, 10, 3000, 6000, 5000) == {IF_INDEX: (2000, 1000)}
+
+
+def test_restart_longer_ago_than_the_previous_uptime(clock):
+    sampler = CounterSampler()
+    sample(sampler, clock, 0, 1000, 10 ** 9, 10 ** 9)
+
+    # Down for a while: 600 s later it reports only 30 s more uptime
+    assert sample(sampler, clock, 600, 4000, 1000, 1000) == {}
+
+
+def test_sys_uptime_wrap_is_not_a_restart(clock):
+    sampler = CounterSampler()
+    sample(sampler, clock, 0, TICKS_MODULUS - 500, 1000, 1000)
+
+    assert sample(sampler, clock, 10, 500, 2000, 1500) == {IF_INDEX: (1000, 500)}
+
+
+def test_implausible_jump_is_discarded(clock):
+    sampler = CounterSampler()
+    sample(sampler, clock, 0, 1000, 0, 0)
+
+    assert sample(sampler, clock, 1, 1100, 10 ** 12, 0) == {}
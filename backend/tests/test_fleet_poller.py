@@ -0,0 +1,57 @@
+"""FleetPoller cycles, without a database"""
+import asyncio
+
+import pytest
+
+from app.models.gam import DeviceStatus
+from app.services.fleet_poller import FleetPoller
+
+
+class RecordingPoller(FleetPoller):
+    """Polls a fixed device list; stores results in memory"""
+
+    def __init__(self, devices, delays, **kwargs):
+        super().__init__(session_factory=None, jitter=0, **kwargs)
+        self.devices = devices
+        self.delays = delays
+        self.polled = []
+        self.stored = None
+
+    async def _load_devices(self, full=True):
+        return [dict(device) for device in self.devices]
+
+    async def poll_device(self, device, full=True):
+        self.polled.append((device['id'], full))
+        await asyncio.sleep(self.delays.get(device['id'], 0))
+        return {'id': device['id'], 'status': DeviceStatus.ONLINE}
+
+    async def _store_results(self, results):
+        self.stored = results
+
+
+DEVICES = [{'id': n, 'name': f"GAM-{n}"} for n in (1, 2, 3)]
+
+
+@pytest.mark.asyncio
+async def test_devices_cancelled_at_the_deadline_are_stored_as_errors():
+    poller = RecordingPoller(DEVICES, delays={2: 10}, deadline=0.2)
+
+    summary = await poller.poll_once()
+
+    assert summary['timed_out'] == 1
+    assert summary['online'] == 2 and summary['error'] == 1
+    assert sorted((r['id'], r['status']) for r in poller.stored) == [
+        (1, DeviceStatus.ONLINE), (2, DeviceStatus.ERROR), (3, DeviceStatus.ONLINE)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_health_checks_run_between_full_cycles():
+    poller = RecordingPoller(DEVICES[:1], delays={}, interval=0.3, health_check_interval=0.1)
+
+    poller.start()
+    await asyncio.sleep(0.65)
+    await poller.stop()
+
+    cycles = [full for _, full in poller.polled]
+    assert cycles[:4] == [True, False, False, True]
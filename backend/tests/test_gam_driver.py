@@ -0,0 +1,108 @@
+"""GAM management drivers, with the JSON-RPC driver against the stand-in server"""
+import pytest
+import pytest_asyncio
+
+from app.services.gam_driver import GamDriver, CliDriver, JsonRpcDriver, driver_for_device
+from app.utils.gam_jsonrpc import jsonrpc_pool
+from gam_jsonrpc_standin import StandInGam, serve
+
+
+@pytest.fixture
+def standin():
+    gam = StandInGam(ports=4, endpoints=4)  # One detected endpoint per port
+    server = serve(port=0, gam=gam, username='admin', password='secret')
+    yield gam, server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+@pytest_asyncio.fixture
+async def json_rpc_driver(standin):
+    gam, port = standin
+    driver = driver_for_device({
+        'ip_address': '127.0.0.1',
+        'management_api': 'json_rpc',
+        'api_port': port,
+        'ssh_username': 'admin',
+        'ssh_password': 'secret'
+    })
+    yield gam, driver
+    await jsonrpc_pool.aclose()
+
+
+def test_driver_missing_a_method_cannot_be_instantiated():
+    class PartialDriver(GamDriver):
+        async def configure_port(self, port_number, vlan_id, bandwidth_down, bandwidth_up, mimo_enabled=False):
+            return True
+
+    with pytest.raises(TypeError):
+        PartialDriver('192.0.2.1')
+
+
+def test_driver_for_device_follows_management_api():
+    device = {'ip_address': '192.0.2.1', 'ssh_username': 'admin', 'ssh_password': 'secret'}
+
+    assert isinstance(driver_for_device(device), CliDriver)
+    assert isinstance(driver_for_device({**device, 'management_api': 'json_rpc'}), JsonRpcDriver)
+    assert driver_for_device({'ip_address': '192.0.2.1', 'management_api': 'json_rpc'}) is None
+    with pytest.raises(ValueError):
+        driver_for_device({**device, 'management_api': 'netconf'})
+
+
+@pytest.mark.asyncio
+async def test_json_rpc_configure_port_applies_every_setting(json_rpc_driver):
+    gam, driver = json_rpc_driver
+    gam.interfaces['G.hn 1/2']['Shutdown'] = True
+
+    assert await driver.get_port_status(2) == {
+        'port_number': 2, 'enabled': False, 'link_up': False, 'mimo_enabled': True
+    }
+
+    assert await driver.configure_port(2, vlan_id=120, bandwidth_down=500, bandwidth_up=100, mimo_enabled=False)
+
+    assert gam.tables['bwProfileByName']['500M-100M'] == {
+        'Description': 'Managed by Positron GAM', 'DsBw': 500, 'UsBw': 100
+    }
+    assert gam.tables['userByName']['port-2'] == {
+        'PortIfIndex': 'G.hn 1/2', 'VlanId': 120, 'BwProfileName': '500M-100M'
+    }
+    assert gam.saves == 1
+    assert await driver.get_port_status(2) == {
+        'port_number': 2, 'enabled': True, 'link_up': True, 'mimo_enabled': False
+    }
+
+
+@pytest.mark.asyncio
+async def test_json_rpc_reconfigure_updates_existing_subscriber(json_rpc_driver):
+    gam, driver = json_rpc_driver
+
+    assert await driver.configure_port(3, vlan_id=130, bandwidth_down=100, bandwidth_up=20)
+    assert await driver.configure_port(3, vlan_id=131, bandwidth_down=100, bandwidth_up=20, mimo_enabled=True)
+
+    assert gam.tables['userByName']['port-3']['VlanId'] == 131
+    assert list(gam.tables['bwProfileByName']) == ['Default BW Profile', '100M-20M']
+    assert (await driver.get_port_status(3))['mimo_enabled'] is True
+    assert gam.saves == 2
+
+
+@pytest.mark.asyncio
+async def test_json_rpc_disable_port_shuts_the_interface(json_rpc_driver):
+    gam, driver = json_rpc_driver
+
+    assert await driver.disable_port(1)
+
+    assert gam.interfaces['G.hn 1/1']['Shutdown'] is True
+    assert gam.saves == 1
+    assert await driver.get_port_status(1) == {
+        'port_number': 1, 'enabled': False, 'link_up': False, 'mimo_enabled': True
+    }
+
+
+@pytest.mark.asyncio
+async def test_json_rpc_failures_are_reported_not_raised(json_rpc_driver):
+    gam, driver = json_rpc_driver
+
+    assert await driver.configure_port(9, vlan_id=190, bandwidth_down=100, bandwidth_up=20) is False
+    assert await driver.get_port_status(9) is None
+    assert await driver.disable_port(9) is False
+    assert gam.saves == 0
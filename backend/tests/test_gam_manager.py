@@ -0,0 +1,150 @@
+"""GAMManager port sync and bulk import, against a scripted session"""
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql.dml import Insert, Update
+
+from app.models.gam import DeviceStatus, GAMDevice, PortStatus, PortType
+from app.services.gam_manager import GAMManager
+from app.utils.snmp_client import SNMPClient
+from conftest import ScriptedSession
+
+DEVICE_ID = uuid4()
+BASE = SNMPClient.GHN_IF_INDEX_BASE
+
+
+def port_rows(statuses):
+    return [SimpleNamespace(id=f"port-{n}", port_number=n, status=status) for n, status in statuses.items()]
+
+
+def statements(session, kind):
+    return [(statement, params) for statement, params in session.executed if isinstance(statement, kind)]
+
+
+def learned_indexes(statement):
+    """(snmp_index, port_number) rows of a multi-row GAMPortIndex insert"""
+    params = statement.compile(dialect=postgresql.dialect()).params
+    rows = len([key for key in params if key.startswith('snmp_index')])
+    return [(params[f"snmp_index_m{i}"], params[f"port_number_m{i}"]) for i in range(rows)]
+
+
+@pytest.mark.asyncio
+async def test_ports_are_mapped_through_the_learned_index():
+    ports = port_rows({1: PortStatus.UP, 2: PortStatus.DOWN, 3: PortStatus.ERROR, 4: PortStatus.UP})
+    synced = [SimpleNamespace(port_number=n) for n in (1, 2, 3, 4)]
+    session = ScriptedSession(
+        [SimpleNamespace(name='gam-1')],
+        ports,
+        [(BASE + 7, 2)],  # Port 2 was learned at an unusual index
+        [],
+        [],
+        synced
+    )
+    port_info = {
+        BASE + 1: {'link_status': 'up'},
+        BASE + 2: {'link_status': 'up'},  # Port 2's usual index, but port 2 is mapped already
+        BASE + 7: {'link_status': 'up'},
+        BASE + 3: {'link_status': 'down'},
+        BASE + 4: {'link_status': 'down'},
+        BASE + 9: {'link_status': 'up'},  # An extra row with no port behind it
+        1: {'link_status': 'up'},  # Not a G.hn interface
+    }
+
+    result = await GAMManager(session).update_ports_from_snmp(DEVICE_ID, port_info)
+
+    assert result == synced
+    (insert, _), = statements(session, Insert)
+    assert learned_indexes(insert) == [(BASE + 1, 1), (BASE + 3, 3), (BASE + 4, 4)]
+    (_, changes), = statements(session, Update)
+    # Port 3 is in ERROR and keeps it; port 1 did not change
+    assert changes == [
+        {'port_id': 'port-2', 'new_status': PortStatus.UP},
+        {'port_id': 'port-4', 'new_status': PortStatus.DOWN},
+    ]
+    assert session.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_fully_learned_device_writes_only_status_changes():
+    ports = port_rows({1: PortStatus.UP, 2: PortStatus.UP})
+    session = ScriptedSession(
+        [SimpleNamespace(name='gam-1')],
+        ports,
+        [(BASE + 1, 1), (BASE + 2, 2)],
+        [],
+        ports
+    )
+
+    await GAMManager(session).update_ports_from_snmp(DEVICE_ID, {
+        BASE + 1: {'link_status': 'up'},
+        BASE + 2: {'link_status': 'down'},
+    })
+
+    assert statements(session, Insert) == []
+    (_, changes), = statements(session, Update)
+    assert changes == [{'port_id': 'port-2', 'new_status': PortStatus.DOWN}]
+
+
+@pytest.mark.asyncio
+async def test_unknown_device_raises():
+    with pytest.raises(ValueError):
+        await GAMManager(ScriptedSession([])).update_ports_from_snmp(DEVICE_ID, {})
+
+
+def new_device(name, model):
+    return GAMDevice(id=uuid4(), name=name, model=model)
+
+
+@pytest.mark.asyncio
+async def test_import_skips_taken_and_repeated_names_and_addresses():
+    created = [new_device('gam-a', 'GAM-4-C'), new_device('gam-d', 'GAM-12-M')]
+    session = ScriptedSession(
+        [
+            SimpleNamespace(name='gam-b', ip_address='10.0.0.99'),
+            SimpleNamespace(name='gam-x', ip_address='10.0.0.3'),
+        ],
+        created
+    )
+    devices = [
+        {'name': 'gam-a', 'ip_address': '10.0.0.1', 'model': 'GAM-4-C'},
+        {'name': 'gam-b', 'ip_address': '10.0.0.2', 'model': 'GAM-4-C'},
+        {'name': 'gam-c', 'ip_address': '10.0.0.3', 'model': 'GAM-4-C'},
+        {'name': 'gam-d', 'ip_address': '10.0.0.4', 'model': 'GAM-12-M'},
+        {'name': 'gam-a', 'ip_address': '10.0.0.5', 'model': 'GAM-4-C'},
+        {'name': 'gam-f', 'ip_address': '10.0.0.4', 'model': 'GAM-4-C'},
+    ]
+
+    result = await GAMManager(session).import_devices(devices)
+
+    assert result['created'] == created
+    assert [(entry['name'], entry['reason']) for entry in result['skipped']] == [
+        ('gam-b', 'name already exists'),
+        ('gam-c', 'IP address already exists'),
+        ('gam-a', 'name already exists'),
+        ('gam-f', 'IP address already exists'),
+    ]
+
+    (_, device_rows), (_, seeded) = statements(session, Insert)
+    assert [(row['name'], row['ip_address']) for row in device_rows] == [('gam-a', '10.0.0.1'), ('gam-d', '10.0.0.4')]
+    assert all(row['status'] == DeviceStatus.OFFLINE and row['snmp_version'] == 'v2c' for row in device_rows)
+
+    # Every port of both devices seeded in the same transaction
+    assert [(row['gam_device_id'], row['port_number'], row['port_type']) for row in seeded] == (
+        [(created[0].id, n, PortType.COAX) for n in range(1, 5)]
+        + [(created[1].id, n, PortType.MIMO) for n in range(1, 13)]
+    )
+    assert session.commits == 1
+    assert all(device.active_subscribers == 0 for device in created)
+
+
+@pytest.mark.asyncio
+async def test_import_of_only_duplicates_writes_nothing():
+    session = ScriptedSession([SimpleNamespace(name='gam-a', ip_address='10.0.0.1')])
+
+    result = await GAMManager(session).import_devices([{'name': 'gam-a', 'ip_address': '10.0.0.9', 'model': 'GAM-4-C'}])
+
+    assert result['created'] == []
+    assert statements(session, Insert) == []
+    assert session.commits == 0
@@ -0,0 +1,128 @@
+"""MACLocationIndex replace and flush rules"""
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+
+from app.services.mac_index import MACLocationIndex, SOURCE_FDB, SOURCE_GHN_DISCOVER
+from app.utils.snmp_client import SNMPClient
+from conftest import ScriptedSession
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+PERSIST_INTERVAL = 900
+CPE = 'A4-2B-B0-E1-07-5C'
+UPLINK_IF_INDEX = 1
+
+
+def fdb(if_index, mac=CPE):
+    return [{'mac_address': mac, 'bridge_port': 3, 'interface_index': if_index}]
+
+
+def ghn_if_index(port):
+    return SNMPClient.GHN_IF_INDEX_BASE + port
+
+
+@pytest.fixture
+def index():
+    return MACLocationIndex(persist_interval=PERSIST_INTERVAL)
+
+
+def test_lookup_normalizes_mac_and_oui(index):
+    device = uuid4()
+    index.update_from_fdb(device, 'gam-1', fdb(ghn_if_index(2)), T0)
+
+    location = index.lookup('a42b.b0e1.075c')
+    assert location['mac_address'] == 'a4:2b:b0:e1:07:5c'
+    assert location['gam_device_name'] == 'gam-1'
+    assert location['vendor_oui'] == 'A4:2B:B0'
+    assert [entry['mac_address'] for entry in index.lookup_oui('a42bb0')] == ['a4:2b:b0:e1:07:5c']
+
+
+def test_uplink_sighting_does_not_displace_recent_subscriber_port(index):
+    gam_1, gam_2 = uuid4(), uuid4()
+    index.update_from_fdb(gam_1, 'gam-1', fdb(ghn_if_index(2)), T0)
+
+    # The same CPE learned on another GAM's uplink
+    changed = index.update_from_fdb(gam_2, 'gam-2', fdb(UPLINK_IF_INDEX), T0 + timedelta(seconds=60))
+
+    assert changed == 0
+    assert index.lookup(CPE)['gam_device_id'] == gam_1
+
+
+def test_uplink_sighting_replaces_a_stale_subscriber_port(index):
+    gam_1, gam_2 = uuid4(), uuid4()
+    index.update_from_fdb(gam_1, 'gam-1', fdb(ghn_if_index(2)), T0)
+
+    changed = index.update_from_fdb(gam_2, 'gam-2', fdb(UPLINK_IF_INDEX), T0 + timedelta(seconds=PERSIST_INTERVAL))
+
+    assert changed == 1
+    assert index.lookup(CPE)['gam_device_id'] == gam_2
+
+
+def test_subscriber_port_sighting_replaces_uplink(index):
+    gam_1, gam_2 = uuid4(), uuid4()
+    index.update_from_fdb(gam_2, 'gam-2', fdb(UPLINK_IF_INDEX), T0)
+
+    changed = index.update_from_endpoints(
+        gam_1, 'gam-1', [{'mac_address': CPE, 'port': 4}], T0 + timedelta(seconds=1)
+    )
+
+    assert changed == 1
+    location = index.lookup(CPE)
+    assert (location['gam_device_id'], location['port_number'], location['source']) == (gam_1, 4, SOURCE_GHN_DISCOVER)
+    assert location['interface_index'] == ghn_if_index(4)
+
+
+def test_move_between_ports_of_the_same_device_replaces(index):
+    device = uuid4()
+    index.update_from_fdb(device, 'gam-1', fdb(ghn_if_index(2)), T0)
+
+    assert index.update_from_fdb(device, 'gam-1', fdb(ghn_if_index(3)), T0 + timedelta(seconds=1)) == 1
+    assert index.lookup(CPE)['interface_index'] == ghn_if_index(3)
+    assert index.lookup(CPE)['source'] == SOURCE_FDB
+
+
+@pytest.mark.asyncio
+async def test_flush_writes_changes_then_only_stale_last_seen(index):
+    device = uuid4()
+    index.update_from_fdb(device, 'gam-1', fdb(ghn_if_index(2)), T0)
+
+    session = ScriptedSession([device])
+    assert await index.flush(session) == 1
+    rows = session.executed[-1][1]
+    assert [(row['mac_address'], row['interface_index']) for row in rows] == [('a4:2b:b0:e1:07:5c', ghn_if_index(2))]
+    await session.commit()
+
+    # Seen again in place: nothing to write until last_seen is stale
+    index.update_from_fdb(device, 'gam-1', fdb(ghn_if_index(2)), T0 + timedelta(seconds=60))
+    assert await index.flush(ScriptedSession([device])) == 0
+
+    index.update_from_fdb(device, 'gam-1', fdb(ghn_if_index(2)), T0 + timedelta(seconds=PERSIST_INTERVAL))
+    session = ScriptedSession([device])
+    assert await index.flush(session) == 1
+    assert session.executed[-1][1][0]['last_seen'] == T0 + timedelta(seconds=PERSIST_INTERVAL)
+
+
+@pytest.mark.asyncio
+async def test_flush_requeues_rows_on_rollback(index):
+    device = uuid4()
+    index.update_from_fdb(device, 'gam-1', fdb(ghn_if_index(2)), T0)
+
+    session = ScriptedSession([device])
+    assert await index.flush(session) == 1
+    await session.rollback()
+
+    assert await index.flush(ScriptedSession([device])) == 1
+
+
+@pytest.mark.asyncio
+async def test_flush_drops_macs_of_deleted_devices(index):
+    kept, deleted = uuid4(), uuid4()
+    index.update_from_fdb(kept, 'gam-1', fdb(ghn_if_index(2)), T0)
+    index.update_from_fdb(deleted, 'gam-2', fdb(ghn_if_index(5), mac='00:0e:d8:1e:58:01'), T0)
+
+    session = ScriptedSession([kept])
+    assert await index.flush(session) == 1
+
+    assert index.lookup('00:0e:d8:1e:58:01') is None
+    assert index.lookup(CPE)['gam_device_id'] == kept
@@ -0,0 +1,80 @@
+"""SNMPClient against the SNMP agent simulator"""
+import math
+
+import pytest
+
+from app.utils.snmp_client import SNMPClient
+from snmp_agent_simulator import IF_ENTRY, MAX_RESPONSE_SIZE, synthetic_walk
+
+GHN_PORTS = 24
+IF_INDEXES = [1] + [SNMPClient.GHN_IF_INDEX_BASE + n for n in range(1, GHN_PORTS + 1)]
+IF_DESCR_OIDS = [f"{SNMPClient.OID_IF_DESC}.{if_index}" for if_index in IF_INDEXES]
+MISSING_OID = f"{SNMPClient.OID_IF_DESC}.999"
+
+
+def expected_descr(if_index: int) -> str:
+    if if_index == 1:
+        return 'GigabitEthernet 1/1'
+    return f"G.hn 1/{if_index - SNMPClient.GHN_IF_INDEX_BASE}"
+
+
+@pytest.mark.asyncio
+async def test_get_many_packs_oids_into_one_pdu(snmp_fleet):
+    simulator = await snmp_fleet(ports=GHN_PORTS)
+    client = SNMPClient.for_device(simulator.devices()[0])
+
+    values = await client.get_many(IF_DESCR_OIDS + [SNMPClient.OID_SYSTEM_NAME])
+
+    assert simulator.stats()['requests'] == 1
+    assert values[SNMPClient.OID_SYSTEM_NAME] == 'GAM-0001'
+    assert [values[oid] for oid in IF_DESCR_OIDS] == [expected_descr(i) for i in IF_INDEXES]
+
+
+@pytest.mark.asyncio
+async def test_get_many_splits_on_too_big_and_remembers_the_size(snmp_fleet):
+    simulator = await snmp_fleet(ports=GHN_PORTS, max_response_size=300)
+    client = SNMPClient.for_device(simulator.devices()[0])
+    oids = IF_DESCR_OIDS + [MISSING_OID]
+
+    values = await client.get_many(oids)
+
+    assert [values[oid] for oid in IF_DESCR_OIDS] == [expected_descr(i) for i in IF_INDEXES]
+    assert values[MISSING_OID] is None
+    target = await client._target()
+    assert target.max_varbinds < len(oids)
+
+    # Later requests start at the learned size and need no further splits
+    before = simulator.stats()['requests']
+    assert await client.get_many(oids) == values
+    assert simulator.stats()['requests'] - before == math.ceil(len(oids) / target.max_varbinds)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('max_repetitions, max_response_size', [
+    (1, MAX_RESPONSE_SIZE),
+    (4, MAX_RESPONSE_SIZE),
+    (50, MAX_RESPONSE_SIZE),
+    (50, 300),  # GETBULK answers cut short mid-row
+])
+async def test_walk_table_keeps_sparse_columns_aligned(snmp_fleet, max_repetitions, max_response_size):
+    mib = synthetic_walk('GAM-0001', GHN_PORTS, seed=0)
+    # ifDescr is missing on some rows, ifType ends before the table does
+    for if_index in IF_INDEXES[2:6]:
+        del mib[IF_ENTRY + (2, if_index)]
+    for if_index in IF_INDEXES[-5:]:
+        del mib[IF_ENTRY + (3, if_index)]
+    simulator = await snmp_fleet(mib=mib, max_response_size=max_response_size)
+    client = SNMPClient.for_device(simulator.devices()[0])
+    columns = [2, 3, 8]
+
+    rows = await client.walk_table(SNMPClient.OID_IF_ENTRY, columns, max_repetitions=max_repetitions)
+
+    expected = {}
+    for column in columns:
+        for if_index in IF_INDEXES:
+            value = mib.get(IF_ENTRY + (column, if_index))
+            if value is not None:
+                expected.setdefault((if_index,), {})[column] = value.prettyPrint()
+    assert {
+        index: {column: value.prettyPrint() for column, value in row.items()} for index, row in rows.items()
+    } == expected
@@ -0,0 +1,141 @@
+"""SNMPv3 USM: RFC 3414 known answers, and round trips checked against pysnmp's USM"""
+import pytest
+from pyasn1.codec.ber import decoder, encoder
+from pyasn1.type import univ
+from pysnmp.proto.api import v2c
+from pysnmp.proto.mpmod.rfc3412 import SNMPv3Message, ScopedPDU
+from pysnmp.proto.secmod.rfc3414 import localkey
+from pysnmp.proto.secmod.rfc3414.priv.des import Des
+from pysnmp.proto.secmod.rfc3414.service import UsmSecurityParameters
+from pysnmp.proto.secmod.rfc3826.priv.aes import Aes
+
+from app.utils.snmp_usm import (
+    AUTH_PROTOCOLS, PRIV_PROTOCOLS, UsmError, UsmSession, UsmUser, localize_key, password_to_key
+)
+
+# RFC 3414 A.3
+RFC_PASSWORD = 'maplesyrup'
+RFC_ENGINE_ID = bytes.fromhex('000000000000000000000002')
+
+ENGINE_ID = bytes.fromhex('80001f8880e9630000d61ff449')
+BOOTS = 7
+ENGINE_TIME = 123456
+SYS_DESCR = '1.3.6.1.2.1.1.1.0'
+
+PYSNMP_CIPHERS = {'des': Des, 'aes': Aes}
+
+
+def session_for(auth_protocol, priv_protocol=None) -> UsmSession:
+    user = UsmUser(
+        'gam-poller',
+        auth_protocol=auth_protocol,
+        auth_password='auth-secret-1',
+        priv_protocol=priv_protocol,
+        priv_password='priv-secret-1' if priv_protocol else None
+    )
+    session = UsmSession(user)
+    session.set_engine(ENGINE_ID, BOOTS, ENGINE_TIME)
+    return session
+
+
+def get_request(request_id: int = 42):
+    pdu = v2c.GetRequestPDU()
+    v2c.apiPDU.setDefaults(pdu)
+    v2c.apiPDU.setRequestID(pdu, request_id)
+    v2c.apiPDU.setVarBinds(pdu, [(v2c.ObjectIdentifier(SYS_DESCR), v2c.Null())])
+    return pdu
+
+
+def decode(data: bytes):
+    message, _ = decoder.decode(data, asn1Spec=SNMPv3Message())
+    return message
+
+
+def security_parameters(message):
+    params, _ = decoder.decode(bytes(message['msgSecurityParameters']), asn1Spec=UsmSecurityParameters())
+    return params
+
+
+@pytest.mark.parametrize('auth_protocol, ku, kul', [
+    ('md5', '9faf3283884e92834ebc9847d8edd963', '526f5eed9fcce26f8964c2930787d82b'),
+    ('sha', '9fb5cc0381497b3793528939ff788d5d79145211', '6695febc9288e36282235fc7151f128497b38f3f'),
+])
+def test_password_to_key_rfc3414_vectors(auth_protocol, ku, kul):
+    key = password_to_key(RFC_PASSWORD, auth_protocol)
+    assert key.hex() == ku
+    assert localize_key(key, RFC_ENGINE_ID, auth_protocol).hex() == kul
+
+
+@pytest.mark.parametrize('auth_protocol', sorted(AUTH_PROTOCOLS))
+def test_key_localization_matches_pysnmp(auth_protocol):
+    hash_func = AUTH_PROTOCOLS[auth_protocol][0]
+    expected_ku = localkey.hashPassphrase(RFC_PASSWORD, hash_func).asOctets()
+    expected_kul = localkey.localizeKey(expected_ku, univ.OctetString(ENGINE_ID), hash_func).asOctets()
+
+    key = password_to_key(RFC_PASSWORD, auth_protocol)
+    assert key == expected_ku
+    assert localize_key(key, ENGINE_ID, auth_protocol) == expected_kul
+
+
+@pytest.mark.parametrize('auth_protocol', sorted(AUTH_PROTOCOLS))
+@pytest.mark.parametrize('priv_protocol', [None, *PRIV_PROTOCOLS])
+def test_wrap_unwrap_round_trip(auth_protocol, priv_protocol):
+    session = session_for(auth_protocol, priv_protocol)
+    data = session.wrap(get_request(), request_id=1001)
+    message = decode(data)
+
+    params = security_parameters(message)
+    assert bytes(params['msgAuthoritativeEngineId']) == ENGINE_ID
+    assert bytes(params['msgUserName']) == b'gam-poller'
+    assert len(bytes(params['msgAuthenticationParameters'])) == AUTH_PROTOCOLS[auth_protocol][1]
+
+    pdu, report = session.unwrap(message, data)
+    assert report is None
+    assert v2c.apiPDU.getRequestID(pdu) == 42
+    assert [str(oid) for oid, _ in v2c.apiPDU.getVarBinds(pdu)] == [SYS_DESCR]
+
+
+@pytest.mark.parametrize('auth_protocol', sorted(AUTH_PROTOCOLS))
+def test_tampered_message_fails_authentication(auth_protocol):
+    session = session_for(auth_protocol, 'aes')
+    data = bytearray(session.wrap(get_request(), request_id=1002))
+    data[-1] ^= 0x01
+
+    with pytest.raises(UsmError, match='wrong digest'):
+        session.unwrap(decode(bytes(data)), bytes(data))
+
+
+def test_message_from_another_engine_is_rejected():
+    session = session_for('sha256', 'aes')
+    other = session_for('sha256', 'aes')
+    other.set_engine(bytes.fromhex('80001f8880aabbccddeeff0011'), BOOTS, ENGINE_TIME)
+    data = other.wrap(get_request(), request_id=1003)
+
+    with pytest.raises(UsmError):
+        session.unwrap(decode(data), data)
+
+
+@pytest.mark.parametrize('auth_protocol', ['md5', 'sha', 'sha256'])
+@pytest.mark.parametrize('priv_protocol', PRIV_PROTOCOLS)
+def test_encryption_interoperates_with_pysnmp(auth_protocol, priv_protocol):
+    session = session_for(auth_protocol, priv_protocol)
+    priv_key = univ.OctetString(session._priv_key)
+    cipher = PYSNMP_CIPHERS[priv_protocol]()
+
+    # Ours encrypts, pysnmp decrypts
+    data = session.wrap(get_request(), request_id=1004)
+    message = decode(data)
+    salt = univ.OctetString(bytes(security_parameters(message)['msgPrivacyParameters']))
+    plaintext = cipher.decryptData(
+        priv_key, (BOOTS, ENGINE_TIME, salt), univ.OctetString(bytes(message['msgData']['encryptedPDU']))
+    )
+    scoped, _ = decoder.decode(bytes(plaintext), asn1Spec=ScopedPDU())
+    assert bytes(scoped['contextEngineId']) == ENGINE_ID
+    assert v2c.apiPDU.getRequestID(scoped['data'].getComponent()) == 42
+
+    # pysnmp encrypts, ours decrypts
+    scoped_data = encoder.encode(scoped)
+    ciphertext, salt = cipher.encryptData(priv_key, (BOOTS, ENGINE_TIME, None), scoped_data)
+    decrypted = session._decrypt(bytes(ciphertext), BOOTS, ENGINE_TIME, bytes(salt))
+    assert decrypted[:len(scoped_data)] == scoped_data
+
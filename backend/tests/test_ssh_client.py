@@ -0,0 +1,71 @@
+"""SSHClient against the GAM CLI simulator"""
+import pytest
+
+import gam_cli_simulator
+from app.utils.ssh_client import SSHClient
+
+
+async def connected_client(simulator) -> SSHClient:
+    client = SSHClient.for_device(simulator.devices()[0])
+    assert await client.connect()
+    return client
+
+
+@pytest.mark.asyncio
+async def test_configure_port_reports_every_line_applied(cli_fleet):
+    simulator = await cli_fleet(ports=4)
+    client = await connected_client(simulator)
+    try:
+        report = await client.configure_port(2, vlan_id=120, bandwidth_down=500, bandwidth_up=100, mimo_enabled=True)
+    finally:
+        await client.disconnect()
+
+    assert report['success']
+    assert report['failed'] is None
+    assert report['applied'][-1] == 'write memory'
+    assert 'mimo enable' in report['applied']
+
+
+@pytest.mark.asyncio
+async def test_configure_port_reports_lines_left_applied_on_failure(cli_fleet, monkeypatch):
+    # A GAM without MIMO rejects the mimo line
+    monkeypatch.setattr(
+        gam_cli_simulator, 'INTERFACE_KEYWORDS',
+        tuple(k for k in gam_cli_simulator.INTERFACE_KEYWORDS if k != 'mimo ')
+    )
+    simulator = await cli_fleet(ports=4)
+    client = await connected_client(simulator)
+    try:
+        report = await client.configure_port(2, vlan_id=120, bandwidth_down=500, bandwidth_up=100)
+        # The shell was taken back to exec mode, where show commands work
+        assert '%' not in (await client.execute('show version'))['stdout']
+    finally:
+        await client.disconnect()
+
+    assert not report['success']
+    assert report['applied'] == [
+        'configure terminal', 'interface ghn0/2', 'vlan 120', 'bandwidth downstream 500', 'bandwidth upstream 100'
+    ]
+    assert report['failed'] == 'mimo disable'
+    assert report['error'].startswith('% Invalid word')
+
+
+@pytest.mark.asyncio
+async def test_execute_commands_stops_at_the_first_rejected_line(cli_fleet):
+    simulator = await cli_fleet(ports=4)
+    gam = simulator.gams[0]
+    client = await connected_client(simulator)
+    commands = ['configure terminal', 'frobnicate 1', 'vlan 300', 'end']
+    try:
+        results = await client.execute_commands(commands)
+        # Left in exec mode, not config mode
+        assert (await client.execute('show version'))['stdout'] == gam.show('show version')
+    finally:
+        await client.disconnect()
+
+    assert [result['success'] for result in results] == [True, False]
+    assert results[1]['exit_code'] == 1
+    assert results[1]['stderr'].startswith('% Invalid word')
+    assert SSHClient.applied_commands(commands, results) == ['configure terminal']
+    # Nothing after the failed line reached the device
+    assert gam.config_lines == []
@@ -0,0 +1,70 @@
+"""SSH session pool against the GAM CLI simulator"""
+import asyncio
+
+import pytest
+
+from app.utils.ssh_client import SSHClient
+
+
+@pytest.mark.asyncio
+async def test_released_session_is_reused(cli_fleet):
+    simulator = await cli_fleet()
+    device = simulator.devices()[0]
+
+    first = SSHClient.for_device(device)
+    assert await first.connect()
+    session = first.session
+    await first.execute('show version')
+    await first.disconnect()
+
+    second = SSHClient.for_device(device)
+    assert await second.connect()
+    try:
+        assert second.session is session
+        # The shell opened for the first client is kept too
+        shell = session.shell
+        assert (await second.execute('show version'))['success']
+        assert session.shell is shell
+    finally:
+        await second.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_dead_session_is_replaced(cli_fleet):
+    simulator = await cli_fleet()
+    device = simulator.devices()[0]
+
+    first = SSHClient.for_device(device)
+    assert await first.connect()
+    session = first.session
+    await first.disconnect()
+    session.client.get_transport().close()
+
+    second = SSHClient.for_device(device)
+    assert await second.connect()
+    try:
+        assert second.session is not session
+        assert (await second.execute('show version'))['success']
+    finally:
+        await second.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_one_session_per_device_serializes_clients(cli_fleet):
+    simulator = await cli_fleet()
+    device = simulator.devices()[0]
+
+    first = SSHClient.for_device(device)
+    assert await first.connect()
+    second = SSHClient.for_device(device)
+    waiting = asyncio.create_task(second.connect())
+    await asyncio.sleep(0.2)
+    assert not waiting.done()
+
+    session = first.session
+    await first.disconnect()
+    assert await asyncio.wait_for(waiting, 5)
+    try:
+        assert second.session is session
+    finally:
+        await second.disconnect()
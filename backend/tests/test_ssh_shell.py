@@ -0,0 +1,77 @@
+"""InteractiveShell against the GAM CLI simulator"""
+import pytest
+
+from app.utils.ssh_client import SSHClient
+from app.utils.ssh_pool import ssh_pool
+from app.utils.ssh_shell import InteractiveShell, ShellTimeout
+from gam_cli_simulator import PAGE_LINES, PROMPT_STYLES
+
+TIMEOUT = 5
+
+
+async def open_shell(simulator, learn_only: bool = False):
+    """Connect to the first device; shell ops block, so they run on the SSH workers"""
+    client = SSHClient.for_device(simulator.devices()[0])
+    assert await client.connect()
+    if learn_only:
+        shell = InteractiveShell(client.client.invoke_shell(width=511, height=0), TIMEOUT)
+        await ssh_pool.run(shell._learn_prompt)
+    else:
+        shell = await ssh_pool.run(InteractiveShell.open, client.client, TIMEOUT)
+    return client, shell
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('prompt_style', sorted(PROMPT_STYLES))
+async def test_prompt_is_learned_in_every_style(cli_fleet, prompt_style):
+    simulator = await cli_fleet(ports=4, prompt_style=prompt_style)
+    gam = simulator.gams[0]
+    client, shell = await open_shell(simulator)
+    try:
+        assert shell.hostname == gam.hostname
+        assert await ssh_pool.run(shell.run, 'show ghn port') == gam.show('show ghn port')
+
+        # Configuration mode prompts still end the read
+        assert await ssh_pool.run(shell.run, 'configure terminal') == ''
+        assert await ssh_pool.run(shell.run, 'interface ghn0/1') == ''
+        assert await ssh_pool.run(shell.run, 'end') == ''
+        assert await ssh_pool.run(shell.run, 'show version') == gam.show('show version')
+    finally:
+        shell.close()
+        await client.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_pager_prompts_are_answered(cli_fleet):
+    simulator = await cli_fleet(ports=24)
+    gam = simulator.gams[0]
+    expected = gam.show('show running-config')
+    assert expected.count('\n') > PAGE_LINES
+
+    # Paging left on: the shell pages through with spaces
+    client, shell = await open_shell(simulator, learn_only=True)
+    try:
+        assert await ssh_pool.run(shell.run, 'show running-config') == expected
+    finally:
+        shell.close()
+        await client.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_command_not_answered_in_time_raises(cli_fleet):
+    simulator = await cli_fleet()
+    client, shell = await open_shell(simulator)
+    simulator.gams[0].latency = 1.0
+    try:
+        with pytest.raises(ShellTimeout):
+            await ssh_pool.run(shell.run, 'show version', 0.2)
+    finally:
+        shell.close()
+        await client.disconnect()
+
+
+def test_control_characters_are_refused():
+    shell = InteractiveShell(channel=None, timeout=TIMEOUT)
+
+    with pytest.raises(ValueError):
+        shell.run('show version\nwrite erase')
@@ -0,0 +1,46 @@
+"""Active-subscriber counts loaded as correlated subqueries"""
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models.gam import GAMDevice, GAMPort, PortStatus, PortType
+from app.models.odb import ODBSplitter
+from app.models.subscriber import Subscriber  # noqa: F401  (defines the counts)
+
+
+def sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.parametrize('entity, foreign_key', [
+    (GAMPort, 'subscribers.gam_port_id = gam_ports.id'),
+    (GAMDevice, 'subscribers.gam_device_id = gam_devices.id'),
+    (ODBSplitter, 'subscribers.odb_splitter_id = odb_splitters.id'),
+])
+def test_counts_are_selected_with_their_rows(entity, foreign_key):
+    query = sql(select(entity))
+
+    # One statement: the count is a correlated subquery in the select list
+    assert query.count('SELECT') == 2
+    assert 'count(subscribers.id)' in query
+    assert foreign_key in query
+    assert 'subscribers.status = %(status_1)s' in query
+
+
+def port(port_type, subscribers, enabled=True, status=PortStatus.UP):
+    port = GAMPort(port_number=1, port_type=port_type, enabled=enabled, status=status)
+    set_committed_value(port, 'subscriber_count', subscribers)
+    return port
+
+
+@pytest.mark.parametrize('gam_port, available', [
+    (port(PortType.MIMO, 0), True),
+    (port(PortType.MIMO, 1), False),
+    (port(PortType.COAX, 15), True),
+    (port(PortType.COAX, 16), False),
+    (port(PortType.MIMO, 0, enabled=False), False),
+    (port(PortType.COAX, 0, status=PortStatus.ERROR), False),
+])
+def test_port_availability_uses_the_loaded_count(gam_port, available):
+    assert gam_port.is_available is available
@@ -0,0 +1,122 @@
+"""Trap receiver: SNMPv3 traps authenticated with the device's USM user"""
+import pytest
+from pysnmp.proto.api import v2c
+
+from app.models.gam import PortStatus
+from app.services.trap_receiver import (
+    OID_IF_INDEX, OID_SNMP_TRAP_OID, OID_SYS_UPTIME, TRAP_LINK_DOWN, TrapReceiver
+)
+from app.utils.snmp_client import SNMPClient
+from app.utils.snmp_usm import UsmSession, UsmUser
+
+AGENT = '192.0.2.10'
+ENGINE_ID = bytes.fromhex('80001f8880e9630000d61ff449')
+IF_INDEX = SNMPClient.GHN_IF_INDEX_BASE + 3
+
+DEVICE = {
+    'id': 1,
+    'name': 'gam-1',
+    'ip_address': AGENT,
+    'snmp_community': 'public',
+    'snmp_version': 'v3',
+    'snmp_v3_username': 'gam-traps',
+    'snmp_v3_auth_protocol': 'sha',
+    'snmp_v3_auth_password': 'auth-secret-1',
+    'snmp_v3_priv_protocol': 'aes',
+    'snmp_v3_priv_password': 'priv-secret-1'
+}
+
+
+class StaticTrapReceiver(TrapReceiver):
+    """Receiver whose device list is fixed instead of read from the database"""
+
+    def __init__(self, devices):
+        super().__init__(session_factory=None, host='127.0.0.1', port=0)
+        self.devices = devices
+
+    async def _load_devices(self):
+        self._devices = {device['ip_address']: device for device in self.devices}
+
+
+def agent_session(auth_password='auth-secret-1', boots=3, engine_time=1000) -> UsmSession:
+    session = UsmSession(UsmUser(
+        'gam-traps',
+        auth_protocol='sha',
+        auth_password=auth_password,
+        priv_protocol='aes',
+        priv_password='priv-secret-1'
+    ))
+    session.set_engine(ENGINE_ID, boots, engine_time)
+    return session
+
+
+def link_down(pdu_class=v2c.TrapPDU):
+    pdu = pdu_class()
+    v2c.apiPDU.setDefaults(pdu)
+    v2c.apiPDU.setVarBinds(pdu, [
+        (v2c.ObjectIdentifier(OID_SYS_UPTIME), v2c.TimeTicks(12345)),
+        (v2c.ObjectIdentifier(OID_SNMP_TRAP_OID), v2c.ObjectIdentifier(TRAP_LINK_DOWN)),
+        (v2c.ObjectIdentifier(f"{OID_IF_INDEX}.{IF_INDEX}"), v2c.Integer(IF_INDEX))
+    ])
+    return pdu
+
+
+async def deliver(receiver: TrapReceiver, data: bytes):
+    device_updates, port_updates = {}, []
+    await receiver._handle_datagram(data, (AGENT, 50000), device_updates, port_updates)
+    return device_updates, port_updates
+
+
+@pytest.mark.asyncio
+async def test_v3_trap_is_authenticated_decrypted_and_applied():
+    receiver = StaticTrapReceiver([DEVICE])
+
+    device_updates, port_updates = await deliver(receiver, agent_session().wrap(link_down(), 1))
+
+    assert receiver.stats['applied'] == 1
+    assert 1 in device_updates
+    assert port_updates == [{'device_id': 1, 'port_number': 3, 'status': PortStatus.DOWN}]
+
+
+@pytest.mark.asyncio
+async def test_v3_trap_with_wrong_key_is_rejected():
+    receiver = StaticTrapReceiver([DEVICE])
+
+    device_updates, port_updates = await deliver(
+        receiver, agent_session(auth_password='wrong-secret').wrap(link_down(), 1)
+    )
+
+    assert receiver.stats['auth_failed'] == 1
+    assert device_updates == {} and port_updates == []
+
+
+@pytest.mark.asyncio
+async def test_v3_trap_replayed_outside_time_window_is_rejected():
+    receiver = StaticTrapReceiver([DEVICE])
+    stale = agent_session(engine_time=1000).wrap(link_down(), 1)
+    await deliver(receiver, agent_session(engine_time=5000).wrap(link_down(), 2))
+
+    device_updates, port_updates = await deliver(receiver, stale)
+
+    assert receiver.stats['applied'] == 1
+    assert receiver.stats['auth_failed'] == 1
+    assert port_updates == []
+
+
+@pytest.mark.asyncio
+async def test_v3_trap_from_v2c_device_is_rejected():
+    receiver = StaticTrapReceiver([dict(DEVICE, snmp_version='v2c')])
+
+    await deliver(receiver, agent_session().wrap(link_down(), 1))
+
+    assert receiver.stats['auth_failed'] == 1
+
+
+@pytest.mark.asyncio
+async def test_v3_inform_is_counted_as_unsupported():
+    receiver = StaticTrapReceiver([DEVICE])
+
+    device_updates, _ = await deliver(receiver, agent_session().wrap(link_down(v2c.InformRequestPDU), 1))
+
+    assert receiver.stats['unsupported'] == 1
+    assert device_updates == {}